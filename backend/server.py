@@ -1,16 +1,20 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import IndexModel, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, OperationFailure
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Type
 import uuid
 from datetime import datetime, timezone
 import random
 import asyncio
+import base64
+import json
 
 # Import emergent integrations for AI chat
 from emergentintegrations.llm.chat import LlmChat, UserMessage
@@ -20,7 +24,8 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware: timestamps are stored as BSON dates and come back as UTC datetimes
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -124,6 +129,7 @@ class InferenceRequest(BaseModel):
 class InferenceResult(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     model_name: str
+    batch_size: int = 1
     latency_ms: float
     throughput: float  # images/second
     memory_allocated: float  # MB
@@ -135,19 +141,30 @@ class InferenceResult(BaseModel):
 # Helper Functions
 # =============================================================================
 
+# Set SIMULATION_SEED to make every simulated value (and delay) reproducible
+SIMULATION_SEED = os.environ.get('SIMULATION_SEED')
+_rngs: Dict[str, random.Random] = {}
+
+def get_rng(stream: str) -> random.Random:
+    """Independent generator per stream so one endpoint's calls never shift another's values"""
+    if stream not in _rngs:
+        _rngs[stream] = random.Random(f"{SIMULATION_SEED}:{stream}") if SIMULATION_SEED is not None else random.Random()
+    return _rngs[stream]
+
 def simulate_gpu_info() -> GPUInfo:
     """Simulate RTX 5090 GPU information"""
+    rng = get_rng("gpu")
     return GPUInfo(
         name="NVIDIA GeForce RTX 5090",
         driver_version="560.94",
         cuda_version="12.6",
         memory_total=32.0,
-        memory_used=round(random.uniform(4.0, 16.0), 2),
-        memory_free=round(random.uniform(16.0, 28.0), 2),
-        temperature=round(random.uniform(35.0, 75.0), 1),
-        power_usage=round(random.uniform(100.0, 450.0), 1),
-        utilization=round(random.uniform(10.0, 95.0), 1),
-        clock_speed=round(random.uniform(2000.0, 2900.0), 0),
+        memory_used=round(rng.uniform(4.0, 16.0), 2),
+        memory_free=round(rng.uniform(16.0, 28.0), 2),
+        temperature=round(rng.uniform(35.0, 75.0), 1),
+        power_usage=round(rng.uniform(100.0, 450.0), 1),
+        utilization=round(rng.uniform(10.0, 95.0), 1),
+        clock_speed=round(rng.uniform(2000.0, 2900.0), 0),
         is_rtx=True
     )
 
@@ -162,20 +179,21 @@ def simulate_benchmark(benchmark_type: str) -> BenchmarkResult:
     
     base = base_scores.get(benchmark_type, base_scores["general"])
     variance = base["variance"]
+    rng = get_rng("benchmark")
     
     return BenchmarkResult(
         benchmark_type=benchmark_type,
-        score=round(base["score"] * random.uniform(1 - variance, 1 + variance), 0),
-        fps=round(base["fps"] * random.uniform(1 - variance, 1 + variance), 1),
-        memory_usage=round(random.uniform(6.0, 18.0), 2),
-        temperature=round(random.uniform(55.0, 82.0), 1),
+        score=round(base["score"] * rng.uniform(1 - variance, 1 + variance), 0),
+        fps=round(base["fps"] * rng.uniform(1 - variance, 1 + variance), 1),
+        memory_usage=round(rng.uniform(6.0, 18.0), 2),
+        temperature=round(rng.uniform(55.0, 82.0), 1),
         details={
             "compute_units": 21760,
             "tensor_cores": 680,
             "ray_tracing_cores": 170,
             "memory_bandwidth": "1792 GB/s",
             "pcie_bandwidth": "64 GB/s",
-            "test_iterations": random.randint(1000, 5000),
+            "test_iterations": rng.randint(1000, 5000),
             "avg_frame_time": round(1000 / base["fps"], 2)
         }
     )
@@ -211,19 +229,423 @@ def simulate_inference(request: InferenceRequest) -> InferenceResult:
     base_latency = model_latencies.get(request.model_name, 5.0)
     p_mult = precision_mult.get(request.precision, 1.0)
     f_mult = framework_mult.get(request.framework, 1.0)
+    rng = get_rng("inference")
     
-    latency = base_latency * p_mult * f_mult * random.uniform(0.9, 1.1)
+    latency = base_latency * p_mult * f_mult * rng.uniform(0.9, 1.1)
     throughput = (1000 / latency) * request.batch_size
     
     return InferenceResult(
         model_name=request.model_name,
         latency_ms=round(latency, 2),
         throughput=round(throughput, 1),
-        memory_allocated=round(random.uniform(500, 4000), 0),
+        memory_allocated=round(rng.uniform(500, 4000), 0),
+        batch_size=request.batch_size,
         precision=request.precision,
         framework=request.framework
     )
 
+# History queries: newest first, paged by (timestamp, id) so deep pages cost the same as the first
+HISTORY_MAX_LIMIT = 500
+HISTORY_SORT = [("timestamp", DESCENDING), ("id", DESCENDING)]
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+HISTORY_INDEXES = {
+    "benchmarks": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel(HISTORY_SORT),
+        IndexModel([("benchmark_type", ASCENDING)] + HISTORY_SORT)
+    ],
+    "inference_results": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel(HISTORY_SORT),
+        IndexModel([("model_name", ASCENDING), ("precision", ASCENDING)] + HISTORY_SORT),
+        IndexModel([("precision", ASCENDING)] + HISTORY_SORT)
+    ],
+    "status_checks": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel(HISTORY_SORT)
+    ]
+}
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    timestamp = doc["timestamp"]
+    data = {"t": timestamp, "id": doc["id"]}
+    if isinstance(timestamp, datetime):
+        data["t"] = timestamp.isoformat()
+    else:
+        data["s"] = True  # Legacy string timestamp, not yet migrated
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, bool]:
+    """(timestamp, id, whether the row still had a string timestamp)"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return as_utc(datetime.fromisoformat(data["t"])), data["id"], bool(data.get("s"))
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def iso_utc(value: datetime) -> str:
+    """The ISO form older versions stored timestamps in, for comparing against unmigrated rows"""
+    return as_utc(value).astimezone(timezone.utc).isoformat()
+
+def timestamp_condition(time_range: Dict[str, datetime], legacy: bool) -> Dict[str, Any]:
+    """Match a timestamp range; with legacy set, unmigrated ISO-string timestamps are compared too"""
+    if not legacy:
+        return {"timestamp": time_range}
+    legacy_range = {op: iso_utc(value) for op, value in time_range.items()}
+    return {"$or": [{"timestamp": time_range}, {"timestamp": legacy_range}]}
+
+def history_projection(fields: Optional[str], model: Type[BaseModel]) -> Optional[Dict[str, int]]:
+    """Mongo projection for a comma-separated field list; id and timestamp are always kept for the cursor"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields {unknown}. Valid: {list(model.model_fields)}")
+    return {"_id": 0, "id": 1, "timestamp": 1, **{name: 1 for name in names}}
+
+async def query_history(
+    collection: AsyncIOMotorCollection,
+    model: Type[BaseModel],
+    response: Response,
+    filters: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    fields: Optional[str]
+) -> List[Any]:
+    """
+    One page of a history collection. Filters, the time range and the keyset
+    condition all run server-side against the (filter..., timestamp, id)
+    indexes. The cursor for the next page is returned in X-Next-Cursor.
+    """
+    # Until the startup migration finishes, some rows may still hold ISO-string
+    # timestamps. A date comparison never matches a string, so those rows are
+    # matched by string comparison instead; they sort after every date row.
+    legacy = collection.name in _migrating
+    query: Dict[str, Any] = {key: value for key, value in filters.items() if value is not None}
+    time_range = {}
+    if since:
+        time_range["$gte"] = as_utc(since)
+    if until:
+        time_range["$lt"] = as_utc(until)
+    if time_range:
+        query.update(timestamp_condition(time_range, legacy))
+    if cursor:
+        timestamp, last_id, legacy_cursor = decode_cursor(cursor)
+        if legacy_cursor and legacy:
+            value = iso_utc(timestamp)
+            keyset = {"$or": [{"timestamp": {"$lt": value}}, {"timestamp": value, "id": {"$lt": last_id}}]}
+        else:
+            keyset = {"$or": [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "id": {"$lt": last_id}}]}
+            if legacy:
+                keyset["$or"].append({"timestamp": {"$type": "string"}})
+        query = {"$and": [query, keyset]} if query else keyset
+    
+    limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+    projection = history_projection(fields, model)
+    # One extra row tells us whether another page exists without a count query
+    docs = await collection.find(query, projection or {"_id": 0}).sort(HISTORY_SORT).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1])
+    if projection:
+        return docs
+    return [model(**doc) for doc in docs]
+
+_migrating = set()  # Collections that may still hold string timestamps
+
+async def migrate_string_timestamps(collection: AsyncIOMotorCollection, batch_size: int = 1000):
+    """Convert ISO-string timestamps written by older versions to BSON dates, in batches"""
+    _migrating.add(collection.name)
+    try:
+        await _migrate_string_timestamps(collection, batch_size)
+        _migrating.discard(collection.name)
+    except Exception as e:
+        # Left in _migrating: history queries keep matching string timestamps
+        logger.error(f"Error migrating timestamps in {collection.name}: {e}")
+
+async def _migrate_string_timestamps(collection: AsyncIOMotorCollection, batch_size: int):
+    converted = 0
+    unparseable = []
+    while True:
+        query = {"timestamp": {"$type": "string"}, "_id": {"$nin": unparseable}}
+        docs = await collection.find(query, {"_id": 1, "timestamp": 1}).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        updates = []
+        for doc in docs:
+            try:
+                timestamp = as_utc(datetime.fromisoformat(doc["timestamp"]))
+            except ValueError:
+                unparseable.append(doc["_id"])
+                continue
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"timestamp": timestamp}}))
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+            converted += len(updates)
+    if converted or unparseable:
+        logger.info(f"{collection.name}: converted {converted} string timestamps, {len(unparseable)} unparseable")
+
+# Analytics: grouped stats computed by Mongo so clients never download whole collections
+BUCKET_UNITS = ["minute", "hour", "day", "week", "month"]
+BENCHMARK_GROUPS = ["benchmark_type", "bucket"]
+BENCHMARK_METRICS = ["score", "fps"]
+INFERENCE_GROUPS = ["model_name", "precision", "framework", "batch_size", "bucket"]
+INFERENCE_METRICS = ["latency_ms", "throughput"]
+GROUP_ALIASES = {"model": "model_name", "type": "benchmark_type"}
+MAX_STATS_GROUPS = 1000
+_has_percentile: Optional[bool] = None  # $percentile needs MongoDB 7.0; older servers push values instead
+UNKNOWN_OPERATOR_CODES = {15952, 168}  # "unknown group operator", InvalidPipelineOperator
+
+def parse_stat_names(spec: Optional[str], allowed: List[str], default: List[str], what: str) -> List[str]:
+    if not spec:
+        return default
+    names = [GROUP_ALIASES.get(name.strip(), name.strip()) for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {what} {unknown}. Valid: {allowed}")
+    return list(dict.fromkeys(names))
+
+def stats_pipeline(match: Dict[str, Any], group_by: List[str], metrics: List[str], bucket: str, percentile: bool) -> List[Dict[str, Any]]:
+    group: Dict[str, Any] = {
+        "_id": {
+            field: {"$dateTrunc": {"date": "$timestamp", "unit": bucket}} if field == "bucket" else f"${field}"
+            for field in group_by
+        },
+        "count": {"$sum": 1}
+    }
+    for metric in metrics:
+        group[f"{metric}__mean"] = {"$avg": f"${metric}"}
+        group[f"{metric}__min"] = {"$min": f"${metric}"}
+        group[f"{metric}__max"] = {"$max": f"${metric}"}
+        if percentile:
+            group[f"{metric}__pct"] = {"$percentile": {"input": f"${metric}", "p": [0.5, 0.95], "method": "approximate"}}
+        else:
+            group[f"{metric}__values"] = {"$push": f"${metric}"}
+    return [{"$match": match}, {"$group": group}, {"$sort": {"_id": 1}}, {"$limit": MAX_STATS_GROUPS}]
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks"""
+    position = q * (len(ordered) - 1)
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+def _percentiles(values: List[float]) -> List[Optional[float]]:
+    ordered = sorted(v for v in values if isinstance(v, (int, float)))
+    if not ordered:
+        return [None, None]
+    return [_percentile(ordered, q) for q in (0.5, 0.95)]
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if isinstance(value, (int, float)) else value
+
+async def grouped_stats(
+    collection: AsyncIOMotorCollection,
+    filters: Dict[str, Any],
+    group_by: List[str],
+    metrics: List[str],
+    bucket: str,
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> Dict[str, Any]:
+    """
+    count/mean/p50/p95/min/max per group, as one aggregation pipeline. While
+    string timestamps are being migrated, time buckets cover converted rows only.
+    """
+    global _has_percentile
+    if bucket not in BUCKET_UNITS:
+        raise HTTPException(status_code=400, detail=f"Unknown bucket {bucket}. Valid: {BUCKET_UNITS}")
+    match: Dict[str, Any] = {key: value for key, value in filters.items() if value is not None}
+    time_range = {}
+    if since:
+        time_range["$gte"] = as_utc(since)
+    if until:
+        time_range["$lt"] = as_utc(until)
+    if "bucket" in group_by:
+        # $dateTrunc fails on legacy string timestamps, so bucketed stats leave out
+        # rows the startup migration has not converted yet
+        match["timestamp"] = {**time_range, "$type": "date"}
+    elif time_range:
+        match.update(timestamp_condition(time_range, collection.name in _migrating))
+    
+    rows = None
+    if _has_percentile is not False:
+        try:
+            pipeline = stats_pipeline(match, group_by, metrics, bucket, percentile=True)
+            rows = await collection.aggregate(pipeline).to_list(MAX_STATS_GROUPS)
+            _has_percentile = True
+        except OperationFailure as e:
+            # Anything else (bad data, a transient server error) would fail the fallback too
+            if e.code not in UNKNOWN_OPERATOR_CODES:
+                raise
+            logger.info(f"$percentile unsupported ({e}); computing percentiles from pushed values")
+            _has_percentile = False
+    if rows is None:
+        pipeline = stats_pipeline(match, group_by, metrics, bucket, percentile=False)
+        rows = await collection.aggregate(pipeline).to_list(MAX_STATS_GROUPS)
+    
+    groups = []
+    for row in rows:
+        key = dict(row["_id"])
+        if isinstance(key.get("bucket"), datetime):
+            key["bucket"] = key["bucket"].isoformat()
+        group = {"key": key, "count": row["count"]}
+        for metric in metrics:
+            p50, p95 = row.get(f"{metric}__pct") or _percentiles(row.get(f"{metric}__values", []))
+            group[metric] = {
+                "mean": _round(row[f"{metric}__mean"]),
+                "p50": _round(p50),
+                "p95": _round(p95),
+                "min": _round(row[f"{metric}__min"]),
+                "max": _round(row[f"{metric}__max"])
+            }
+        groups.append(group)
+    
+    return {
+        "group_by": group_by,
+        "bucket": bucket if "bucket" in group_by else None,
+        "metrics": metrics,
+        "groups": groups
+    }
+
+# Write-behind persistence: results are acknowledged once buffered and written with insert_many
+WRITE_BATCH_SIZE = int(os.environ.get('WRITE_BATCH_SIZE', 100))
+WRITE_FLUSH_INTERVAL_MS = int(os.environ.get('WRITE_FLUSH_INTERVAL_MS', 250))
+WRITE_MAX_PENDING = int(os.environ.get('WRITE_MAX_PENDING', 2000))
+READ_FLUSH_TIMEOUT_MS = int(os.environ.get('READ_FLUSH_TIMEOUT_MS', 1000))  # Longest a history read waits on buffered writes
+WRITE_RETRIES = 3
+DUPLICATE_KEY_ERROR = 11000
+
+class BatchWriter:
+    """
+    Buffers documents for one collection and writes them with unordered
+    insert_many when WRITE_BATCH_SIZE are pending or every
+    WRITE_FLUSH_INTERVAL_MS. put() waits while WRITE_MAX_PENDING documents are
+    buffered, so a slow or unavailable Mongo slows producers instead of growing
+    memory without bound. Failed batches are retried; duplicate-key errors on
+    a retry mean the document already landed and count as written.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, batch_size: int = WRITE_BATCH_SIZE,
+                 flush_interval_ms: int = WRITE_FLUSH_INTERVAL_MS, max_pending: int = WRITE_MAX_PENDING):
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = max(1, flush_interval_ms) / 1000
+        self.max_pending = max(self.batch_size, max_pending)
+        self.written = 0
+        self.dropped = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._queued = 0  # Documents ever buffered
+        self._taken = 0  # Of those, documents handed to _write
+        self._drains: set = set()  # Flushes a caller stopped waiting for, still writing
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+    
+    def start(self):
+        # Created here so they belong to the serving event loop
+        self._wake = asyncio.Event()
+        self._space = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+    
+    async def put(self, doc: Dict[str, Any]):
+        if self._task is None or self._closed:
+            await self._write([doc])  # Not running (startup failed or shutting down): write through
+            return
+        async with self._space:
+            if len(self._pending) >= self.max_pending:
+                self._wake.set()
+                await self._space.wait_for(lambda: len(self._pending) < self.max_pending)
+            self._pending.append(doc)
+            self._queued += 1
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+    
+    async def flush(self, timeout_s: Optional[float] = None):
+        """
+        Write what is buffered at call time; documents put meanwhile wait for the
+        next flush, so a reader never chases a steady stream of writes. With
+        timeout_s, returns after at most that long and the writes carry on.
+        """
+        if self._task is None:
+            return
+        drain = asyncio.ensure_future(self._drain(self._queued))
+        self._drains.add(drain)
+        drain.add_done_callback(self._drains.discard)
+        try:
+            await asyncio.wait_for(asyncio.shield(drain), timeout_s)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.collection.name}: buffered writes still pending after {timeout_s}s")
+    
+    async def _drain(self, until: Optional[int] = None):
+        """Write buffered documents up to the until-th ever queued (all of them if None)"""
+        async with self._flush_lock:
+            while self._pending and (until is None or self._taken < until):
+                count = self.batch_size if until is None else min(self.batch_size, until - self._taken)
+                batch = self._pending[:count]
+                del self._pending[:count]
+                self._taken += len(batch)
+                async with self._space:
+                    self._space.notify_all()
+                await self._write(batch)
+    
+    async def close(self):
+        """Stop the flush loop and write out the buffer"""
+        if self._task is None:
+            return
+        self._closed = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        if self.dropped:
+            logger.error(f"{self.collection.name}: {self.dropped} documents could not be written")
+    
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._drain(self._queued)
+        await self._drain()
+    
+    async def _write(self, docs: List[Dict[str, Any]]):
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                await self.collection.insert_many(docs, ordered=False)
+                self.written += len(docs)
+                return
+            except BulkWriteError as e:
+                failed = {
+                    error["index"] for error in e.details.get("writeErrors", [])
+                    if error.get("code") != DUPLICATE_KEY_ERROR
+                }
+                self.written += len(docs) - len(failed)
+                docs = [doc for i, doc in enumerate(docs) if i in failed]
+                if not docs:
+                    return
+                error = e
+            except Exception as e:
+                error = e
+            if attempt < WRITE_RETRIES:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        self.dropped += len(docs)
+        logger.error(f"Error writing {len(docs)} documents to {self.collection.name}: {error}")
+
+benchmark_writer = BatchWriter(db.benchmarks)
+inference_writer = BatchWriter(db.inference_results)
+
 # Preset prompts for AI assistant
 PRESET_PROMPTS = {
     "gpu_problem": "أنا أواجه مشكلة في أداء بطاقة الرسومات GPU. هل يمكنك مساعدتي في تشخيص المشكلة وتقديم حلول؟",
@@ -246,18 +668,24 @@ async def create_status_check(input: StatusCheckCreate):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
     doc = status_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
     _ = await db.status_checks.insert_one(doc)
     return status_obj
 
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks(limit: int = 20):
-    """Get status checks with pagination"""
-    status_checks = await db.status_checks.find({}, {"_id": 0}).sort("timestamp", -1).to_list(limit)
-    for check in status_checks:
-        if isinstance(check['timestamp'], str):
-            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
-    return status_checks
+@api_router.get("/status")
+async def get_status_checks(
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = None
+):
+    """Get status checks, newest first; pass X-Next-Cursor back as cursor for the next page"""
+    return await query_history(
+        db.status_checks, StatusCheck, response, {"client_name": client_name},
+        limit, cursor, since, until, fields
+    )
 
 # Settings Routes
 @api_router.get("/settings", response_model=AppSettings)
@@ -318,50 +746,112 @@ async def run_benchmark(benchmark_type: str):
         raise HTTPException(status_code=400, detail=f"Unknown benchmark type: {benchmark_type}")
     
     # Simulate benchmark running time
-    await asyncio.sleep(random.uniform(1.5, 3.0))
+    await asyncio.sleep(get_rng("benchmark_delay").uniform(1.5, 3.0))
     
     result = simulate_benchmark(benchmark_type)
     
-    # Save to database
-    doc = result.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    await db.benchmarks.insert_one(doc)
+    # Buffered; written with the next batch
+    await benchmark_writer.put(result.model_dump())
     
     return result
 
-@api_router.get("/benchmark/history", response_model=List[BenchmarkResult])
-async def get_benchmark_history(limit: int = 20):
-    """Get benchmark history"""
-    results = await db.benchmarks.find({}, {"_id": 0}).sort("timestamp", -1).to_list(limit)
-    for r in results:
-        if isinstance(r.get('timestamp'), str):
-            r['timestamp'] = datetime.fromisoformat(r['timestamp'])
-    return results
+@api_router.get("/benchmark/history")
+async def get_benchmark_history(
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    benchmark_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = None
+):
+    """
+    Get benchmark history, newest first. fields (comma-separated) limits the
+    returned fields; pass X-Next-Cursor back as cursor for the next page.
+    """
+    await benchmark_writer.flush(READ_FLUSH_TIMEOUT_MS / 1000)  # Include results still buffered
+    return await query_history(
+        db.benchmarks, BenchmarkResult, response, {"benchmark_type": benchmark_type},
+        limit, cursor, since, until, fields
+    )
+
+@api_router.get("/benchmark/stats")
+async def get_benchmark_stats(
+    group_by: Optional[str] = None,
+    metrics: Optional[str] = None,
+    bucket: str = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    benchmark_type: Optional[str] = None
+):
+    """count/mean/p50/p95/min/max of score and fps grouped by benchmark_type and/or time bucket"""
+    await benchmark_writer.flush(READ_FLUSH_TIMEOUT_MS / 1000)  # Include results still buffered
+    return await grouped_stats(
+        db.benchmarks,
+        {"benchmark_type": benchmark_type},
+        parse_stat_names(group_by, BENCHMARK_GROUPS, ["benchmark_type"], "group_by fields"),
+        parse_stat_names(metrics, BENCHMARK_METRICS, BENCHMARK_METRICS, "metrics"),
+        bucket, since, until
+    )
 
 # Inference Routes
 @api_router.post("/inference/run", response_model=InferenceResult)
 async def run_inference(request: InferenceRequest):
     """Run inference simulation"""
     # Simulate inference time
-    await asyncio.sleep(random.uniform(0.5, 1.5))
+    await asyncio.sleep(get_rng("inference_delay").uniform(0.5, 1.5))
     
     result = simulate_inference(request)
     
-    # Save to database
-    doc = result.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    await db.inference_results.insert_one(doc)
+    # Buffered; written with the next batch
+    await inference_writer.put(result.model_dump())
     
     return result
 
-@api_router.get("/inference/history", response_model=List[InferenceResult])
-async def get_inference_history(limit: int = 20):
-    """Get inference history"""
-    results = await db.inference_results.find({}, {"_id": 0}).sort("timestamp", -1).to_list(limit)
-    for r in results:
-        if isinstance(r.get('timestamp'), str):
-            r['timestamp'] = datetime.fromisoformat(r['timestamp'])
-    return results
+@api_router.get("/inference/history")
+async def get_inference_history(
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    model: Optional[str] = None,
+    precision: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = None
+):
+    """
+    Get inference history, newest first, optionally for one model and/or
+    precision. Pass X-Next-Cursor back as cursor for the next page.
+    """
+    await inference_writer.flush(READ_FLUSH_TIMEOUT_MS / 1000)  # Include results still buffered
+    return await query_history(
+        db.inference_results, InferenceResult, response, {"model_name": model, "precision": precision},
+        limit, cursor, since, until, fields
+    )
+
+@api_router.get("/inference/stats")
+async def get_inference_stats(
+    group_by: Optional[str] = None,
+    metrics: Optional[str] = None,
+    bucket: str = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    model: Optional[str] = None,
+    precision: Optional[str] = None,
+    framework: Optional[str] = None
+):
+    """
+    count/mean/p50/p95/min/max of latency_ms and throughput grouped by any of
+    model_name, precision, framework, batch_size and time bucket
+    """
+    await inference_writer.flush(READ_FLUSH_TIMEOUT_MS / 1000)  # Include results still buffered
+    return await grouped_stats(
+        db.inference_results,
+        {"model_name": model, "precision": precision, "framework": framework},
+        parse_stat_names(group_by, INFERENCE_GROUPS, ["model_name"], "group_by fields"),
+        parse_stat_names(metrics, INFERENCE_METRICS, INFERENCE_METRICS, "metrics"),
+        bucket, since, until
+    )
 
 # AI Chat Routes
 @api_router.post("/chat", response_model=ChatResponse)
@@ -460,8 +950,34 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+_background_tasks: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def create_indexes():
+    """Declare history indexes and convert legacy string timestamps in the background"""
+    for name, indexes in HISTORY_INDEXES.items():
+        try:
+            await db[name].create_indexes(indexes)
+        except Exception as e:
+            logger.error(f"Error creating indexes on {name}: {e}")
+        _background_tasks.append(asyncio.create_task(migrate_string_timestamps(db[name])))
+
+@app.on_event("startup")
+async def start_writers():
+    benchmark_writer.start()
+    inference_writer.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Buffered results must reach Mongo before the client goes away
+    for writer in (benchmark_writer, inference_writer):
+        await writer.close()
+    # Migrations are resumable: rows not yet converted are picked up on the next start
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
     client.close()
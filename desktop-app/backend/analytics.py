@@ -0,0 +1,151 @@
+"""
+Result Analytics - grouped statistics over benchmark and inference history
+In-memory counterpart of the web backend's Mongo aggregation pipelines
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+BUCKET_UNITS = ("minute", "hour", "day", "week", "month")
+BENCHMARK_GROUPS = ("benchmark_type", "requested_type", "device", "device_name", "backend", "bucket")
+BENCHMARK_METRICS = ("score", "fps", "time_ms")
+INFERENCE_GROUPS = ("model_name", "precision", "framework", "batch_size", "is_real", "bucket")
+INFERENCE_METRICS = ("latency_ms", "throughput")
+GROUP_ALIASES = {"model": "model_name", "type": "benchmark_type"}
+MAX_GROUPS = 1000
+
+
+def parse_list(spec: Optional[str], allowed: Tuple[str, ...], default: Tuple[str, ...], what: str) -> List[str]:
+    """Comma-separated names, aliases resolved; raises ValueError for unknown names"""
+    if not spec:
+        return list(default)
+    names = [GROUP_ALIASES.get(name.strip(), name.strip()) for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown {what} {unknown}. Valid: {list(allowed)}")
+    return list(dict.fromkeys(names))
+
+
+def bucket_start(timestamp: datetime, unit: str) -> datetime:
+    """Floor to the bucket, matching Mongo's $dateTrunc (weeks start on Sunday)"""
+    timestamp = timestamp.astimezone(timezone.utc)
+    if unit == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if unit == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "week":
+        return day - timedelta(days=(day.weekday() + 1) % 7)
+    if unit == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks, as np.percentile does"""
+    position = q * (len(ordered) - 1)
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize_values(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"mean": None, "p50": None, "p95": None, "min": None, "max": None}
+    if HAS_NUMPY:
+        array = np.asarray(values, dtype=np.float64)
+        p50, p95 = (float(v) for v in np.percentile(array, [50, 95]))
+        mean = float(array.mean())
+    else:
+        ordered = sorted(values)
+        p50, p95 = _percentile(ordered, 0.50), _percentile(ordered, 0.95)
+        mean = sum(ordered) / len(ordered)
+    return {
+        "mean": round(mean, 4),
+        "p50": round(p50, 4),
+        "p95": round(p95, 4),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4)
+    }
+
+
+def aggregate(
+    records: Iterable[Dict[str, Any]],
+    group_by: List[str],
+    metrics: List[str],
+    bucket: str = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    count/mean/p50/p95/min/max of each metric per group. Records outside
+    [since, until) or not matching filters are skipped; the result has the
+    same shape as the web backend's /stats endpoints.
+    """
+    if bucket not in BUCKET_UNITS:
+        raise ValueError(f"Unknown bucket {bucket}. Valid: {list(BUCKET_UNITS)}")
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    since = _parse_timestamp(since) if since else None
+    until = _parse_timestamp(until) if until else None
+    needs_time = "bucket" in group_by or since or until
+
+    groups: Dict[Tuple, Dict[str, List[float]]] = {}
+    counts: Dict[Tuple, int] = {}
+    for record in records:
+        if any(record.get(k) != v for k, v in filters.items()):
+            continue
+        timestamp = _parse_timestamp(record.get("timestamp")) if needs_time else None
+        if needs_time and timestamp is None:
+            continue
+        if (since and timestamp < since) or (until and timestamp >= until):
+            continue
+
+        key = tuple(
+            bucket_start(timestamp, bucket).isoformat() if field == "bucket" else record.get(field)
+            for field in group_by
+        )
+        values = groups.setdefault(key, {metric: [] for metric in metrics})
+        counts[key] = counts.get(key, 0) + 1
+        for metric in metrics:
+            value = record.get(metric)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[metric].append(float(value))
+
+    keys = sorted(groups, key=lambda k: tuple((v is None, str(v)) for v in k))
+    if len(keys) > MAX_GROUPS:
+        logger.warning(f"Aggregation produced {len(keys)} groups; returning the first {MAX_GROUPS}")
+        keys = keys[:MAX_GROUPS]
+
+    return {
+        "group_by": group_by,
+        "bucket": bucket if "bucket" in group_by else None,
+        "metrics": metrics,
+        "groups": [
+            {
+                "key": dict(zip(group_by, key)),
+                "count": counts[key],
+                **{metric: summarize_values(groups[key][metric]) for metric in metrics}
+            }
+            for key in keys
+        ]
+    }
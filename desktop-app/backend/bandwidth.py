@@ -0,0 +1,254 @@
+"""
+Memory Bandwidth Suite - bandwidth curves across buffer sizes and access patterns
+STREAM copy/scale/add/triad, strided and random gathers, host<->device transfers
+"""
+
+import logging
+import time
+from typing import Dict, Any, Optional, List, Callable
+from dataclasses import dataclass, asdict
+
+from simulation import get_seed
+from jobs import JobControl
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import cupy as cp
+    HAS_CUPY = True
+except ImportError:
+    HAS_CUPY = False
+
+STREAM_PATTERNS = ("copy", "scale", "add", "triad")
+GATHER_PATTERNS = ("strided", "random")
+TRANSFER_PATTERNS = ("h2d_pageable", "h2d_pinned", "d2h_pageable", "d2h_pinned")
+ALL_PATTERNS = STREAM_PATTERNS + GATHER_PATTERNS + TRANSFER_PATTERNS
+
+DEFAULT_MIN_SIZE_KB = 16  # Resident in L1/L2
+DEFAULT_MAX_SIZE_MB = 128  # Past the last-level cache of nearly every part
+DEFAULT_STRIDE = 16  # float32 elements: one element per 64-byte cache line
+SCALAR = 3.0
+
+
+@dataclass
+class BandwidthPoint:
+    pattern: str
+    size_bytes: int
+    bandwidth_gbps: float  # Best repetition, as STREAM reports
+    mean_gbps: float
+    time_us: float  # Best repetition
+    repetitions: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def size_sweep(min_size_kb: int = DEFAULT_MIN_SIZE_KB, max_size_mb: int = DEFAULT_MAX_SIZE_MB, points_per_octave: int = 1) -> List[int]:
+    """Geometric buffer sizes in bytes, min to max inclusive"""
+    sizes = []
+    size = float(max(1, min_size_kb) * 1024)
+    limit = max_size_mb * 1024 * 1024
+    factor = 2 ** (1 / max(1, points_per_octave))
+    while size <= limit * 1.0001:
+        sizes.append(int(size) // 64 * 64)  # Whole cache lines
+        size *= factor
+    return sorted(set(sizes))
+
+
+class _Backend:
+    """Array module plus a timer that measures on the device the arrays live on"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.xp = cp if name == "cupy" else np
+        if name == "cupy":
+            self._triad = cp.ElementwiseKernel("T b, T c, T q", "T a", "a = b + q * c", "stream_triad")
+
+    def synchronize(self):
+        if self.name == "cupy":
+            cp.cuda.Stream.null.synchronize()
+
+    def time(self, fn: Callable[[], Any]) -> float:
+        """Seconds for one call of fn"""
+        if self.name == "cupy":
+            start, end = cp.cuda.Event(), cp.cuda.Event()
+            start.record()
+            fn()
+            end.record()
+            end.synchronize()
+            return cp.cuda.get_elapsed_time(start, end) / 1000
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    def triad(self, a, b, c):
+        if self.name == "cupy":
+            self._triad(b, c, SCALAR, a)
+        else:
+            # NumPy has no fused multiply-add: two passes over a, but STREAM bytes are still counted
+            np.multiply(c, SCALAR, out=a)
+            np.add(a, b, out=a)
+
+
+class BandwidthSuite:
+    """
+    Sweeps every requested pattern across buffer sizes. Buffers are allocated
+    once at the largest size and sliced for smaller ones, so the sweep itself
+    does not allocate. Each point repeats until target_ms of work is timed.
+    """
+
+    def __init__(
+        self,
+        backend: str = "auto",
+        patterns: Optional[List[str]] = None,
+        min_size_kb: int = DEFAULT_MIN_SIZE_KB,
+        max_size_mb: int = DEFAULT_MAX_SIZE_MB,
+        points_per_octave: int = 1,
+        stride: int = DEFAULT_STRIDE,
+        target_ms: float = 20.0,
+        min_repetitions: int = 3,
+        max_repetitions: int = 1000
+    ):
+        if backend == "auto":
+            backend = "cupy" if HAS_CUPY else "numpy"
+        if backend not in ("numpy", "cupy"):
+            raise ValueError(f"Unknown backend {backend}. Valid: ['auto', 'numpy', 'cupy']")
+        if backend == "cupy" and not HAS_CUPY:
+            raise ValueError("CuPy is not available")
+        if not HAS_NUMPY:
+            raise ValueError("NumPy is not available")
+
+        patterns = list(patterns or ALL_PATTERNS)
+        unknown = [p for p in patterns if p not in ALL_PATTERNS]
+        if unknown:
+            raise ValueError(f"Unknown patterns {unknown}. Valid: {list(ALL_PATTERNS)}")
+        if backend == "numpy":
+            skipped = [p for p in patterns if p in TRANSFER_PATTERNS]
+            if skipped:
+                logger.info(f"Skipping {skipped}: host<->device transfers need the CuPy backend")
+            patterns = [p for p in patterns if p not in TRANSFER_PATTERNS]
+            if not patterns:
+                raise ValueError("Only transfer patterns requested; they need the CuPy backend")
+        sizes = size_sweep(min_size_kb, max_size_mb, points_per_octave)
+        if not sizes:
+            raise ValueError(f"No buffer sizes between {min_size_kb} KB and {max_size_mb} MB")
+
+        self.backend = _Backend(backend)
+        self.patterns = patterns
+        self.sizes = sizes
+        self.stride = max(2, stride)
+        self.target_s = target_ms / 1000
+        self.min_repetitions = max(1, min_repetitions)
+        self.max_repetitions = max(self.min_repetitions, max_repetitions)
+
+    def _measure(self, pattern: str, size_bytes: int, moved_bytes: int, fn: Callable[[], Any]) -> BandwidthPoint:
+        fn()  # Warm up: page faults, kernel compilation, cache state
+        self.backend.synchronize()
+        times = []
+        total = 0.0
+        while len(times) < self.max_repetitions and (len(times) < self.min_repetitions or total < self.target_s):
+            elapsed = max(self.backend.time(fn), 1e-9)
+            times.append(elapsed)
+            total += elapsed
+        best = min(times)
+        return BandwidthPoint(
+            pattern=pattern,
+            size_bytes=size_bytes,
+            bandwidth_gbps=round(moved_bytes / best / 1e9, 3),
+            mean_gbps=round(moved_bytes * len(times) / total / 1e9, 3),
+            time_us=round(best * 1e6, 3),
+            repetitions=len(times)
+        )
+
+    def run(self, control: Optional[JobControl] = None) -> Dict[str, Any]:
+        control = control or JobControl()
+        xp = self.backend.xp
+        dtype = xp.float32
+        itemsize = 4
+        max_elements = self.sizes[-1] // itemsize
+
+        a = xp.ones(max_elements, dtype=dtype)
+        b = xp.full(max_elements, 2.0, dtype=dtype)
+        c = xp.zeros(max_elements, dtype=dtype)
+        rng = np.random.default_rng(get_seed())
+
+        host = {}
+        if any(p in TRANSFER_PATTERNS for p in self.patterns):
+            host["pageable"] = np.ones(max_elements, dtype=np.float32)
+            pinned = cp.cuda.alloc_pinned_memory(max_elements * itemsize)
+            host["pinned"] = np.frombuffer(pinned, np.float32, max_elements)
+            host["pinned"][:] = 1.0
+
+        curves: Dict[str, List[Dict[str, Any]]] = {p: [] for p in self.patterns}
+        total_points = len(self.patterns) * len(self.sizes)
+        done = 0
+        try:
+            for size in self.sizes:
+                n = size // itemsize
+                va, vb, vc = a[:n], b[:n], c[:n]
+                for pattern in self.patterns:
+                    if pattern == "copy":
+                        point = self._measure(pattern, size, 2 * n * itemsize, lambda: xp.copyto(vc, va))
+                    elif pattern == "scale":
+                        point = self._measure(pattern, size, 2 * n * itemsize, lambda: xp.multiply(vc, SCALAR, out=vb))
+                    elif pattern == "add":
+                        point = self._measure(pattern, size, 3 * n * itemsize, lambda: xp.add(va, vb, out=vc))
+                    elif pattern == "triad":
+                        point = self._measure(pattern, size, 3 * n * itemsize, lambda: self.backend.triad(va, vb, vc))
+                    elif pattern == "strided":
+                        # Useful bytes only: a falling curve shows the cache lines fetched and discarded
+                        m = n // self.stride
+                        out = vc[:m]
+                        point = self._measure(pattern, size, 2 * m * itemsize, lambda: xp.copyto(out, va[::self.stride]))
+                    elif pattern == "random":
+                        index = xp.asarray(rng.integers(0, n, n))
+                        point = self._measure(
+                            pattern, size, n * (2 * itemsize + index.itemsize),
+                            lambda: xp.take(va, index, out=vc)
+                        )
+                        del index
+                    else:
+                        direction, memory = pattern.split("_")
+                        host_buffer = host[memory][:n]
+                        if direction == "h2d":
+                            point = self._measure(pattern, size, n * itemsize, lambda: va.set(host_buffer))
+                        else:
+                            point = self._measure(pattern, size, n * itemsize, lambda: va.get(out=host_buffer))
+                    curves[pattern].append(point.to_dict())
+                    done += 1
+                    control.tick(done, total_points)
+        finally:
+            del a, b, c
+            if self.backend.name == "cupy":
+                cp.get_default_memory_pool().free_all_blocks()
+
+        return {
+            "backend": self.backend.name,
+            "dtype": "float32",
+            "stride": self.stride,
+            "sizes": self.sizes,
+            "curves": curves,
+            "summary": summarize(curves)
+        }
+
+
+def summarize(curves: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Per pattern: the peak, the cache-resident (smallest) and DRAM-sized (largest) bandwidth"""
+    summary = {}
+    for pattern, points in curves.items():
+        if not points:
+            continue
+        peak = max(points, key=lambda p: p["bandwidth_gbps"])
+        summary[pattern] = {
+            "peak_gbps": peak["bandwidth_gbps"],
+            "peak_size_bytes": peak["size_bytes"],
+            "smallest_gbps": points[0]["bandwidth_gbps"],
+            "largest_gbps": points[-1]["bandwidth_gbps"]
+        }
+    return summary
@@ -0,0 +1,196 @@
+"""
+Dynamic Micro-Batching for ONNX Runtime sessions
+Coalesces concurrent small requests into one batched session.run call
+"""
+
+import logging
+import asyncio
+from typing import Dict, Any, List, Callable, Awaitable, Tuple, Hashable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# (model_name, feeds) -> outputs; expected to run session.run off the event loop
+BatchRunner = Callable[[str, Dict[str, Any]], Awaitable[List[Any]]]
+
+# (model_name, per-input (name, trailing shape, dtype)); only requests with equal keys can be concatenated
+QueueKey = Tuple[str, Hashable]
+
+
+@dataclass
+class BatcherStats:
+    requests: int = 0
+    batches: int = 0
+    samples: int = 0
+    size_flushes: int = 0
+    deadline_flushes: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "samples": self.samples,
+            "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0,
+            "size_flushes": self.size_flushes,
+            "deadline_flushes": self.deadline_flushes,
+            "errors": self.errors
+        }
+
+
+class MicroBatcher:
+    """
+    Request queues that flush on max batch size or max wait deadline. Requests
+    are queued per model and per non-batch input shape, so a batch only ever
+    holds feeds that concatenate along the batch axis.
+    """
+
+    def __init__(self, runner: BatchRunner, max_batch_size: int = 8, max_wait_ms: float = 5.0):
+        self.runner = runner
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.stats = BatcherStats()
+        self._queues: Dict[QueueKey, asyncio.Queue] = {}
+        self._workers: Dict[QueueKey, asyncio.Task] = {}
+        self._closed = False
+
+    def configure(self, max_batch_size: int, max_wait_ms: float):
+        """Update flush thresholds; applies to the next batch formed"""
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+
+    async def submit(self, model_name: str, feeds: Dict[str, Any]) -> List[Any]:
+        """Queue one request and wait for its slice of the batched outputs"""
+        if self._closed:
+            raise RuntimeError("Micro-batcher is shut down")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        await self._get_queue((model_name, _shape_key(feeds))).put((feeds, future))
+        self.stats.requests += 1
+        return await future
+
+    def _get_queue(self, key: QueueKey) -> asyncio.Queue:
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue()
+        worker = self._workers.get(key)
+        if worker is None or worker.done():
+            self._workers[key] = asyncio.create_task(self._worker(key))
+        return self._queues[key]
+
+    async def shutdown(self):
+        """Stop the workers and fail requests that never made it into a batch"""
+        self._closed = True
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, future = queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Micro-batcher is shut down"))
+
+    async def _worker(self, key: QueueKey):
+        model_name = key[0]
+        queue = self._queues[key]
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await queue.get()]
+            rows = _batch_rows(batch[0][0])
+            deadline = loop.time() + self.max_wait_ms / 1000
+
+            while rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += _batch_rows(item[0])
+
+            if rows >= self.max_batch_size:
+                self.stats.size_flushes += 1
+            else:
+                self.stats.deadline_flushes += 1
+
+            await self._flush(model_name, batch)
+
+    async def _flush(self, model_name: str, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Run one batched session.run and hand each caller its rows"""
+        sizes = [_batch_rows(feeds) for feeds, _ in batch]
+
+        try:
+            if len(batch) == 1:
+                merged = batch[0][0]
+            else:
+                merged = {
+                    name: np.concatenate([feeds[name] for feeds, _ in batch], axis=0)
+                    for name in batch[0][0]
+                }
+            outputs = await self.runner(model_name, merged)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Micro-batcher is shut down"))
+            raise
+        except Exception as e:
+            logger.error(f"Batched inference error ({model_name}): {e}")
+            self.stats.errors += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats.batches += 1
+        self.stats.samples += sum(sizes)
+
+        total = sum(sizes)
+        offset = 0
+        for (_, future), size in zip(batch, sizes):
+            # Outputs without a leading batch axis are shared by every caller
+            sliced = [
+                out[offset:offset + size] if getattr(out, "ndim", 0) and out.shape[0] == total else out
+                for out in outputs
+            ]
+            offset += size
+            if not future.done():
+                future.set_result(sliced)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_ms"] = self.max_wait_ms
+        queued: Dict[str, int] = {}
+        for (name, _), queue in self._queues.items():
+            queued[name] = queued.get(name, 0) + queue.qsize()
+        stats["queued"] = queued
+        return stats
+
+
+def _batch_rows(feeds: Dict[str, Any]) -> int:
+    """Leading-axis length of a request's feeds"""
+    for value in feeds.values():
+        shape = getattr(value, "shape", None)
+        if shape:
+            return int(shape[0])
+    return 1
+
+
+def _shape_key(feeds: Dict[str, Any]) -> Hashable:
+    """Per-input shape without the batch axis, plus dtype"""
+    return tuple(
+        (name, tuple(getattr(value, "shape", ())[1:]), str(getattr(value, "dtype", type(value).__name__)))
+        for name, value in sorted(feeds.items())
+    )
@@ -6,9 +6,19 @@ Supports: CUDA, TensorRT, Vulkan benchmarks
 import logging
 import time
 import asyncio
+import contextlib
+import inspect
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
-import random
+
+from simulation import get_rng
+from jobs import JobControl, JobCancelled
+from bandwidth import BandwidthSuite
+from multistream import MultiStreamBenchmark
+from cpu_benchmarks import (
+    HAS_NUMPY, CPU_MAX_MATRIX, CPU_MAX_BANDWIDTH_MB, TIME_BUDGET_S, MATMUL_DTYPES,
+    available_cores, cpu_name, blas_info, matmul_gflops, thread_scaling
+)
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +56,7 @@ class BenchmarkResult:
     iterations: int
     details: Dict[str, Any]
     is_real: bool = True
+    backend: str = "cuda"  # cuda, cpu or simulated
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -57,7 +68,8 @@ class BenchmarkResult:
             "temperature": self.temperature,
             "iterations": self.iterations,
             "details": self.details,
-            "is_real": self.is_real
+            "is_real": self.is_real,
+            "backend": self.backend
         }
 
 
@@ -71,11 +83,13 @@ class CUDABenchmark:
                 self.device_name = cp.cuda.Device().name
             except:
                 pass
+        self.cpu = CPUBenchmark() if HAS_NUMPY else None
     
-    async def run_matrix_multiply_benchmark(self, size: int = 4096, iterations: int = 100) -> BenchmarkResult:
+    async def run_matrix_multiply_benchmark(self, size: int = 4096, iterations: int = 100, control: Optional[JobControl] = None) -> BenchmarkResult:
         """Matrix multiplication benchmark - tests raw compute power"""
+        control = control or JobControl()
         if not HAS_CUPY:
-            return self._simulate_benchmark("cuda_matmul", size, iterations)
+            return await self._fallback("cuda_matmul", size, iterations, control)
         
         try:
             # Warm up
@@ -86,8 +100,9 @@ class CUDABenchmark:
             
             # Benchmark
             start_time = time.perf_counter()
-            for _ in range(iterations):
+            for i in range(iterations):
                 c = cp.dot(a, b)
+                control.tick(i + 1, iterations)
             cp.cuda.Stream.null.synchronize()
             end_time = time.perf_counter()
             
@@ -122,14 +137,17 @@ class CUDABenchmark:
                 },
                 is_real=True
             )
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"CUDA benchmark error: {e}")
-            return self._simulate_benchmark("cuda_matmul", size, iterations)
+            return await self._fallback("cuda_matmul", size, iterations, control)
     
-    async def run_memory_bandwidth_benchmark(self, size_mb: int = 1024, iterations: int = 50) -> BenchmarkResult:
+    async def run_memory_bandwidth_benchmark(self, size_mb: int = 1024, iterations: int = 50, control: Optional[JobControl] = None) -> BenchmarkResult:
         """Memory bandwidth benchmark"""
+        control = control or JobControl()
         if not HAS_CUPY:
-            return self._simulate_benchmark("cuda_bandwidth", size_mb, iterations)
+            return await self._fallback("cuda_bandwidth", size_mb, iterations, control)
         
         try:
             size_bytes = size_mb * 1024 * 1024
@@ -142,8 +160,9 @@ class CUDABenchmark:
             
             # Benchmark copy
             start_time = time.perf_counter()
-            for _ in range(iterations):
+            for i in range(iterations):
                 cp.copyto(dst, src)
+                control.tick(i + 1, iterations)
             cp.cuda.Stream.null.synchronize()
             end_time = time.perf_counter()
             
@@ -171,14 +190,17 @@ class CUDABenchmark:
                 },
                 is_real=True
             )
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"Bandwidth benchmark error: {e}")
-            return self._simulate_benchmark("cuda_bandwidth", size_mb, iterations)
+            return await self._fallback("cuda_bandwidth", size_mb, iterations, control)
     
-    async def run_tensor_core_benchmark(self, size: int = 4096, iterations: int = 50) -> BenchmarkResult:
+    async def run_tensor_core_benchmark(self, size: int = 4096, iterations: int = 50, control: Optional[JobControl] = None) -> BenchmarkResult:
         """Tensor Core benchmark (FP16 matrix multiply)"""
+        control = control or JobControl()
         if not HAS_CUPY:
-            return self._simulate_benchmark("tensorrt", size, iterations)
+            return await self._fallback("tensorrt", size, iterations, control)
         
         try:
             # FP16 matrix multiply to utilize Tensor Cores
@@ -188,8 +210,9 @@ class CUDABenchmark:
             cp.cuda.Stream.null.synchronize()
             
             start_time = time.perf_counter()
-            for _ in range(iterations):
+            for i in range(iterations):
                 c = cp.dot(a, b)
+                control.tick(i + 1, iterations)
             cp.cuda.Stream.null.synchronize()
             end_time = time.perf_counter()
             
@@ -222,9 +245,21 @@ class CUDABenchmark:
                 },
                 is_real=True
             )
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"Tensor Core benchmark error: {e}")
-            return self._simulate_benchmark("tensorrt", size, iterations)
+            return await self._fallback("tensorrt", size, iterations, control)
+    
+    async def _fallback(self, benchmark_type: str, param1: int, param2: int, control: JobControl) -> BenchmarkResult:
+        """Real CPU measurement when CUDA is unavailable; random scores only without NumPy"""
+        if self.cpu is None:
+            return self._simulate_benchmark(benchmark_type, param1, param2)
+        if benchmark_type == "cuda_matmul":
+            return await self.cpu.run_matrix_multiply_benchmark(param1, param2, control)
+        if benchmark_type == "cuda_bandwidth":
+            return await self.cpu.run_memory_bandwidth_benchmark(param1, param2, control)
+        return await self.cpu.run_tensor_core_benchmark(param1, param2, control)
     
     def _simulate_benchmark(self, benchmark_type: str, param1: int, param2: int) -> BenchmarkResult:
         """Simulated benchmark when CUDA is not available"""
@@ -238,21 +273,153 @@ class CUDABenchmark:
         
         base = base_scores.get(benchmark_type, base_scores["general"])
         variance = 0.15
+        rng = get_rng("benchmark")
         
         return BenchmarkResult(
             benchmark_type=benchmark_type,
-            score=base["score"] * random.uniform(1 - variance, 1 + variance),
-            fps=base["fps"] * random.uniform(1 - variance, 1 + variance),
+            score=base["score"] * rng.uniform(1 - variance, 1 + variance),
+            fps=base["fps"] * rng.uniform(1 - variance, 1 + variance),
             time_ms=1000 / base["fps"],
-            memory_used_mb=random.uniform(500, 2000),
-            temperature=random.uniform(55, 82),
+            memory_used_mb=rng.uniform(500, 2000),
+            temperature=rng.uniform(55, 82),
             iterations=param2,
             details={
                 "simulated": True,
                 "param1": param1,
                 "param2": param2
             },
-            is_real=False
+            is_real=False,
+            backend="simulated"
+        )
+
+
+class CPUBenchmark:
+    """
+    NumPy/BLAS counterparts of the CUDABenchmark methods. Results are real
+    measurements tagged backend="cpu", so they never mix with GPU numbers.
+    """
+    
+    def __init__(self):
+        self.device_name = cpu_name()
+        self.cores = available_cores()
+    
+    async def run_matrix_multiply_benchmark(self, size: int = 4096, iterations: int = 100, control: Optional[JobControl] = None) -> BenchmarkResult:
+        """Matmul GFLOPS per dtype; FP32 is the headline number"""
+        control = control or JobControl()
+        size = min(size, CPU_MAX_MATRIX)
+        by_dtype = {}
+        for i, dtype in enumerate(MATMUL_DTYPES):
+            tick = lambda done, total: control.tick(i * total + done, len(MATMUL_DTYPES) * total)
+            by_dtype[dtype] = matmul_gflops(size, dtype, iterations, tick, TIME_BUDGET_S / len(MATMUL_DTYPES))
+        fp32 = by_dtype["float32"]
+        
+        return BenchmarkResult(
+            benchmark_type="cpu_matmul",
+            score=fp32["gflops"] * 100,
+            fps=1000 / fp32["time_ms"],
+            time_ms=fp32["time_ms"],
+            memory_used_mb=3 * size * size * 8 / (1024 * 1024),
+            temperature=0,
+            iterations=fp32["iterations"],
+            details={
+                "matrix_size": size,
+                "gflops": fp32["gflops"],
+                "gflops_by_dtype": {dtype: r["gflops"] for dtype, r in by_dtype.items()},
+                "fp16_emulated": True,
+                "device": self.device_name,
+                "cores": self.cores,
+                "blas": blas_info()
+            },
+            is_real=True,
+            backend="cpu"
+        )
+    
+    async def run_memory_bandwidth_benchmark(self, size_mb: int = 1024, iterations: int = 50, control: Optional[JobControl] = None) -> BenchmarkResult:
+        """STREAM copy at a single size, through the bandwidth suite"""
+        control = control or JobControl()
+        size_mb = min(size_mb, CPU_MAX_BANDWIDTH_MB)
+        suite = BandwidthSuite(
+            backend="numpy",
+            patterns=["copy"],
+            min_size_kb=size_mb * 1024,
+            max_size_mb=size_mb,
+            target_ms=TIME_BUDGET_S * 1000,
+            max_repetitions=iterations
+        )
+        point = suite.run(control)["curves"]["copy"][0]
+        
+        return BenchmarkResult(
+            benchmark_type="cpu_bandwidth",
+            score=point["bandwidth_gbps"] * 50,
+            fps=1e6 / point["time_us"],
+            time_ms=point["time_us"] / 1000,
+            memory_used_mb=3 * size_mb,
+            temperature=0,
+            iterations=point["repetitions"],
+            details={
+                "size_mb": size_mb,
+                "bandwidth_gbps": point["bandwidth_gbps"],
+                "mean_gbps": point["mean_gbps"],
+                "device": self.device_name
+            },
+            is_real=True,
+            backend="cpu"
+        )
+    
+    async def run_tensor_core_benchmark(self, size: int = 4096, iterations: int = 50, control: Optional[JobControl] = None) -> BenchmarkResult:
+        """FP16 emulation: half-precision storage, FP32 compute"""
+        control = control or JobControl()
+        size = min(size, CPU_MAX_MATRIX)
+        result = matmul_gflops(size, "float16", iterations, control.tick)
+        
+        return BenchmarkResult(
+            benchmark_type="cpu_fp16",
+            score=result["gflops"],  # TFLOPS * 1000, the Tensor Core score scale
+            fps=1000 / result["time_ms"],
+            time_ms=result["time_ms"],
+            memory_used_mb=3 * size * size * 4 / (1024 * 1024),
+            temperature=0,
+            iterations=result["iterations"],
+            details={
+                "matrix_size": size,
+                "gflops_fp16_emulated": result["gflops"],
+                "device": self.device_name,
+                "precision": "FP16 (emulated via FP32)"
+            },
+            is_real=True,
+            backend="cpu"
+        )
+    
+    async def run_suite(self, control: Optional[JobControl] = None, size: int = CPU_MAX_MATRIX, bandwidth_mb: int = 256, max_threads: Optional[int] = None) -> BenchmarkResult:
+        """The CPU baseline: matmul per dtype, bandwidth and BLAS thread scaling 1..N"""
+        control = control or JobControl()
+        control.begin_stage("cpu_matmul", 0.0, 0.4)
+        matmul = await self.run_matrix_multiply_benchmark(size, 50, control)
+        control.begin_stage("cpu_bandwidth", 0.4, 0.6)
+        bandwidth = await self.run_memory_bandwidth_benchmark(bandwidth_mb, 50, control)
+        control.begin_stage("cpu_thread_scaling", 0.6, 1.0)
+        scaling = thread_scaling(min(size, 1024), 20, control.tick, max_threads)
+        
+        return BenchmarkResult(
+            benchmark_type="cpu",
+            score=matmul.score,
+            fps=matmul.fps,
+            time_ms=matmul.time_ms,
+            memory_used_mb=max(matmul.memory_used_mb, bandwidth.memory_used_mb),
+            temperature=0,
+            iterations=matmul.iterations + bandwidth.iterations,
+            details={
+                "device": self.device_name,
+                "cores": self.cores,
+                "matrix_size": matmul.details["matrix_size"],
+                "gflops": matmul.details["gflops"],
+                "gflops_by_dtype": matmul.details["gflops_by_dtype"],
+                "bandwidth_gbps": bandwidth.details["bandwidth_gbps"],
+                "thread_scaling": scaling,
+                "blas": matmul.details["blas"]
+            },
+            is_real=True,
+            backend="cpu"
         )
 
 
@@ -261,21 +428,106 @@ class BenchmarkRunner:
     
     def __init__(self):
         self.cuda_bench = CUDABenchmark()
+        self.cpu_baseline: Optional[BenchmarkResult] = None  # Latest "cpu" run, for GPU speedups
+    
+    async def run_benchmark(
+        self,
+        benchmark_type: str,
+        control: Optional[JobControl] = None,
+        device: int = 0,
+        params: Optional[Dict[str, Any]] = None
+    ) -> BenchmarkResult:
+        """Run a specific benchmark type on one GPU; control reports progress and cancels"""
+        control = control or JobControl()
+        with cp.cuda.Device(device) if HAS_CUPY else contextlib.nullcontext():
+            result = await self._run_benchmark(benchmark_type, control, params or {})
+        
+        if result.backend == "cpu" and benchmark_type == "cpu":
+            self.cpu_baseline = result
+        elif result.backend == "cuda" and self.cpu_baseline and "gflops" in result.details:
+            result.details["speedup_vs_cpu"] = round(result.details["gflops"] / self.cpu_baseline.details["gflops"], 2)
+        return result
+    
+    def run_bandwidth_suite(self, control: JobControl, **params) -> BenchmarkResult:
+        """Bandwidth curves over buffer sizes; params go to BandwidthSuite"""
+        suite = BandwidthSuite(**params)
+        start_time = time.perf_counter()
+        report = suite.run(control)
+        total_time = time.perf_counter() - start_time
+        
+        # Headline number: DRAM-sized triad, the STREAM convention
+        summary = report["summary"]
+        headline = summary.get("triad") or next(iter(summary.values()), {})
+        points = sum(len(curve) for curve in report["curves"].values())
+        return BenchmarkResult(
+            benchmark_type="bandwidth_suite",
+            score=headline.get("largest_gbps", 0.0) * 50,
+            fps=points / total_time if total_time > 0 else 0.0,
+            time_ms=total_time * 1000,
+            memory_used_mb=3 * suite.sizes[-1] / (1024 * 1024),
+            temperature=0,
+            iterations=points,
+            details={**report, "device": self.cuda_bench.device_name if report["backend"] == "cupy" else cpu_name()},
+            is_real=True,
+            backend="cuda" if report["backend"] == "cupy" else "cpu"
+        )
+    
+    def run_multistream(self, control: JobControl, **params) -> BenchmarkResult:
+        """Matmul throughput with K concurrent streams; params go to MultiStreamBenchmark"""
+        bench = MultiStreamBenchmark(**params)
+        report = bench.run(control)
+        best = next(p for p in report["points"] if p["streams"] == report["best_streams"])
+        return BenchmarkResult(
+            benchmark_type="multistream",
+            score=report["peak_gflops"] * 100,  # Same scale as cuda_matmul
+            fps=best["throughput"],
+            time_ms=best["latency"]["mean_ms"],
+            memory_used_mb=3 * bench.size * bench.size * 4 * max(bench.stream_counts) / (1024 * 1024),
+            temperature=0,
+            iterations=sum(p["ops"] for p in report["points"]),
+            details={**report, "device": self.cuda_bench.device_name if report["backend"] == "cupy" else cpu_name()},
+            is_real=True,
+            backend="cuda" if report["backend"] == "cupy" else "cpu"
+        )
+    
+    @staticmethod
+    def validate_params(benchmark_type: str, params: Dict[str, Any]):
+        """Raises TypeError/ValueError for params the benchmark would reject, before it is queued"""
+        if benchmark_type == "bandwidth":
+            BandwidthSuite(**params)
+        elif benchmark_type == "multistream":
+            MultiStreamBenchmark(**params)
+        elif benchmark_type == "cpu":
+            inspect.signature(CPUBenchmark.run_suite).bind(None, None, **params)
     
-    async def run_benchmark(self, benchmark_type: str) -> BenchmarkResult:
-        """Run a specific benchmark type"""
-        if benchmark_type == "cuda":
-            return await self.cuda_bench.run_matrix_multiply_benchmark()
+    async def _run_benchmark(self, benchmark_type: str, control: JobControl, params: Dict[str, Any]) -> BenchmarkResult:
+        if benchmark_type == "bandwidth":
+            control.begin_stage("bandwidth_suite")
+            return self.run_bandwidth_suite(control, **params)
+        elif benchmark_type == "multistream":
+            control.begin_stage("multistream")
+            return self.run_multistream(control, **params)
+        elif benchmark_type == "cpu":
+            if self.cuda_bench.cpu is None:
+                raise ValueError("CPU benchmarks need NumPy")
+            return await self.cuda_bench.cpu.run_suite(control, **params)
+        elif benchmark_type == "cuda":
+            control.begin_stage("cuda_matmul")
+            return await self.cuda_bench.run_matrix_multiply_benchmark(control=control)
         elif benchmark_type == "tensorrt":
-            return await self.cuda_bench.run_tensor_core_benchmark()
+            control.begin_stage("tensorrt")
+            return await self.cuda_bench.run_tensor_core_benchmark(control=control)
         elif benchmark_type == "vulkan":
             # Vulkan benchmark - simulate for now
+            control.begin_stage("vulkan")
             return self.cuda_bench._simulate_benchmark("vulkan", 1920, 100)
         elif benchmark_type == "general":
             # Run all and average
             results = []
-            results.append(await self.cuda_bench.run_matrix_multiply_benchmark(2048, 50))
-            results.append(await self.cuda_bench.run_memory_bandwidth_benchmark(512, 25))
+            control.begin_stage("cuda_matmul", 0.0, 0.5)
+            results.append(await self.cuda_bench.run_matrix_multiply_benchmark(2048, 50, control))
+            control.begin_stage("cuda_bandwidth", 0.5, 1.0)
+            results.append(await self.cuda_bench.run_memory_bandwidth_benchmark(512, 25, control))
             
             avg_score = sum(r.score for r in results) / len(results)
             avg_fps = sum(r.fps for r in results) / len(results)
@@ -292,7 +544,8 @@ class BenchmarkRunner:
                     "tests_run": [r.benchmark_type for r in results],
                     "individual_scores": {r.benchmark_type: r.score for r in results}
                 },
-                is_real=all(r.is_real for r in results)
+                is_real=all(r.is_real for r in results),
+                backend=results[0].backend if len({r.backend for r in results}) == 1 else "mixed"
             )
         else:
             raise ValueError(f"Unknown benchmark type: {benchmark_type}")
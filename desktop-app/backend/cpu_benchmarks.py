@@ -0,0 +1,141 @@
+"""
+CPU Benchmarks - real NumPy/BLAS measurements for nodes without CUDA
+Matmul GFLOPS per dtype, FP16 emulation and BLAS thread scaling
+"""
+
+import contextlib
+import logging
+import os
+import platform
+import time
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    from threadpoolctl import threadpool_limits, threadpool_info
+    HAS_THREADPOOLCTL = True
+except ImportError:
+    HAS_THREADPOOLCTL = False
+
+CPU_MAX_MATRIX = 2048  # GPU-sized 4096^3 matmuls take seconds per iteration on a CPU
+CPU_MAX_BANDWIDTH_MB = 256  # Three buffers of this size; far past any CPU cache
+TIME_BUDGET_S = 2.0  # Per measurement; iteration counts are upper bounds
+MATMUL_DTYPES = ("float64", "float32", "float16")
+
+Tick = Callable[[int, int], None]
+
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def cpu_name() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "CPU"
+
+
+def thread_counts(max_threads: int) -> List[int]:
+    """1, 2, 4, ... up to and including max_threads"""
+    counts = []
+    n = 1
+    while n < max_threads:
+        counts.append(n)
+        n *= 2
+    counts.append(max_threads)
+    return counts
+
+
+def blas_threads(threads: Optional[int]):
+    """Context manager limiting BLAS to `threads`; a no-op without threadpoolctl"""
+    if threads is None or not HAS_THREADPOOLCTL:
+        return contextlib.nullcontext()
+    return threadpool_limits(limits=threads, user_api="blas")
+
+
+def blas_info() -> Dict[str, Any]:
+    if not HAS_THREADPOOLCTL:
+        return {"threadpoolctl": False}
+    pools = [p for p in threadpool_info() if p.get("user_api") == "blas"]
+    if not pools:
+        return {"threadpoolctl": True}
+    return {
+        "threadpoolctl": True,
+        "library": pools[0].get("internal_api"),
+        "version": pools[0].get("version"),
+        "threads": pools[0].get("num_threads")
+    }
+
+
+def timed_loop(fn: Callable[[], Any], iterations: int, tick: Tick, budget_s: float = TIME_BUDGET_S) -> Tuple[float, int]:
+    """Runs fn until `iterations` or the time budget is reached; returns (seconds, iterations run)"""
+    fn()  # Warm up: BLAS thread pool start, page faults
+    done = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while done < iterations:
+        fn()
+        done += 1
+        tick(done, iterations)
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget_s:
+            break
+    return elapsed, done
+
+
+def matmul_gflops(size: int, dtype: str, iterations: int, tick: Tick, budget_s: float = TIME_BUDGET_S) -> Dict[str, Any]:
+    """
+    Square matmul throughput. CPUs have no FP16 BLAS, so float16 is emulated the
+    way inference runtimes do it: FP16 storage, FP32 compute, rounded back.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.random((size, size)).astype(dtype)
+    b = rng.random((size, size)).astype(dtype)
+    if dtype == "float16":
+        fn = lambda: np.matmul(a.astype(np.float32), b.astype(np.float32)).astype(np.float16)
+    else:
+        out = np.empty((size, size), dtype=dtype)
+        fn = lambda: np.matmul(a, b, out=out)
+    total_time, done = timed_loop(fn, iterations, tick, budget_s)
+    return {
+        "gflops": round(2 * size ** 3 * done / total_time / 1e9, 2),
+        "time_ms": round(total_time * 1000 / done, 3),
+        "iterations": done
+    }
+
+
+def thread_scaling(size: int, iterations: int, tick: Tick, max_threads: Optional[int] = None, budget_s: float = 1.0) -> Dict[str, Any]:
+    """FP32 matmul GFLOPS with BLAS limited to 1, 2, 4, ... N threads"""
+    cores = available_cores()
+    if HAS_THREADPOOLCTL:
+        counts = thread_counts(min(max_threads or cores, cores))
+    else:
+        logger.warning("threadpoolctl not installed - BLAS thread scaling cannot be measured")
+        counts = [None]
+
+    points = []
+    for i, threads in enumerate(counts):
+        with blas_threads(threads):
+            result = matmul_gflops(size, "float32", iterations, lambda d, t: tick(i * t + d, len(counts) * t), budget_s)
+        points.append({"threads": threads, "gflops": result["gflops"], "time_ms": result["time_ms"]})
+
+    base = points[0]["gflops"]
+    for point in points:
+        if point["threads"]:
+            point["speedup"] = round(point["gflops"] / base, 2) if base else 0.0
+            point["efficiency"] = round(point["speedup"] / point["threads"], 2)
+    return {"matrix_size": size, "cores": cores, "points": points, "blas": blas_info()}
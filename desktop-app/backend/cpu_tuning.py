@@ -0,0 +1,105 @@
+"""
+CPU Execution Tuning - ONNX Runtime thread pools, spinning and core affinity
+Plus a sweep that finds the fastest thread configuration for a model
+"""
+
+import logging
+import os
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("sequential", "parallel")
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+
+def numa_node_cores(node: int) -> List[int]:
+    """Logical CPUs of a NUMA node (Linux sysfs); empty when unknown"""
+    cpulist = Path(f"/sys/devices/system/node/node{node}/cpulist")
+    if not cpulist.exists():
+        return []
+    cores = []
+    for part in cpulist.read_text().strip().split(","):
+        if "-" in part:
+            low, high = part.split("-")
+            cores.extend(range(int(low), int(high) + 1))
+        elif part:
+            cores.append(int(part))
+    return cores
+
+
+@dataclass
+class CpuTuning:
+    intra_op_threads: int = 0  # 0 = ORT default (physical cores)
+    inter_op_threads: int = 0
+    execution_mode: str = "sequential"  # sequential, parallel
+    allow_spinning: bool = True
+    cores: List[int] = field(default_factory=list)  # 0-based logical CPUs to pin intra-op workers to
+    numa_node: Optional[int] = None  # Pin to this node's cores when cores is empty
+
+    def __post_init__(self):
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode {self.execution_mode}. Valid: {list(EXECUTION_MODES)}")
+        if self.intra_op_threads < 0 or self.inter_op_threads < 0:
+            raise ValueError("Thread counts must be 0 (default) or positive")
+
+    def resolved_cores(self) -> List[int]:
+        cores = self.cores or (numa_node_cores(self.numa_node) if self.numa_node is not None else [])
+        if cores and hasattr(os, "sched_getaffinity"):
+            allowed = os.sched_getaffinity(0)
+            usable = [c for c in cores if c in allowed]
+            if len(usable) < len(cores):
+                logger.warning(f"Ignoring cores outside this process's CPU set: {sorted(set(cores) - allowed)}")
+            cores = usable
+        return cores
+
+    def apply(self, options):
+        """Configure an ort.SessionOptions in place"""
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = (
+            ort.ExecutionMode.ORT_PARALLEL if self.execution_mode == "parallel"
+            else ort.ExecutionMode.ORT_SEQUENTIAL
+        )
+        spinning = "1" if self.allow_spinning else "0"
+        options.add_session_config_entry("session.intra_op.allow_spinning", spinning)
+        options.add_session_config_entry("session.inter_op.allow_spinning", spinning)
+
+        cores = self.resolved_cores()
+        threads = self.intra_op_threads or len(cores)
+        if cores and threads > 1:
+            # ORT pins the (threads - 1) pool workers; the calling thread is the remaining one.
+            # Processor ids in this setting are 1-based.
+            workers = [cores[i % len(cores)] + 1 for i in range(1, threads)]
+            options.intra_op_num_threads = threads
+            options.add_session_config_entry(
+                "session.intra_op_thread_affinities", ";".join(str(c) for c in workers)
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def candidate_configs(max_threads: Optional[int] = None) -> List[CpuTuning]:
+    """Thread counts in powers of two up to the CPU count, with and without spinning"""
+    max_threads = max_threads or os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < max_threads:
+        counts.append(n)
+        n *= 2
+    counts.append(max_threads)
+
+    candidates = []
+    for threads in counts:
+        for spinning in (True, False):
+            candidates.append(CpuTuning(intra_op_threads=threads, allow_spinning=spinning))
+    # Parallel execution only pays off for graphs with independent branches
+    candidates.append(CpuTuning(intra_op_threads=max(1, max_threads // 2), inter_op_threads=2, execution_mode="parallel"))
+    return candidates
@@ -0,0 +1,205 @@
+"""
+Engine Cache - Persisted ONNX Runtime optimized graphs and TensorRT engines
+Avoids re-running graph optimization / engine builds on every process start
+"""
+
+import logging
+import json
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ORT_VERSION = "unknown"
+try:
+    import onnxruntime as ort
+    ORT_VERSION = ort.__version__
+except ImportError:
+    ort = None
+
+MANIFEST_FILE = "manifest.json"
+OPTIMIZED_MODEL_FILE = "optimized.onnx"
+TRT_PROVIDER = 'TensorrtExecutionProvider'
+
+
+def parse_shape_spec(spec: Optional[str]) -> Dict[str, List[int]]:
+    """Parse TensorRT-style shape specs: 'input:1x3x224x224,mask:1x128'"""
+    shapes: Dict[str, List[int]] = {}
+    if not spec:
+        return shapes
+    for item in spec.split(","):
+        name, _, dims = item.strip().rpartition(":")
+        if not name or not dims:
+            raise ValueError(f"Invalid shape spec: {item!r}")
+        shapes[name] = [int(d) for d in dims.split("x")]
+    return shapes
+
+
+def format_shape_spec(shapes: Dict[str, List[int]]) -> str:
+    return ",".join(f"{name}:{'x'.join(str(d) for d in dims)}" for name, dims in sorted(shapes.items()))
+
+
+@dataclass
+class CachePlan:
+    """How to build one session against the cache"""
+    key: str
+    model_path: Path  # Original model, or the cached optimized graph
+    providers: List[Any]  # Provider names or (name, options) tuples
+    cache_hit: bool
+    pending_optimized: Optional[Path] = None  # Written by ORT, promoted on success
+
+
+class EngineCache:
+    """On-disk cache keyed by model hash, provider, input shape and, for TensorRT, precision"""
+
+    def __init__(self, root: Path, enabled: bool = True):
+        self.root = Path(root)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_hash: str, provider: str, precision: str, input_shapes: Dict[str, List[int]]) -> str:
+        # Precision only changes what TensorRT builds; CPU/CUDA optimize the same graph either way
+        precision = precision if provider == TRT_PROVIDER else "any"
+        raw = "|".join([model_hash, provider, precision, format_shape_spec(input_shapes) or "dynamic", ORT_VERSION])
+        return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+    def plan(
+        self,
+        model_path: Path,
+        model_hash: str,
+        providers: List[str],
+        precision: str,
+        input_shapes: Dict[str, List[int]],
+        session_options
+    ) -> CachePlan:
+        """Point session options / provider options at the cache entry for this build"""
+        primary = providers[0]
+        key = self.make_key(model_hash, primary, precision, input_shapes)
+        entry_dir = self.root / key
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        self._write_manifest(entry_dir, key, model_path, model_hash, primary, precision, input_shapes)
+
+        if primary == TRT_PROVIDER:
+            # TensorRT keeps engine + timing caches itself; we only pin the directory
+            cache_hit = any(entry_dir.glob("*.engine"))
+            trt_options = {
+                'trt_engine_cache_enable': True,
+                'trt_engine_cache_path': str(entry_dir),
+                'trt_timing_cache_enable': True,
+                'trt_timing_cache_path': str(entry_dir),
+                'trt_fp16_enable': precision == "FP16",
+                'trt_int8_enable': precision == "INT8"
+            }
+            if input_shapes:
+                profile = format_shape_spec(input_shapes)
+                trt_options['trt_profile_min_shapes'] = profile
+                trt_options['trt_profile_opt_shapes'] = profile
+                trt_options['trt_profile_max_shapes'] = profile
+            plan = CachePlan(key, model_path, [(primary, trt_options)] + providers[1:], cache_hit)
+        else:
+            optimized = entry_dir / OPTIMIZED_MODEL_FILE
+            if optimized.exists():
+                # Graph is already optimized for this provider; skip the optimizer entirely
+                session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+                plan = CachePlan(key, optimized, providers, True)
+            else:
+                # Unique per build: concurrent loads of the same content share the entry directory
+                fd, pending = tempfile.mkstemp(dir=entry_dir, prefix=OPTIMIZED_MODEL_FILE + ".", suffix=".tmp")
+                os.close(fd)
+                pending = Path(pending)
+                session_options.optimized_model_filepath = str(pending)
+                plan = CachePlan(key, model_path, providers, False, pending_optimized=pending)
+
+        if plan.cache_hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return plan
+
+    def commit(self, plan: CachePlan):
+        """Promote the optimized graph ORT just wrote, once the session built successfully"""
+        pending = plan.pending_optimized
+        if not pending or not pending.exists():
+            return
+        if pending.stat().st_size == 0:
+            pending.unlink()  # ORT did not write an optimized graph
+            return
+        pending.replace(pending.parent / OPTIMIZED_MODEL_FILE)
+
+    def discard(self, plan: CachePlan):
+        """Drop whatever this build left behind; a failing cache hit is removed entirely"""
+        if plan.cache_hit:
+            shutil.rmtree(self.root / plan.key, ignore_errors=True)
+        elif plan.pending_optimized and plan.pending_optimized.exists():
+            plan.pending_optimized.unlink()
+
+    def _write_manifest(
+        self,
+        entry_dir: Path,
+        key: str,
+        model_path: Path,
+        model_hash: str,
+        provider: str,
+        precision: str,
+        input_shapes: Dict[str, List[int]]
+    ):
+        manifest = entry_dir / MANIFEST_FILE
+        if manifest.exists():
+            return
+        with open(manifest, 'w') as f:
+            json.dump({
+                "key": key,
+                "model_path": str(model_path),
+                "model_hash": model_hash,
+                "provider": provider,
+                "precision": precision if provider == TRT_PROVIDER else "any",
+                "input_shapes": input_shapes,
+                "ort_version": ORT_VERSION,
+                "created_at": time.time()
+            }, f, indent=2)
+
+    def list_entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        if not self.root.exists():
+            return entries
+        for manifest in self.root.glob(f"*/{MANIFEST_FILE}"):
+            try:
+                with open(manifest) as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Unreadable cache manifest {manifest}: {e}")
+                continue
+            size = sum(p.stat().st_size for p in manifest.parent.iterdir() if p.is_file())
+            data["size_mb"] = round(size / (1024 * 1024), 2)
+            entries.append(data)
+        return entries
+
+    def invalidate(self, model_hash: Optional[str] = None) -> int:
+        """Delete cache entries for a model (hash prefix), or everything when None"""
+        removed = 0
+        for entry in self.list_entries():
+            if model_hash is None or entry.get("model_hash", "").startswith(model_hash):
+                shutil.rmtree(self.root / entry["key"], ignore_errors=True)
+                removed += 1
+        logger.info(f"Engine cache invalidated: {removed} entries")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = self.list_entries()
+        return {
+            "enabled": self.enabled,
+            "root": str(self.root),
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "total_mb": round(sum(e["size_mb"] for e in entries), 2),
+            "items": entries
+        }
@@ -0,0 +1,164 @@
+"""
+Inference Executor - Bounded thread pool for ONNX Runtime calls
+Keeps session.run off the event loop with per-model concurrency limits
+"""
+
+import logging
+import time
+import asyncio
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# (model_name, semaphore) set by model_limit; tasks spawned inside the block inherit it
+_override: contextvars.ContextVar[Optional[Tuple[str, asyncio.Semaphore]]] = contextvars.ContextVar(
+    "executor_override", default=None
+)
+
+
+@dataclass
+class ModelQueueStats:
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    total_run_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait_ms / finished, 2) if finished else 0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "avg_run_ms": round(self.total_run_ms / finished, 2) if finished else 0
+        }
+
+
+class InferenceExecutor:
+    """Runs blocking inference work on a dedicated pool, never on the event loop"""
+
+    def __init__(self, max_workers: int = 4, per_model_limit: int = 1):
+        self.max_workers = max(1, max_workers)
+        self.per_model_limit = max(1, per_model_limit)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._exclusive: Dict[str, asyncio.Lock] = {}
+        self._held: Dict[str, int] = {}  # Models held by model_limit -> slots taken
+        self._stats: Dict[str, ModelQueueStats] = {}
+
+    def configure(self, max_workers: int, per_model_limit: int):
+        """Resize the pool and per-model limits; in-flight work finishes on the old pool"""
+        max_workers = max(1, max_workers)
+        per_model_limit = max(1, per_model_limit)
+        if max_workers != self.max_workers:
+            old_pool = self._pool
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+            old_pool.shutdown(wait=False)
+            self.max_workers = max_workers
+        if per_model_limit != self.per_model_limit:
+            # New semaphores apply to requests that arrive after this call; a model
+            # held by model_limit keeps its semaphore until the hold is released
+            self._limits = {name: sem for name, sem in self._limits.items() if name in self._held}
+            self.per_model_limit = per_model_limit
+
+    def _model_semaphore(self, model_name: str) -> asyncio.Semaphore:
+        limit = self._limits.get(model_name)
+        if limit is None:
+            limit = self._limits[model_name] = asyncio.Semaphore(self.per_model_limit)
+        return limit
+
+    @contextlib.asynccontextmanager
+    async def model_limit(self, model_name: str, limit: int):
+        """
+        Hold a model exclusively with its own concurrency limit (e.g. for a stream
+        sweep). Waits for in-flight requests to drain and takes every regular
+        slot, so other traffic queues until the block exits; only work started
+        from inside the block runs, under `limit`.
+        """
+        lock = self._exclusive.setdefault(model_name, asyncio.Lock())
+        async with lock:
+            regular = self._model_semaphore(model_name)
+            slots = self.per_model_limit
+            acquired = 0
+            try:
+                for _ in range(slots):
+                    await regular.acquire()
+                    acquired += 1
+                self._held[model_name] = slots
+                token = _override.set((model_name, asyncio.Semaphore(max(1, limit))))
+                try:
+                    yield
+                finally:
+                    _override.reset(token)
+            finally:
+                self._held.pop(model_name, None)
+                for _ in range(acquired):
+                    regular.release()
+                if slots != self.per_model_limit and self._limits.get(model_name) is regular:
+                    del self._limits[model_name]  # Resized while held; next request gets a fresh one
+
+    async def run(self, model_name: str, fn: Callable, *args) -> Any:
+        """Run fn(*args) on the pool, waiting for a free slot for model_name"""
+        stats = self._stats.setdefault(model_name, ModelQueueStats())
+        override = _override.get()
+        if override and override[0] == model_name:
+            limit = override[1]
+        else:
+            limit = self._model_semaphore(model_name)
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        started = None
+        stats.queued += 1
+
+        def mark_started():
+            stats.queued -= 1
+            stats.running += 1
+
+        def timed_call():
+            nonlocal started
+            started = time.perf_counter()
+            loop.call_soon_threadsafe(mark_started)
+            return fn(*args)
+
+        try:
+            async with limit:
+                result = await loop.run_in_executor(self._pool, timed_call)
+            stats.completed += 1
+            return result
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            if started is None:
+                # Cancelled or failed before reaching a worker thread
+                stats.queued -= 1
+            else:
+                # mark_started is queued ahead of us on the loop, so running is already counted
+                stats.running -= 1
+                # Wait covers both the per-model slot and the shared pool queue
+                wait_ms = (started - submitted) * 1000
+                stats.total_wait_ms += wait_ms
+                stats.max_wait_ms = max(stats.max_wait_ms, wait_ms)
+                stats.total_run_ms += (time.perf_counter() - started) * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "per_model_limit": self.per_model_limit,
+            "held_models": list(self._held),
+            "queue_depth": sum(s.queued for s in self._stats.values()),
+            "models": {name: s.to_dict() for name, s in self._stats.items()}
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
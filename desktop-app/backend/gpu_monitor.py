@@ -4,9 +4,12 @@ Uses pynvml to read actual NVIDIA GPU data
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 import subprocess
+import threading
+import time
+import os
 import re
 
 logger = logging.getLogger(__name__)
@@ -21,6 +24,22 @@ try:
 except Exception as e:
     logger.warning(f"NVML not available: {e} - Using simulation mode")
 
+# Override to point at a specific binary (or a fake script on GPU-less machines)
+NVIDIA_SMI = os.environ.get('NVIDIA_SMI_PATH', 'nvidia-smi')
+
+# First column is always the GPU index so one call can answer for every device
+SMI_DYNAMIC_FIELDS = 'index,memory.total,memory.used,memory.free,temperature.gpu,power.draw,power.limit,utilization.gpu,utilization.memory,clocks.gr,clocks.mem,fan.speed,pcie.link.gen.current,pcie.link.width.current'
+SMI_STATIC_FIELDS = 'index,name,driver_version,memory.total,pcie.link.gen.max,pcie.link.width.max'
+
+SIMULATED_STATIC = {
+    "name": "NVIDIA GeForce RTX 5090 (Simulated)",
+    "driver_version": "560.94",
+    "cuda_version": "12.6",
+    "memory_total": 32.0,
+    "pcie_max_gen": 5,
+    "pcie_max_width": 16
+}
+
 
 @dataclass
 class GPUInfo:
@@ -64,14 +83,187 @@ class GPUInfo:
         }
 
 
+def _smi_number(value: str) -> float:
+    value = value.strip()
+    return 0.0 if value.startswith('[') or value in ('', 'N/A') else float(value)
+
+
+def query_nvidia_smi(fields: str, device_index: Optional[int] = None) -> Dict[int, List[str]]:
+    """One nvidia-smi call; remaining columns keyed by GPU index"""
+    cmd = [NVIDIA_SMI, f'--query-gpu={fields}', '--format=csv,noheader,nounits']
+    if device_index is not None:
+        cmd += ['-i', str(device_index)]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"nvidia-smi exited with {result.returncode}")
+
+    rows = {}
+    for line in result.stdout.strip().splitlines():
+        values = [v.strip() for v in line.split(',')]
+        rows[int(values[0])] = values[1:]
+    return rows
+
+
+def nvidia_smi_cuda_version() -> str:
+    """The CUDA driver version is only printed in nvidia-smi's banner"""
+    result = subprocess.run([NVIDIA_SMI], capture_output=True, text=True, timeout=5)
+    match = re.search(r'CUDA Version:\s*([\d.]+)', result.stdout)
+    return match.group(1) if match else "unknown"
+
+
+def gpu_info_from_smi(values: List[str], static: Dict[str, Any]) -> GPUInfo:
+    """Build GPUInfo from one SMI_DYNAMIC_FIELDS row (index column already stripped)"""
+    return GPUInfo(
+        name=static["name"],
+        driver_version=static["driver_version"],
+        cuda_version=static["cuda_version"],
+        memory_total=round(_smi_number(values[0]) / 1024, 2),  # Convert MB to GB
+        memory_used=round(_smi_number(values[1]) / 1024, 2),
+        memory_free=round(_smi_number(values[2]) / 1024, 2),
+        temperature=_smi_number(values[3]),
+        power_usage=_smi_number(values[4]),
+        power_limit=_smi_number(values[5]),
+        utilization=_smi_number(values[6]),
+        memory_utilization=_smi_number(values[7]),
+        clock_speed=_smi_number(values[8]),
+        memory_clock=_smi_number(values[9]),
+        fan_speed=_smi_number(values[10]),
+        pcie_gen=int(_smi_number(values[11])),
+        pcie_width=int(_smi_number(values[12])),
+        is_real=True
+    )
+
+
+class NvidiaSmiStream:
+    """
+    One long-lived `nvidia-smi --query-gpu ... -lms <interval>` process whose CSV
+    rows are parsed as they arrive. Restarts with backoff if the process dies.
+    """
+    
+    def __init__(self, interval_ms: int = 1000, fields: str = SMI_DYNAMIC_FIELDS):
+        self.interval_ms = max(50, interval_ms)
+        self.fields = fields
+        self._ncols = len(fields.split(','))
+        self._rows: Dict[int, Tuple[List[str], float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._process: Optional[subprocess.Popen] = None
+        self.lines = 0
+        self.parse_errors = 0
+        self.restarts = 0
+        self.last_error = ""
+        self.last_stderr = ""
+    
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="nvidia-smi-stream", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        process = self._process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+    
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            parsed = self._read_process()
+            if self._stop.is_set():
+                break
+            failures = 0 if parsed else failures + 1
+            self.restarts += 1
+            delay = min(30.0, 0.5 * 2 ** failures)
+            logger.warning(f"nvidia-smi stream exited ({self.last_error or 'EOF'}); restarting in {delay}s")
+            self._stop.wait(delay)
+    
+    def _read_process(self) -> int:
+        """Run one nvidia-smi process to completion; returns rows parsed"""
+        cmd = [NVIDIA_SMI, f'--query-gpu={self.fields}', '--format=csv,noheader,nounits', '-lms', str(self.interval_ms)]
+        parsed = 0
+        try:
+            self._process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1
+            )
+            stderr_reader = threading.Thread(
+                target=self._log_stderr, args=(self._process,), name="nvidia-smi-stderr", daemon=True
+            )
+            stderr_reader.start()
+            for line in self._process.stdout:
+                if self._parse_line(line):
+                    parsed += 1
+            code = self._process.wait()
+            stderr_reader.join(timeout=1)
+            self.last_error = f"exit code {code}" + (f": {self.last_stderr}" if code and self.last_stderr else "")
+        except Exception as e:
+            self.last_error = str(e)
+        finally:
+            if self._process and self._process.poll() is None:
+                self._process.kill()
+        return parsed
+    
+    def _log_stderr(self, process: subprocess.Popen):
+        """Drain stderr so a failing nvidia-smi can be diagnosed (and never blocks on a full pipe)"""
+        for line in process.stderr:
+            line = line.strip()
+            if line:
+                self.last_stderr = line
+                logger.warning(f"nvidia-smi: {line}")
+    
+    def _parse_line(self, line: str) -> bool:
+        values = [v.strip() for v in line.split(',')]
+        if len(values) != self._ncols:
+            if line.strip():
+                self.parse_errors += 1
+            return False
+        try:
+            index = int(values[0])
+        except ValueError:
+            self.parse_errors += 1
+            return False
+        with self._lock:
+            self._rows[index] = (values[1:], time.time())
+        self.lines += 1
+        return True
+    
+    def rows(self) -> Dict[int, List[str]]:
+        """Latest row per GPU, dropping rows too old to trust"""
+        max_age = max(3 * self.interval_ms / 1000, 5.0)
+        now = time.time()
+        with self._lock:
+            return {index: values for index, (values, at) in self._rows.items() if now - at <= max_age}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._process and self._process.poll() is None),
+            "interval_ms": self.interval_ms,
+            "lines": self.lines,
+            "parse_errors": self.parse_errors,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "last_stderr": self.last_stderr
+        }
+
+
 class GPUMonitor:
     """Monitor NVIDIA GPU using NVML or nvidia-smi fallback"""
     
-    def __init__(self, device_index: int = 0):
+    def __init__(self, device_index: int = 0, use_nvml: bool = True):
         self.device_index = device_index
         self.handle = None
+        self._static: Optional[Dict[str, Any]] = None
         
-        if HAS_NVML:
+        if HAS_NVML and use_nvml:
             try:
                 device_count = pynvml.nvmlDeviceGetCount()
                 if device_index < device_count:
@@ -87,20 +279,69 @@ class GPUMonitor:
         else:
             return self._get_nvidia_smi_info()
     
+    def get_static_info(self) -> Dict[str, Any]:
+        """
+        Properties fixed while the driver is loaded; queried once per device.
+        A failed nvidia-smi query is not cached, so the next call retries it.
+        """
+        if self._static is None:
+            if self.handle and HAS_NVML:
+                self._static = self._get_nvml_static()
+            else:
+                static = self._get_nvidia_smi_static()
+                if static is None:
+                    return dict(SIMULATED_STATIC)
+                self._static = static
+        return self._static
+    
+    def _get_nvml_static(self) -> Dict[str, Any]:
+        name = pynvml.nvmlDeviceGetName(self.handle)
+        if isinstance(name, bytes):
+            name = name.decode('utf-8')
+        
+        driver_version = pynvml.nvmlSystemGetDriverVersion()
+        if isinstance(driver_version, bytes):
+            driver_version = driver_version.decode('utf-8')
+        
+        cuda_version = pynvml.nvmlSystemGetCudaDriverVersion_v2()
+        
+        try:
+            pcie_max_gen = pynvml.nvmlDeviceGetMaxPcieLinkGeneration(self.handle)
+            pcie_max_width = pynvml.nvmlDeviceGetMaxPcieLinkWidth(self.handle)
+        except:
+            pcie_max_gen = 0
+            pcie_max_width = 0
+        
+        return {
+            "name": name,
+            "driver_version": driver_version,
+            "cuda_version": f"{cuda_version // 1000}.{(cuda_version % 1000) // 10}",
+            "memory_total": round(pynvml.nvmlDeviceGetMemoryInfo(self.handle).total / (1024 ** 3), 2),
+            "pcie_max_gen": pcie_max_gen,
+            "pcie_max_width": pcie_max_width
+        }
+    
+    def _get_nvidia_smi_static(self) -> Optional[Dict[str, Any]]:
+        try:
+            values = query_nvidia_smi(SMI_STATIC_FIELDS, self.device_index)[self.device_index]
+            return {
+                "name": values[0],
+                "driver_version": values[1],
+                "cuda_version": nvidia_smi_cuda_version(),
+                "memory_total": round(_smi_number(values[2]) / 1024, 2),
+                "pcie_max_gen": int(_smi_number(values[3])),
+                "pcie_max_width": int(_smi_number(values[4]))
+            }
+        except FileNotFoundError:
+            logger.warning("nvidia-smi not found")
+        except Exception as e:
+            logger.error(f"nvidia-smi error: {e}")
+        return None
+    
     def _get_nvml_info(self) -> GPUInfo:
-        """Get GPU info using NVML (fastest method)"""
+        """Get GPU info using NVML (fastest method); static fields come from the cache"""
         try:
-            # Basic info
-            name = pynvml.nvmlDeviceGetName(self.handle)
-            if isinstance(name, bytes):
-                name = name.decode('utf-8')
-            
-            driver_version = pynvml.nvmlSystemGetDriverVersion()
-            if isinstance(driver_version, bytes):
-                driver_version = driver_version.decode('utf-8')
-            
-            cuda_version = pynvml.nvmlSystemGetCudaDriverVersion_v2()
-            cuda_version_str = f"{cuda_version // 1000}.{(cuda_version % 1000) // 10}"
+            static = self.get_static_info()
             
             # Memory
             memory = pynvml.nvmlDeviceGetMemoryInfo(self.handle)
@@ -147,9 +388,9 @@ class GPUMonitor:
                 pcie_width = 0
             
             return GPUInfo(
-                name=name,
-                driver_version=driver_version,
-                cuda_version=cuda_version_str,
+                name=static["name"],
+                driver_version=static["driver_version"],
+                cuda_version=static["cuda_version"],
                 memory_total=round(memory_total, 2),
                 memory_used=round(memory_used, 2),
                 memory_free=round(memory_free, 2),
@@ -172,40 +413,10 @@ class GPUMonitor:
     def _get_nvidia_smi_info(self) -> GPUInfo:
         """Fallback: Get GPU info using nvidia-smi command"""
         try:
-            result = subprocess.run(
-                ['nvidia-smi', '--query-gpu=name,driver_version,memory.total,memory.used,memory.free,temperature.gpu,power.draw,power.limit,utilization.gpu,utilization.memory,clocks.gr,clocks.mem,fan.speed,pcie.link.gen.current,pcie.link.width.current',
-                 '--format=csv,noheader,nounits'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if result.returncode == 0:
-                values = result.stdout.strip().split(', ')
-                if len(values) >= 15:
-                    # Get CUDA version separately
-                    cuda_result = subprocess.run(['nvidia-smi', '--query-gpu=driver_version', '--format=csv,noheader'], capture_output=True, text=True)
-                    cuda_version = "12.0"  # Default
-                    
-                    return GPUInfo(
-                        name=values[0].strip(),
-                        driver_version=values[1].strip(),
-                        cuda_version=cuda_version,
-                        memory_total=float(values[2]) / 1024,  # Convert MB to GB
-                        memory_used=float(values[3]) / 1024,
-                        memory_free=float(values[4]) / 1024,
-                        temperature=float(values[5]),
-                        power_usage=float(values[6]) if values[6].strip() != '[N/A]' else 0,
-                        power_limit=float(values[7]) if values[7].strip() != '[N/A]' else 0,
-                        utilization=float(values[8]),
-                        memory_utilization=float(values[9]),
-                        clock_speed=float(values[10]),
-                        memory_clock=float(values[11]),
-                        fan_speed=float(values[12]) if values[12].strip() != '[N/A]' else 0,
-                        pcie_gen=int(values[13]),
-                        pcie_width=int(values[14]),
-                        is_real=True
-                    )
+            static = self.get_static_info()
+            rows = query_nvidia_smi(SMI_DYNAMIC_FIELDS, self.device_index)
+            if self.device_index in rows:
+                return gpu_info_from_smi(rows[self.device_index], static)
         except FileNotFoundError:
             logger.warning("nvidia-smi not found")
         except Exception as e:
@@ -214,27 +425,9 @@ class GPUMonitor:
         return self._get_simulated_info()
     
     def _get_simulated_info(self) -> GPUInfo:
-        """Return simulated data when no GPU is available"""
-        import random
-        return GPUInfo(
-            name="NVIDIA GeForce RTX 5090 (Simulated)",
-            driver_version="560.94",
-            cuda_version="12.6",
-            memory_total=32.0,
-            memory_used=round(random.uniform(4.0, 16.0), 2),
-            memory_free=round(random.uniform(16.0, 28.0), 2),
-            temperature=round(random.uniform(35.0, 75.0), 1),
-            power_usage=round(random.uniform(100.0, 450.0), 1),
-            power_limit=575.0,
-            utilization=round(random.uniform(10.0, 95.0), 1),
-            memory_utilization=round(random.uniform(10.0, 80.0), 1),
-            clock_speed=round(random.uniform(2000.0, 2900.0), 0),
-            memory_clock=round(random.uniform(10000.0, 12000.0), 0),
-            fan_speed=round(random.uniform(30.0, 80.0), 0),
-            pcie_gen=5,
-            pcie_width=16,
-            is_real=False
-        )
+        """Return simulated data when no GPU is available (seeded, see telemetry_providers)"""
+        from telemetry_providers import simulated_gpu_info
+        return simulated_gpu_info(self.device_index)
     
     @staticmethod
     def get_device_count() -> int:
@@ -246,7 +439,7 @@ class GPUMonitor:
                 pass
         
         try:
-            result = subprocess.run(['nvidia-smi', '-L'], capture_output=True, text=True, timeout=5)
+            result = subprocess.run([NVIDIA_SMI, '-L'], capture_output=True, text=True, timeout=5)
             if result.returncode == 0:
                 return len([l for l in result.stdout.strip().split('\n') if l.startswith('GPU')])
         except:
@@ -260,11 +453,99 @@ class GPUMonitor:
         return GPUMonitor.get_device_count() > 0 or HAS_NVML
 
 
-# Global monitor instance
-_monitor: Optional[GPUMonitor] = None
+class DeviceManager:
+    """One long-lived GPUMonitor (and NVML handle) per device, created once"""
+    
+    def __init__(self, use_nvml: bool = True):
+        self.use_nvml = HAS_NVML and use_nvml
+        self.count = GPUMonitor.get_device_count()
+        # Simulation still exposes device 0 so telemetry always has something to serve
+        self.monitors = [GPUMonitor(i, self.use_nvml) for i in range(max(self.count, 1))]
+        self.smi_stream: Optional[NvidiaSmiStream] = None
+    
+    @property
+    def backend(self) -> str:
+        if self.count == 0:
+            return "simulated"
+        return "nvml" if self.use_nvml else "nvidia-smi"
+    
+    def start_streaming(self, interval_s: float):
+        """Without NVML, replace per-poll nvidia-smi spawns with one -lms process"""
+        if self.use_nvml or self.count == 0:
+            return
+        interval_ms = int(interval_s * 1000)
+        if self.smi_stream and self.smi_stream.interval_ms != interval_ms:
+            self.smi_stream.stop()
+            self.smi_stream = None
+        if self.smi_stream is None:
+            self.smi_stream = NvidiaSmiStream(interval_ms)
+            logger.info(f"Streaming nvidia-smi every {interval_ms}ms")
+        self.smi_stream.start()
+    
+    def stop_streaming(self):
+        if self.smi_stream:
+            self.smi_stream.stop()
+    
+    def monitor(self, device_index: int) -> GPUMonitor:
+        if not 0 <= device_index < len(self.monitors):
+            raise IndexError(f"No GPU with index {device_index} ({len(self.monitors)} available)")
+        return self.monitors[device_index]
+    
+    def sample_all(self) -> List[GPUInfo]:
+        """Dynamic metrics for every device in one pass: cached NVML handles, or one nvidia-smi call"""
+        if self.count == 0:
+            return [m._get_simulated_info() for m in self.monitors]
+        if self.use_nvml:
+            return [m.get_gpu_info() for m in self.monitors]
+        
+        rows = self.smi_stream.rows() if self.smi_stream else {}
+        if any(m.device_index not in rows for m in self.monitors):
+            # Stream not producing yet (or stalled): fall back to a one-shot query
+            try:
+                rows = query_nvidia_smi(SMI_DYNAMIC_FIELDS)
+            except Exception as e:
+                logger.error(f"nvidia-smi error: {e}")
+                rows = {}
+        return [
+            gpu_info_from_smi(rows[m.device_index], m.get_static_info()) if m.device_index in rows
+            else m._get_simulated_info()
+            for m in self.monitors
+        ]
+    
+    def list_devices(self) -> List[Dict[str, Any]]:
+        """
+        Cached static properties of every device telemetry serves; without a GPU
+        that is the simulated device 0, flagged is_real=False like its samples
+        """
+        if self.count == 0:
+            return [{"index": m.device_index, **SIMULATED_STATIC, "is_real": False} for m in self.monitors]
+        return [{"index": m.device_index, **m.get_static_info(), "is_real": True} for m in self.monitors]
+    
+    @staticmethod
+    def aggregate(infos: List[GPUInfo]) -> Dict[str, Any]:
+        """Node-level totals across devices"""
+        if not infos:
+            return {"count": 0}
+        return {
+            "count": len(infos),
+            "memory_total": round(sum(i.memory_total for i in infos), 2),
+            "memory_used": round(sum(i.memory_used for i in infos), 2),
+            "power_usage": round(sum(i.power_usage for i in infos), 1),
+            "power_limit": round(sum(i.power_limit for i in infos), 1),
+            "utilization_avg": round(sum(i.utilization for i in infos) / len(infos), 1),
+            "temperature_max": max(i.temperature for i in infos),
+            "is_real": all(i.is_real for i in infos)
+        }
+
+
+# Global device manager
+_device_manager: Optional[DeviceManager] = None
+
+def get_device_manager() -> DeviceManager:
+    global _device_manager
+    if _device_manager is None:
+        _device_manager = DeviceManager()
+    return _device_manager
 
-def get_monitor() -> GPUMonitor:
-    global _monitor
-    if _monitor is None:
-        _monitor = GPUMonitor()
-    return _monitor
+def get_monitor(device_index: int = 0) -> GPUMonitor:
+    return get_device_manager().monitor(device_index)
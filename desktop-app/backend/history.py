@@ -0,0 +1,50 @@
+"""
+Result History - append-only JSONL log of completed runs
+Newest records are kept in memory for fast history queries
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+class ResultHistory:
+    """Bounded in-memory view over a JSONL file that survives restarts"""
+
+    def __init__(self, path: Path, max_items: int = 10000):
+        self.path = Path(path)
+        self._records: deque = deque(maxlen=max_items)
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        self._records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping corrupt history line in {self.path}")
+
+    def add(self, record: Dict[str, Any]):
+        with self._lock:
+            self._records.append(record)
+            try:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                logger.error(f"Error writing history {self.path}: {e}")
+
+    def list(self, limit: Optional[int] = 20, **filters) -> List[Dict[str, Any]]:
+        """Newest first; filters match record fields exactly (None values are ignored)"""
+        filters = {k: v for k, v in filters.items() if v is not None}
+        with self._lock:
+            records = list(self._records)
+        matches = [r for r in reversed(records) if all(r.get(k) == v for k, v in filters.items())]
+        return matches[:limit] if limit else matches
+
+    def __len__(self) -> int:
+        return len(self._records)
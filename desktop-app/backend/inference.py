@@ -5,13 +5,27 @@ Real AI Inference using ONNX Runtime GPU / TensorRT
 import logging
 import time
 import asyncio
+import threading
 from typing import Dict, Any, Optional, List
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-import random
+
+from batching import MicroBatcher
+from executor import InferenceExecutor
+from model_registry import ModelRegistry
+from model_loader import ModelLoader, LoadHandle
+from engine_cache import EngineCache, format_shape_spec
+from latency_stats import AdaptiveConfig, LatencyStats, measure, summarize
+from io_binding import BoundRunner
+from input_synthesis import make_feeds, detect_precision
+from cpu_tuning import CpuTuning, candidate_configs
+from simulation import get_rng
 
 logger = logging.getLogger(__name__)
 
+MAX_BOUND_RUNNERS = 32
+
 # Check for ONNX Runtime GPU
 HAS_ONNX_GPU = False
 HAS_TENSORRT = False
@@ -48,9 +62,12 @@ class InferenceResult:
     input_shape: List[int]
     output_shape: List[int]
     is_real: bool = True
+    latency_stats: Optional[LatencyStats] = None
+    requested_precision: Optional[str] = None  # Set when what ran differs from what was asked
+    input_shapes: Optional[Dict[str, List[int]]] = None  # Every model input, for multi-input models
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        result = {
             "model_name": self.model_name,
             "latency_ms": round(self.latency_ms, 2),
             "throughput": round(self.throughput, 1),
@@ -62,6 +79,13 @@ class InferenceResult:
             "output_shape": self.output_shape,
             "is_real": self.is_real
         }
+        if self.latency_stats:
+            result["latency_stats"] = self.latency_stats.to_dict()
+        if self.requested_precision:
+            result["requested_precision"] = self.requested_precision
+        if self.input_shapes:
+            result["input_shapes"] = self.input_shapes
+        return result
 
 
 class InferenceEngine:
@@ -70,45 +94,172 @@ class InferenceEngine:
     def __init__(self, models_dir: str = "./models"):
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(exist_ok=True)
-        self.loaded_models: Dict[str, Any] = {}
-        self.session_options = None
-        
-        if onnxruntime:
-            self.session_options = ort.SessionOptions()
-            self.session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.registry = ModelRegistry()
+        self.loader = ModelLoader(self)
+        self.engine_cache = EngineCache(self.models_dir / ".cache")
+        self.executor = InferenceExecutor()
+        self.batcher = MicroBatcher(self.run_batch)
+        self.serve_io_binding = False
+        self.force_cpu = False
+        self.cpu_tuning = CpuTuning()
+        self.cpu_tuning_overrides: Dict[str, CpuTuning] = {}  # model hash prefix -> tuning
+        # (registry key, input shapes...) -> runner; LRU, touched from executor threads
+        self._bound_runners: "OrderedDict[tuple, BoundRunner]" = OrderedDict()
+        self._bound_lock = threading.Lock()
+        self.registry.on_drop = self._drop_bound_runners
     
     def get_providers(self) -> List[str]:
         """Get available execution providers"""
-        if HAS_TENSORRT:
+        if self.force_cpu:
+            return ['CPUExecutionProvider']
+        elif HAS_TENSORRT:
             return ['TensorrtExecutionProvider', 'CUDAExecutionProvider', 'CPUExecutionProvider']
         elif HAS_ONNX_GPU:
             return ['CUDAExecutionProvider', 'CPUExecutionProvider']
         else:
             return ['CPUExecutionProvider']
     
-    async def load_model(self, model_path: str) -> bool:
-        """Load an ONNX model"""
+    async def load_model(
+        self,
+        model_path: str,
+        precision: str = "FP32",
+        input_shapes: Optional[Dict[str, List[int]]] = None
+    ) -> Optional[str]:
+        """Load an ONNX model, returning the name it is registered under"""
         if not onnxruntime:
-            return False
+            return None
         
+        handle = await self.loader.wait(self.loader.submit(model_path, precision, input_shapes).id)
+        return handle.model_name if handle and handle.status == "ready" else None
+    
+    def load_model_background(
+        self,
+        model_path: str,
+        precision: str = "FP32",
+        input_shapes: Optional[Dict[str, List[int]]] = None
+    ) -> Optional[LoadHandle]:
+        """Start loading a model without waiting; poll the returned handle"""
+        if not onnxruntime:
+            return None
+        return self.loader.submit(model_path, precision, input_shapes)
+    
+    @staticmethod
+    def registry_key(
+        model_hash: str,
+        providers: List[str],
+        precision: str,
+        input_shapes: Dict[str, List[int]]
+    ) -> str:
+        """Sessions only differ by precision/shape when TensorRT builds engines for them"""
+        variant = ""
+        if providers[0] == 'TensorrtExecutionProvider':
+            variant = ":".join(filter(None, [precision, format_shape_spec(input_shapes)]))
+        return ModelRegistry.make_key(model_hash, providers, variant)
+    
+    def _new_session_options(self, model_hash: Optional[str] = None, tuning: Optional[CpuTuning] = None):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if tuning is None and model_hash:
+            tuning = self.cpu_tuning_overrides.get(model_hash[:16])
+        (tuning or self.cpu_tuning).apply(options)
+        return options
+    
+    def create_session(
+        self,
+        path: Path,
+        providers: List[str],
+        model_hash: str,
+        precision: str = "FP32",
+        input_shapes: Optional[Dict[str, List[int]]] = None
+    ):
+        """Construct an InferenceSession (blocking; runs on the loader pool)"""
+        options = self._new_session_options(model_hash)
+        if not self.engine_cache.enabled:
+            return ort.InferenceSession(str(path), sess_options=options, providers=providers)
+        
+        plan = self.engine_cache.plan(path, model_hash, providers, precision, input_shapes or {}, options)
         try:
-            path = Path(model_path)
-            if not path.exists():
-                logger.error(f"Model not found: {model_path}")
-                return False
-            
-            session = ort.InferenceSession(
-                str(path),
-                sess_options=self.session_options,
-                providers=self.get_providers()
-            )
-            
-            self.loaded_models[path.stem] = session
-            logger.info(f"Model loaded: {path.stem}")
-            return True
+            session = ort.InferenceSession(str(plan.model_path), sess_options=options, providers=plan.providers)
         except Exception as e:
-            logger.error(f"Failed to load model: {e}")
-            return False
+            logger.warning(f"Cached session build failed for {path.name} ({e}), retrying without cache")
+            self.engine_cache.discard(plan)
+            return ort.InferenceSession(str(path), sess_options=self._new_session_options(model_hash), providers=providers)
+        
+        self.engine_cache.commit(plan)
+        return session
+    
+    def warmup_session(self, session, runs: int, input_shapes: Optional[Dict[str, List[int]]] = None) -> float:
+        """Run a few single-sample passes (at the load-time shapes, if any) so the first request sees steady state"""
+        if not HAS_NUMPY:
+            return 0.0
+        feeds, _ = make_feeds(session, 1, input_shapes)
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            session.run(None, feeds)
+        return (time.perf_counter() - start_time) * 1000  # ms
+    
+    async def tune_cpu(
+        self,
+        model_name: str,
+        batch_size: int = 1,
+        benchmark_runs: int = 50,
+        apply: bool = False
+    ) -> Dict[str, Any]:
+        """Benchmark candidate CPU thread configs for a loaded model; optionally adopt the best"""
+        entry = self.registry.entry(model_name)
+        if entry is None or not onnxruntime or not HAS_NUMPY:
+            raise KeyError(f"Model not loaded: {model_name}")
+        
+        results = await self.executor.run(
+            model_name, self._sweep_cpu_configs, Path(entry.path), candidate_configs(), batch_size, benchmark_runs,
+            entry.input_shapes
+        )
+        best = min(results, key=lambda r: r["latency_stats"]["mean_ms"]) if results else None
+        
+        if best and apply:
+            model_hash = entry.key.split(":")[0]
+            self.cpu_tuning_overrides[model_hash] = CpuTuning(**best["tuning"])
+            # Rebuild the resident session with the winning options
+            self.unload_model(model_name)
+            await self.load_model(entry.path, entry.precision, entry.input_shapes or None)
+        
+        return {"model_name": model_name, "batch_size": batch_size, "results": results, "best": best, "applied": bool(best and apply)}
+    
+    def _sweep_cpu_configs(
+        self,
+        path: Path,
+        candidates: List[CpuTuning],
+        batch_size: int,
+        benchmark_runs: int,
+        input_shapes: Optional[Dict[str, List[int]]] = None
+    ):
+        """Blocking: build a CPU session per candidate and time it; runs on an executor thread"""
+        results = []
+        for tuning in candidates:
+            try:
+                session = ort.InferenceSession(
+                    str(path),
+                    sess_options=self._new_session_options(tuning=tuning),
+                    providers=['CPUExecutionProvider']
+                )
+                feeds, shapes = make_feeds(session, batch_size, input_shapes)
+                input_shape = next(iter(shapes.values()), [])
+                ran_batch = input_shape[0] if input_shape else batch_size
+                stats, _ = self._benchmark_session(session, feeds, 5, benchmark_runs)
+                results.append({"tuning": tuning.to_dict(), "latency_stats": stats.to_dict(),
+                                "throughput": round(ran_batch / (stats.mean_ms / 1000), 1)})
+            except Exception as e:
+                logger.warning(f"CPU tuning candidate {tuning} failed: {e}")
+        return results
+    
+    def _load_shapes(self, model_name: str) -> Dict[str, List[int]]:
+        """Static input shapes the model was loaded with; its feeds must match them"""
+        entry = self.registry.entry(model_name)
+        return entry.input_shapes if entry else {}
+    
+    def unload_model(self, model_name: str) -> bool:
+        """Drop a model's session from the registry"""
+        return self.registry.remove(model_name)
     
     async def run_inference(
         self,
@@ -117,14 +268,16 @@ class InferenceEngine:
         precision: str = "FP16",
         framework: str = "TensorRT",
         warmup_runs: int = 5,
-        benchmark_runs: int = 50
+        benchmark_runs: int = 50,
+        adaptive: Optional[AdaptiveConfig] = None,
+        io_binding: bool = False
     ) -> InferenceResult:
-        """Run inference benchmark on a model"""
+        """Run inference benchmark on a model; pass adaptive for auto warmup/run counts"""
         
         # Check if we have a real model loaded
-        if model_name in self.loaded_models and onnxruntime and HAS_NUMPY:
+        if model_name in self.registry and onnxruntime and HAS_NUMPY:
             return await self._run_real_inference(
-                model_name, batch_size, precision, framework, warmup_runs, benchmark_runs
+                model_name, batch_size, precision, framework, warmup_runs, benchmark_runs, adaptive, io_binding
             )
         else:
             return self._simulate_inference(model_name, batch_size, precision, framework)
@@ -136,45 +289,32 @@ class InferenceEngine:
         precision: str,
         framework: str,
         warmup_runs: int,
-        benchmark_runs: int
+        benchmark_runs: int,
+        adaptive: Optional[AdaptiveConfig] = None,
+        io_binding: bool = False
     ) -> InferenceResult:
         """Run actual inference on loaded model"""
         try:
-            session = self.loaded_models[model_name]
-            input_info = session.get_inputs()[0]
-            output_info = session.get_outputs()[0]
+            session = self.registry.get(model_name)
+            feeds, input_shapes = make_feeds(session, batch_size, self._load_shapes(model_name))
+            input_shape = next(iter(input_shapes.values()))
+            # A static batch axis wins over the requested batch size
+            batch_size = input_shape[0] if input_shape else batch_size
+            ran_precision = self._ran_precision(model_name, session)
             
-            # Get input shape and create dummy input
-            input_shape = list(input_info.shape)
-            if input_shape[0] == 'batch_size' or input_shape[0] is None:
-                input_shape[0] = batch_size
+            # Warmup + benchmark run as one job on the executor pool
+            if adaptive:
+                stats, outputs = await self.executor.run(
+                    model_name, self._measure_session, session, feeds, adaptive, io_binding
+                )
             else:
-                input_shape[0] = batch_size
+                stats, outputs = await self.executor.run(
+                    model_name, self._benchmark_session,
+                    session, feeds, warmup_runs, benchmark_runs, io_binding
+                )
             
-            # Create input based on precision
-            if precision == "FP16":
-                dtype = np.float16
-            elif precision == "INT8":
-                dtype = np.int8
-            else:
-                dtype = np.float32
-            
-            dummy_input = np.random.rand(*input_shape).astype(np.float32)  # ONNX usually needs float32
-            input_name = input_info.name
-            
-            # Warmup
-            for _ in range(warmup_runs):
-                session.run(None, {input_name: dummy_input})
-            
-            # Benchmark
-            start_time = time.perf_counter()
-            for _ in range(benchmark_runs):
-                outputs = session.run(None, {input_name: dummy_input})
-            end_time = time.perf_counter()
-            
-            total_time = (end_time - start_time) * 1000  # ms
-            latency = total_time / benchmark_runs
-            throughput = (benchmark_runs * batch_size) / (total_time / 1000)
+            latency = stats.mean_ms
+            throughput = batch_size / (latency / 1000)
             
             output_shape = list(outputs[0].shape) if outputs else []
             
@@ -182,18 +322,148 @@ class InferenceEngine:
                 model_name=model_name,
                 latency_ms=latency,
                 throughput=throughput,
-                memory_allocated_mb=dummy_input.nbytes / (1024 * 1024) * 2,  # Rough estimate
-                precision=precision,
+                memory_allocated_mb=self._feeds_mb(feeds) * 2,  # Rough estimate
+                precision=ran_precision,
                 framework=framework,
                 batch_size=batch_size,
                 input_shape=input_shape,
                 output_shape=output_shape,
-                is_real=True
+                is_real=True,
+                latency_stats=stats,
+                requested_precision=precision if precision != ran_precision else None,
+                input_shapes=input_shapes
             )
         except Exception as e:
             logger.error(f"Inference error: {e}")
             return self._simulate_inference(model_name, batch_size, precision, framework)
     
+    async def serve_inference(
+        self,
+        model_name: str,
+        batch_size: int = 1,
+        precision: str = "FP16",
+        framework: str = "TensorRT"
+    ) -> InferenceResult:
+        """Run a single request through the shared micro-batcher"""
+        if model_name not in self.registry or not onnxruntime or not HAS_NUMPY:
+            return self._simulate_inference(model_name, batch_size, precision, framework)
+        
+        try:
+            session = self.registry.get(model_name)
+            feeds, input_shapes = make_feeds(session, batch_size, self._load_shapes(model_name))
+            input_shape = next(iter(input_shapes.values()))
+            batch_size = input_shape[0] if input_shape else batch_size
+            ran_precision = self._ran_precision(model_name, session)
+            
+            start_time = time.perf_counter()
+            outputs = await self.batcher.submit(model_name, feeds)
+            latency = (time.perf_counter() - start_time) * 1000  # ms
+            
+            return InferenceResult(
+                model_name=model_name,
+                latency_ms=latency,
+                throughput=batch_size / (latency / 1000),
+                memory_allocated_mb=self._feeds_mb(feeds) * 2,  # Rough estimate
+                precision=ran_precision,
+                framework=framework,
+                batch_size=batch_size,
+                input_shape=input_shape,
+                output_shape=list(outputs[0].shape) if outputs else [],
+                is_real=True,
+                requested_precision=precision if precision != ran_precision else None,
+                input_shapes=input_shapes
+            )
+        except Exception as e:
+            logger.error(f"Inference error: {e}")
+            return self._simulate_inference(model_name, batch_size, precision, framework)
+    
+    async def run_batch(self, model_name: str, feeds: Dict[str, Any]) -> List[Any]:
+        """Execute one session.run on the executor pool (used by the batcher)"""
+        session = self.registry.get(model_name)
+        if session is None:
+            raise KeyError(f"Model not loaded: {model_name}")
+        if self.serve_io_binding:
+            entry = self.registry.entry(model_name)
+            return await self.executor.run(model_name, self._run_bound, entry.key, session, feeds)
+        return await self.executor.run(model_name, session.run, None, feeds)
+    
+    def _run_bound(self, model_key: str, session, feeds: Dict[str, Any]) -> List[Any]:
+        """Serve through a cached IOBinding sized for these input shapes"""
+        key = (model_key,) + tuple((name, value.shape) for name, value in feeds.items())
+        with self._bound_lock:
+            runner = self._bound_runners.get(key)
+            if runner is not None:
+                self._bound_runners.move_to_end(key)
+        if runner is None:
+            runner = BoundRunner(session, feeds)  # Probes the session; built outside the lock
+            with self._bound_lock:
+                if self.registry.has_key(model_key):  # Not removed while the runner was built
+                    runner = self._bound_runners.setdefault(key, runner)
+                    self._bound_runners.move_to_end(key)
+                    while len(self._bound_runners) > MAX_BOUND_RUNNERS:
+                        self._bound_runners.popitem(last=False)
+        return runner.run_with(feeds)
+    
+    def _drop_bound_runners(self, entry):
+        """Registry callback: a removed or evicted session must not stay alive through its runners"""
+        with self._bound_lock:
+            for key in [k for k in self._bound_runners if k[0] == entry.key]:
+                del self._bound_runners[key]
+    
+    @staticmethod
+    def _run_fn(session, feeds: Dict[str, Any], io_binding: bool):
+        """Hot-loop callable plus a finalizer that returns caller-owned outputs"""
+        if io_binding:
+            runner = BoundRunner(session, feeds)
+            return runner.run, lambda _: runner.fetch()
+        return (lambda: session.run(None, feeds)), (lambda outputs: outputs)
+    
+    @classmethod
+    def _benchmark_session(
+        cls,
+        session,
+        feeds: Dict[str, Any],
+        warmup_runs: int,
+        benchmark_runs: int,
+        io_binding: bool = False
+    ):
+        """Blocking fixed-count warmup + timed loop; runs on an executor thread"""
+        run, finish = cls._run_fn(session, feeds, io_binding)
+        
+        # Warmup
+        for _ in range(warmup_runs):
+            run()
+        
+        # Benchmark - every iteration recorded into a preallocated array
+        outputs = None
+        timings = np.empty(benchmark_runs, dtype=np.int64)
+        perf_counter_ns = time.perf_counter_ns
+        for i in range(benchmark_runs):
+            start = perf_counter_ns()
+            outputs = run()
+            timings[i] = perf_counter_ns() - start
+        
+        stats = summarize(timings / 1e6)  # ms
+        stats.warmup_runs = warmup_runs
+        return stats, finish(outputs)
+    
+    @classmethod
+    def _measure_session(cls, session, feeds: Dict[str, Any], adaptive: AdaptiveConfig, io_binding: bool = False):
+        """Blocking adaptive measurement; runs on an executor thread"""
+        run, finish = cls._run_fn(session, feeds, io_binding)
+        stats, outputs = measure(run, adaptive)
+        return stats, finish(outputs)
+    
+    def _ran_precision(self, model_name: str, session) -> str:
+        entry = self.registry.entry(model_name)
+        if entry is None:
+            return detect_precision(session)
+        return detect_precision(session, entry.precision, entry.path)
+    
+    @staticmethod
+    def _feeds_mb(feeds: Dict[str, Any]) -> float:
+        return sum(value.nbytes for value in feeds.values()) / (1024 * 1024)
+    
     def _simulate_inference(
         self,
         model_name: str,
@@ -234,8 +504,9 @@ class InferenceEngine:
         base_latency = model_latencies.get(model_name, 5.0)
         p_mult = precision_mult.get(precision, 1.0)
         f_mult = framework_mult.get(framework, 1.0)
+        rng = get_rng("inference")
         
-        latency = base_latency * p_mult * f_mult * random.uniform(0.9, 1.1)
+        latency = base_latency * p_mult * f_mult * rng.uniform(0.9, 1.1)
         throughput = (1000 / latency) * batch_size
         
         # Estimate input/output shapes based on model
@@ -256,7 +527,7 @@ class InferenceEngine:
             model_name=model_name,
             latency_ms=latency,
             throughput=throughput,
-            memory_allocated_mb=random.uniform(500, 4000),
+            memory_allocated_mb=rng.uniform(500, 4000),
             precision=precision,
             framework=framework,
             batch_size=batch_size,
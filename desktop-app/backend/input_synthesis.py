@@ -0,0 +1,161 @@
+"""
+Input Synthesis - realistic dummy feeds for every input of an ONNX model
+Resolves dtypes and dynamic axes so multi-input (e.g. BERT-style) models run for real
+"""
+
+import logging
+import mmap
+import os
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+
+    ORT_TYPE_TO_NUMPY = {
+        'tensor(float)': np.float32,
+        'tensor(float16)': np.float16,
+        'tensor(double)': np.float64,
+        'tensor(int64)': np.int64,
+        'tensor(int32)': np.int32,
+        'tensor(int16)': np.int16,
+        'tensor(int8)': np.int8,
+        'tensor(uint8)': np.uint8,
+        'tensor(bool)': np.bool_
+    }
+except ImportError:
+    HAS_NUMPY = False
+    ORT_TYPE_TO_NUMPY = {}
+
+try:
+    import onnx
+    HAS_ONNX = True
+except ImportError:
+    HAS_ONNX = False
+
+DEFAULT_SEQUENCE_LENGTH = 128
+DEFAULT_SPATIAL_SIZE = 224
+DEFAULT_CHANNELS = 3
+TOKEN_ID_RANGE = 1000  # Small enough to be valid for any real vocabulary
+
+FLOAT_TYPES = ('tensor(float)', 'tensor(float16)', 'tensor(double)')
+
+# Ops that mean the graph computes in integer precision even when its I/O is float
+QUANTIZED_OPS = frozenset({
+    'QuantizeLinear', 'DequantizeLinear', 'DynamicQuantizeLinear',
+    'QLinearConv', 'QLinearMatMul', 'MatMulInteger', 'ConvInteger'
+})
+# Byte patterns for the same ops when the onnx package is unavailable
+QUANTIZED_OP_MARKERS = (b'uantizeLinear', b'QLinear', b'MatMulInteger', b'ConvInteger')
+
+
+def _is_dynamic(dim) -> bool:
+    return dim is None or isinstance(dim, str) or (isinstance(dim, int) and dim < 0)
+
+
+def resolve_shape(input_info, batch_size: int) -> List[int]:
+    """Concrete shape for one input: batch on axis 0, sensible defaults elsewhere"""
+    shape = list(input_info.shape)
+    is_float = input_info.type in FLOAT_TYPES
+    resolved = []
+
+    for axis, dim in enumerate(shape):
+        if not _is_dynamic(dim):
+            resolved.append(int(dim))
+        elif axis == 0:
+            resolved.append(batch_size)
+        elif is_float and len(shape) == 4:
+            # NCHW image tensor
+            resolved.append(DEFAULT_CHANNELS if axis == 1 else DEFAULT_SPATIAL_SIZE)
+        else:
+            # Token ids, masks, and sequence-shaped float inputs
+            resolved.append(DEFAULT_SEQUENCE_LENGTH)
+
+    return resolved
+
+
+def _synthesize(name: str, ort_type: str, shape: List[int]):
+    dtype = ORT_TYPE_TO_NUMPY.get(ort_type)
+    if dtype is None:
+        raise ValueError(f"Unsupported input type {ort_type} for input '{name}'")
+
+    lowered = name.lower()
+    if dtype == np.bool_:
+        return np.ones(shape, dtype=dtype)
+    if np.issubdtype(dtype, np.floating):
+        return np.random.rand(*shape).astype(dtype)
+    if "mask" in lowered:
+        return np.ones(shape, dtype=dtype)
+    if "token_type" in lowered or "segment" in lowered:
+        return np.zeros(shape, dtype=dtype)
+    if "position" in lowered and shape:
+        return np.broadcast_to(np.arange(shape[-1], dtype=dtype), shape).copy()
+
+    high = min(TOKEN_ID_RANGE, np.iinfo(dtype).max)
+    return np.random.randint(0, high, size=shape).astype(dtype)
+
+
+def make_feeds(
+    session,
+    batch_size: int,
+    input_shapes: Optional[Dict[str, List[int]]] = None
+) -> Tuple[Dict[str, Any], Dict[str, List[int]]]:
+    """
+    Feeds for every session input, plus the concrete shapes used. input_shapes
+    are the static shapes the model was loaded with (e.g. a TensorRT profile);
+    they win over batch_size and the defaults for the inputs they name.
+    """
+    input_shapes = input_shapes or {}
+    feeds: Dict[str, Any] = {}
+    shapes: Dict[str, List[int]] = {}
+    for input_info in session.get_inputs():
+        if input_info.name in input_shapes:
+            shape = [int(d) for d in input_shapes[input_info.name]]
+        else:
+            shape = resolve_shape(input_info, batch_size)
+        feeds[input_info.name] = _synthesize(input_info.name, input_info.type, shape)
+        shapes[input_info.name] = shape
+    return feeds, shapes
+
+
+@lru_cache(maxsize=64)
+def _is_quantized(model_path: str, mtime: float) -> Optional[bool]:
+    """Whether the graph contains quantization ops; None if the file cannot be read"""
+    try:
+        if HAS_ONNX:
+            model = onnx.load(model_path, load_external_data=False)
+            nodes = list(model.graph.node) + [n for f in model.functions for n in f.node]
+            return any(node.op_type in QUANTIZED_OPS for node in nodes)
+        with open(model_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return any(data.find(marker) >= 0 for marker in QUANTIZED_OP_MARKERS)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot inspect {model_path} for quantization: {e}")
+        return None
+
+
+def detect_precision(session, built_precision: Optional[str] = None, model_path: Optional[str] = None) -> str:
+    """
+    Precision that actually ran. TensorRT honours the precision the engine was
+    built with. Other providers execute the graph as written: INT8 when it has
+    QDQ or QLinear/Integer ops (those keep float I/O), otherwise its I/O float
+    type. "unknown" when the model file cannot be inspected.
+    """
+    if built_precision and session.get_providers()[0] == 'TensorrtExecutionProvider':
+        return built_precision
+
+    if model_path is None:
+        return "unknown"
+    try:
+        quantized = _is_quantized(str(model_path), os.path.getmtime(model_path))
+    except OSError:
+        quantized = None
+    if quantized is None:
+        return "unknown"
+    if quantized:
+        return "INT8"
+
+    types = [arg.type for arg in session.get_inputs() + session.get_outputs()]
+    return "FP16" if 'tensor(float16)' in types else "FP32"
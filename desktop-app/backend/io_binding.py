@@ -0,0 +1,91 @@
+"""
+IOBinding Runner - preallocated, reused input/output buffers for repeated runs
+Removes per-call output allocation from the session.run hot loop
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+GPU_PROVIDERS = ('TensorrtExecutionProvider', 'CUDAExecutionProvider')
+
+
+def binding_device(session) -> str:
+    """Device the session's primary provider computes on"""
+    return 'cuda' if session.get_providers()[0] in GPU_PROVIDERS else 'cpu'
+
+
+class BoundRunner:
+    """
+    One IOBinding with buffers sized for a fixed set of input shapes.
+    On CPU, inputs/outputs are NumPy arrays ORT reads and writes in place.
+    On CUDA/TensorRT they are device-resident OrtValues, so the hot loop never
+    crosses PCIe; the ORT Python API does not expose pinned host buffers.
+    """
+
+    def __init__(self, session, feeds: Dict[str, Any]):
+        self.session = session
+        self.device = binding_device(session)
+        self.binding = session.io_binding()
+        self._lock = threading.Lock()
+        self._inputs: Dict[str, Any] = {}
+        self._outputs: Dict[str, Any] = {}
+
+        for name, value in feeds.items():
+            buffer = np.ascontiguousarray(value).copy()
+            ort_value = ort.OrtValue.ortvalue_from_numpy(buffer, self.device, 0)
+            self.binding.bind_ortvalue_input(name, ort_value)
+            # Keep the NumPy buffer alive: on CPU the OrtValue aliases its memory
+            self._inputs[name] = (buffer, ort_value)
+
+        # Probe once with plain run() to learn output shapes and dtypes
+        probe = session.run(None, feeds)
+        for output, value in zip(session.get_outputs(), probe):
+            if self.device == 'cpu':
+                buffer = np.empty_like(value)
+                self.binding.bind_output(
+                    output.name, 'cpu', 0, buffer.dtype, list(buffer.shape), buffer.ctypes.data
+                )
+                self._outputs[output.name] = buffer
+            else:
+                ort_value = ort.OrtValue.ortvalue_from_shape_and_type(list(value.shape), value.dtype, 'cuda', 0)
+                self.binding.bind_ortvalue_output(output.name, ort_value)
+                self._outputs[output.name] = ort_value
+
+    def run(self) -> List[Any]:
+        """Run with the currently bound inputs; returns the reused output buffers"""
+        self.session.run_with_iobinding(self.binding)
+        return list(self._outputs.values())
+
+    def fetch(self) -> List[Any]:
+        """Caller-owned NumPy copies of the current outputs"""
+        return [
+            out.copy() if self.device == 'cpu' else out.numpy()
+            for out in self._outputs.values()
+        ]
+
+    def run_with(self, feeds: Dict[str, Any]) -> List[Any]:
+        """Copy new inputs into the bound buffers, run, and return caller-owned outputs"""
+        with self._lock:
+            for name, value in feeds.items():
+                buffer, ort_value = self._inputs[name]
+                if self.device == 'cpu':
+                    np.copyto(buffer, value)
+                else:
+                    ort_value.update_inplace(np.ascontiguousarray(value, dtype=buffer.dtype))
+            self.session.run_with_iobinding(self.binding)
+            # Buffers are reused by the next call, so hand out copies
+            return self.fetch()
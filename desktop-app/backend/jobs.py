@@ -0,0 +1,180 @@
+"""
+Benchmark Job Queue - asynchronous submission, progress and cancellation
+Jobs targeting the same GPU run one at a time behind a per-device lock
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_JOBS = 100
+
+
+class JobCancelled(Exception):
+    """Raised inside a benchmark loop once its job has been cancelled"""
+
+
+class JobControl:
+    """
+    Handed to benchmark code running on a worker thread: it reports progress
+    through it and checks for cancellation between iterations.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self.stage = ""
+        self.progress = 0.0
+        self._range = (0.0, 1.0)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def begin_stage(self, name: str, start: float = 0.0, end: float = 1.0):
+        """Map subsequent tick() calls onto [start, end] of overall progress"""
+        self.check()
+        self.stage = name
+        self._range = (start, end)
+        self.progress = start
+
+    def tick(self, done: int, total: int):
+        self.check()
+        start, end = self._range
+        self.progress = start + (end - start) * done / max(total, 1)
+
+
+@dataclass
+class BenchmarkJob:
+    id: str
+    benchmark_type: str
+    device: int
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"  # queued, running, completed, failed, cancelled
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    control: JobControl = field(default_factory=JobControl)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "benchmark_type": self.benchmark_type,
+            "device": self.device,
+            "options": self.options,
+            "status": self.status,
+            "stage": self.control.stage,
+            "progress": round(1.0 if self.status == "completed" else self.control.progress, 3),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+JobRunner = Callable[[BenchmarkJob], Awaitable[Dict[str, Any]]]
+
+
+class BenchmarkJobQueue:
+    """
+    Accepts jobs immediately and runs each as a task once its GPU is free.
+    The runner does the actual work and returns the result dict.
+    """
+
+    def __init__(self, runner: JobRunner, on_complete: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.runner = runner
+        self.on_complete = on_complete
+        self._jobs: "OrderedDict[str, BenchmarkJob]" = OrderedDict()
+        self._device_locks: Dict[int, asyncio.Lock] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, benchmark_type: str, device: int = 0, options: Optional[Dict[str, Any]] = None) -> BenchmarkJob:
+        job = BenchmarkJob(id=str(uuid.uuid4()), benchmark_type=benchmark_type, device=device, options=options or {})
+        self._jobs[job.id] = job
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+        self._trim()
+        logger.info(f"Benchmark job {job.id} queued: {benchmark_type} on GPU {device}")
+        return job
+
+    async def _run(self, job: BenchmarkJob):
+        lock = self._device_locks.setdefault(job.device, asyncio.Lock())
+        try:
+            async with lock:
+                if job.control.cancelled:
+                    raise JobCancelled()
+                job.status = "running"
+                job.started_at = time.time()
+                job.result = await self.runner(job)
+            if self.on_complete:
+                try:
+                    self.on_complete(job.result)
+                except Exception as e:
+                    # A failed side effect (history, baselines) does not invalidate the results
+                    logger.error(f"Benchmark job {job.id} completion handler failed: {e}")
+            job.status = "completed"  # Only once the result is recorded
+        except (JobCancelled, asyncio.CancelledError):
+            job.status = "cancelled"
+            logger.info(f"Benchmark job {job.id} cancelled")
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Benchmark job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+            self._tasks.pop(job.id, None)
+
+    def cancel(self, job_id: str) -> Optional[BenchmarkJob]:
+        """Stops a running job at its next iteration, or drops a queued one before it starts"""
+        job = self._jobs.get(job_id)
+        if job and not job.finished:
+            job.control.cancel()
+            if job.status == "queued" and job_id in self._tasks:
+                # Still waiting for its GPU; worker threads are only ever stopped via control
+                self._tasks[job_id].cancel()
+        return job
+
+    async def wait(self, job_id: str) -> Optional[BenchmarkJob]:
+        job = self._jobs.get(job_id)
+        if job:
+            await job.done.wait()
+        return job
+
+    def get(self, job_id: str) -> Optional[BenchmarkJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - MAX_TRACKED_JOBS)]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        for job in self._jobs.values():
+            if not job.finished:
+                job.control.cancel()
+        for task in list(self._tasks.values()):
+            task.cancel()
@@ -0,0 +1,181 @@
+"""
+Latency Statistics - percentiles, dispersion and confidence intervals
+Plus an adaptive measurement loop that stops once results are stable
+"""
+
+import logging
+import math
+import time
+from typing import Dict, Any, Callable, Optional, Tuple
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+Z_95 = 1.96
+
+# Two-sided 95% Student t critical values for small samples (df -> t)
+T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042
+}
+
+
+def t_critical_95(df: int) -> float:
+    """Conservative t value: nearest tabulated df at or below, z beyond 30"""
+    if df > 30:
+        return Z_95
+    return T_95[max(d for d in T_95 if d <= max(df, 1))]
+
+
+@dataclass
+class LatencyStats:
+    count: int
+    mean_ms: float
+    stddev_ms: float
+    min_ms: float
+    max_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    p999_ms: float
+    mean_ci95_ms: Tuple[float, float]
+    p50_ci95_ms: Tuple[float, float]
+    p99_ci95_ms: Tuple[float, float]
+    warmup_runs: int = 0
+    converged: bool = False
+
+    @property
+    def ci_half_width_pct(self) -> float:
+        low, high = self.mean_ci95_ms
+        return (high - low) / 2 / self.mean_ms * 100 if self.mean_ms else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean_ms, 4),
+            "stddev_ms": round(self.stddev_ms, 4),
+            "min_ms": round(self.min_ms, 4),
+            "max_ms": round(self.max_ms, 4),
+            "p50_ms": round(self.p50_ms, 4),
+            "p90_ms": round(self.p90_ms, 4),
+            "p99_ms": round(self.p99_ms, 4),
+            "p999_ms": round(self.p999_ms, 4),
+            "mean_ci95_ms": [round(v, 4) for v in self.mean_ci95_ms],
+            "p50_ci95_ms": [round(v, 4) for v in self.p50_ci95_ms],
+            "p99_ci95_ms": [round(v, 4) for v in self.p99_ci95_ms],
+            "ci_half_width_pct": round(self.ci_half_width_pct, 3),
+            "warmup_runs": self.warmup_runs,
+            "converged": self.converged
+        }
+
+
+def _quantile_ci(sorted_samples, q: float) -> Tuple[float, float]:
+    """Distribution-free CI for a quantile from order statistics (normal approx to binomial)"""
+    n = len(sorted_samples)
+    spread = Z_95 * math.sqrt(n * q * (1 - q))
+    low = max(0, int(math.floor(n * q - spread)))
+    high = min(n - 1, int(math.ceil(n * q + spread)))
+    return float(sorted_samples[low]), float(sorted_samples[high])
+
+
+def summarize(samples_ms) -> LatencyStats:
+    """Summarize per-iteration latencies (milliseconds)"""
+    samples = np.sort(np.asarray(samples_ms, dtype=np.float64))
+    n = len(samples)
+    if n == 0:
+        raise ValueError("No latency samples")
+
+    mean = float(samples.mean())
+    stddev = float(samples.std(ddof=1)) if n > 1 else 0.0
+    half_width = t_critical_95(n - 1) * stddev / math.sqrt(n) if n > 1 else 0.0
+    p50, p90, p99, p999 = (float(v) for v in np.percentile(samples, [50, 90, 99, 99.9]))
+
+    return LatencyStats(
+        count=n,
+        mean_ms=mean,
+        stddev_ms=stddev,
+        min_ms=float(samples[0]),
+        max_ms=float(samples[-1]),
+        p50_ms=p50,
+        p90_ms=p90,
+        p99_ms=p99,
+        p999_ms=p999,
+        mean_ci95_ms=(mean - half_width, mean + half_width),
+        p50_ci95_ms=_quantile_ci(samples, 0.50),
+        p99_ci95_ms=_quantile_ci(samples, 0.99)
+    )
+
+
+@dataclass
+class AdaptiveConfig:
+    warmup_window: int = 10  # Iterations per warmup stability check
+    warmup_tolerance_pct: float = 2.0  # Window medians within this are "stable"
+    max_warmup_runs: int = 200
+    min_runs: int = 30
+    max_runs: int = 1000
+    ci_target_pct: float = 1.0  # Stop once the mean's 95% CI half-width is below this
+    check_every: int = 10
+    max_duration_s: float = 30.0  # Wall-clock cap on warmup plus measurement
+
+
+def measure(fn: Callable[[], Any], config: Optional[AdaptiveConfig] = None) -> Tuple[LatencyStats, Any]:
+    """
+    Time fn() repeatedly: adaptive warmup until latency stabilizes, then record
+    every iteration into a preallocated array until the CI is tight enough.
+    Returns the stats and the last result of fn().
+    """
+    config = config or AdaptiveConfig()
+    if config.max_runs < 1:
+        raise ValueError("max_runs must be at least 1")
+    perf_counter_ns = time.perf_counter_ns
+    deadline = time.perf_counter() + config.max_duration_s
+
+    # Warmup: stop when two consecutive window medians agree
+    warmup_runs = 0
+    window = np.empty(config.warmup_window, dtype=np.int64)
+    previous_median = None
+    result = None
+    while warmup_runs < config.max_warmup_runs:
+        for i in range(config.warmup_window):
+            start = perf_counter_ns()
+            result = fn()
+            window[i] = perf_counter_ns() - start
+        warmup_runs += config.warmup_window
+        median = float(np.median(window))
+        if previous_median and abs(median - previous_median) / previous_median * 100 <= config.warmup_tolerance_pct:
+            break
+        previous_median = median
+        if time.perf_counter() > deadline:
+            break
+
+    # Measurement: preallocated, no per-iteration Python allocations beyond fn() itself
+    timings = np.empty(config.max_runs, dtype=np.int64)
+    converged = False
+    count = 0
+    while count < config.max_runs:
+        start = perf_counter_ns()
+        result = fn()
+        timings[count] = perf_counter_ns() - start
+        count += 1
+
+        if count >= config.min_runs and count % config.check_every == 0:
+            sample = timings[:count]
+            mean = sample.mean()
+            half_width = t_critical_95(count - 1) * sample.std(ddof=1) / math.sqrt(count)
+            if mean > 0 and half_width / mean * 100 <= config.ci_target_pct:
+                converged = True
+                break
+        if time.perf_counter() > deadline:
+            logger.warning(f"Adaptive benchmark hit {config.max_duration_s}s limit after {count} runs")
+            break
+
+    stats = summarize(timings[:count] / 1e6)
+    stats.warmup_runs = warmup_runs
+    stats.converged = converged
+    return stats, result
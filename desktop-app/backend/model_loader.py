@@ -0,0 +1,186 @@
+"""
+Background Model Loader
+Builds ONNX Runtime sessions off the event loop, in parallel, with warm-up on load
+"""
+
+import logging
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from pathlib import Path
+
+from model_registry import ModelRegistry
+from engine_cache import format_shape_spec
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_HANDLES = 100
+
+
+@dataclass
+class LoadHandle:
+    id: str
+    model_path: str
+    precision: str = "FP32"
+    input_shapes: Optional[Dict[str, List[int]]] = None
+    status: str = "pending"  # pending, hashing, loading, warming_up, ready, failed
+    progress: float = 0.0
+    model_name: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+    submitted_at: float = 0.0
+    finished_at: Optional[float] = None
+    load_ms: float = 0.0
+    warmup_ms: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("ready", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "model_path": self.model_path,
+            "precision": self.precision,
+            "input_shapes": self.input_shapes,
+            "status": self.status,
+            "progress": round(self.progress, 2),
+            "model_name": self.model_name,
+            "cached": self.cached,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+            "load_ms": round(self.load_ms, 2),
+            "warmup_ms": round(self.warmup_ms, 2)
+        }
+
+
+class ModelLoader:
+    """Tracks load handles and runs independent loads in parallel"""
+
+    def __init__(self, engine, max_parallel: int = 2, warmup_runs: int = 3):
+        self.engine = engine
+        self.max_parallel = max(1, max_parallel)
+        self.warmup_runs = warmup_runs
+        self._pool = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="model-load")
+        self._handles: "OrderedDict[str, LoadHandle]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._inflight: Dict[str, str] = {}  # resolved path -> handle id
+
+    def configure(self, max_parallel: int, warmup_runs: int):
+        max_parallel = max(1, max_parallel)
+        if max_parallel != self.max_parallel:
+            old_pool = self._pool
+            self._pool = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="model-load")
+            old_pool.shutdown(wait=False)
+            self.max_parallel = max_parallel
+        self.warmup_runs = warmup_runs
+
+    def submit(
+        self,
+        model_path: str,
+        precision: str = "FP32",
+        input_shapes: Optional[Dict[str, List[int]]] = None
+    ) -> LoadHandle:
+        """Start loading a model in the background and return its handle"""
+        resolved = "|".join([str(Path(model_path).resolve()), precision, format_shape_spec(input_shapes or {})])
+        if resolved in self._inflight:
+            return self._handles[self._inflight[resolved]]
+
+        handle = LoadHandle(
+            id=str(uuid.uuid4()),
+            model_path=model_path,
+            precision=precision,
+            input_shapes=input_shapes,
+            submitted_at=time.time()
+        )
+        self._handles[handle.id] = handle
+        self._inflight[resolved] = handle.id
+        self._tasks[handle.id] = asyncio.create_task(self._load(handle, resolved))
+        self._trim()
+        return handle
+
+    async def wait(self, handle_id: str) -> Optional[LoadHandle]:
+        """Wait for a load to finish"""
+        task = self._tasks.get(handle_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self._handles.get(handle_id)
+
+    def get(self, handle_id: str) -> Optional[LoadHandle]:
+        return self._handles.get(handle_id)
+
+    def list_handles(self) -> List[Dict[str, Any]]:
+        return [handle.to_dict() for handle in reversed(self._handles.values())]
+
+    async def _load(self, handle: LoadHandle, resolved: str):
+        loop = asyncio.get_running_loop()
+        engine = self.engine
+        start_time = time.perf_counter()
+
+        try:
+            path = Path(handle.model_path)
+            if not path.exists():
+                raise FileNotFoundError(f"Model not found: {handle.model_path}")
+
+            providers = engine.get_providers()
+
+            handle.status = "hashing"
+            handle.progress = 0.1
+            model_hash = await loop.run_in_executor(self._pool, ModelRegistry.hash_file, path)
+            input_shapes = handle.input_shapes or {}
+            key = engine.registry_key(model_hash, providers, handle.precision, input_shapes)
+
+            entry = engine.registry.lookup(key)
+            if entry is None:
+                handle.status = "loading"
+                handle.progress = 0.3
+                session = await loop.run_in_executor(
+                    self._pool, engine.create_session,
+                    path, providers, model_hash, handle.precision, input_shapes
+                )
+                handle.load_ms = (time.perf_counter() - start_time) * 1000
+
+                if self.warmup_runs > 0:
+                    handle.status = "warming_up"
+                    handle.progress = 0.7
+                    try:
+                        handle.warmup_ms = await loop.run_in_executor(
+                            self._pool, engine.warmup_session, session, self.warmup_runs, input_shapes
+                        )
+                    except Exception as e:
+                        # A model we cannot synthesize inputs for is still usable
+                        logger.warning(f"Warm-up skipped for {path.name}: {e}")
+
+                entry = engine.registry.add(key, path, session, providers, handle.precision, input_shapes)
+                logger.info(f"Model loaded: {entry.name} ({handle.load_ms:.0f} ms load, {handle.warmup_ms:.0f} ms warm-up)")
+            else:
+                handle.cached = True
+                logger.info(f"Model already loaded: {entry.name}")
+
+            handle.model_name = entry.name
+            handle.status = "ready"
+            handle.progress = 1.0
+        except Exception as e:
+            logger.error(f"Failed to load model: {e}")
+            handle.status = "failed"
+            handle.error = str(e)
+        finally:
+            handle.finished_at = time.time()
+            self._inflight.pop(resolved, None)
+            self._tasks.pop(handle.id, None)
+
+    def _trim(self):
+        """Forget the oldest finished handles beyond the tracking limit"""
+        for handle_id in list(self._handles):
+            if len(self._handles) <= MAX_TRACKED_HANDLES:
+                break
+            if self._handles[handle_id].done:
+                del self._handles[handle_id]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
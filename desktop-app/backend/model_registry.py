@@ -0,0 +1,202 @@
+"""
+Model Registry - LRU cache of loaded ONNX Runtime sessions
+Caps resident models by count and byte budget
+"""
+
+import logging
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+@dataclass
+class ModelEntry:
+    key: str
+    name: str
+    path: str
+    session: Any
+    size_bytes: int  # On-disk size, used as the resident memory estimate
+    providers: List[str]
+    loaded_at: float
+    last_used: float
+    precision: str = "FP32"  # Precision the session was built for
+    input_shapes: Dict[str, List[int]] = field(default_factory=dict)  # Static shape overrides it was built with
+    uses: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "path": self.path,
+            "size_mb": round(self.size_bytes / (1024 * 1024), 2),
+            "providers": self.providers,
+            "precision": self.precision,
+            "input_shapes": self.input_shapes,
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "uses": self.uses
+        }
+
+
+class ModelRegistry:
+    """Sessions keyed by content hash + providers, evicted least-recently-used first"""
+
+    def __init__(self, max_bytes: int = 4096 * 1024 * 1024, max_models: int = 16):
+        self.max_bytes = max_bytes
+        self.max_models = max_models
+        self._entries: "OrderedDict[str, ModelEntry]" = OrderedDict()
+        self._aliases: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.on_drop: Optional[Callable[[ModelEntry], None]] = None  # Release per-session state on remove/evict
+
+    def configure(self, max_bytes: int, max_models: int):
+        self.max_bytes = max_bytes
+        self.max_models = max_models
+        self._evict()
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        """SHA-256 of the model file contents"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(model_hash: str, providers: List[str], variant: str = "") -> str:
+        """Content hash plus provider list, and any build variant (precision, shapes)"""
+        key = f"{model_hash[:16]}:{','.join(providers)}"
+        return f"{key}:{variant}" if variant else key
+
+    def lookup(self, key: str) -> Optional[ModelEntry]:
+        """Find an entry by key on the load path, counting a cache hit or miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(entry)
+        return entry
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        Return the session registered under name, marking it most recently used.
+        Serving traffic is counted in the entry's uses, not in hits/misses.
+        """
+        key = self._aliases.get(name)
+        entry = self._entries.get(key) if key else None
+        if entry is None:
+            return None
+        self._touch(entry)
+        return entry.session
+
+    def entry(self, name: str) -> Optional[ModelEntry]:
+        """Entry metadata by name, without affecting recency or counters"""
+        return self._entries.get(self._aliases.get(name))
+
+    def add(
+        self,
+        key: str,
+        path: Path,
+        session: Any,
+        providers: List[str],
+        precision: str = "FP32",
+        input_shapes: Optional[Dict[str, List[int]]] = None
+    ) -> ModelEntry:
+        """Register a freshly created session and evict down to budget"""
+        name = path.stem
+        if self._aliases.get(name, key) != key:
+            # Same stem, different content, providers or variant: keep both under distinct
+            # names. Variants of one file share the hash prefix, so count up until free
+            base = name = f"{path.stem}-{key[:8]}"
+            suffix = 2
+            while self._aliases.get(name, key) != key:
+                name = f"{base}-{suffix}"
+                suffix += 1
+            logger.warning(f"Model name '{path.stem}' already in use, registered as '{name}'")
+
+        now = time.time()
+        entry = ModelEntry(
+            key=key,
+            name=name,
+            path=str(path),
+            session=session,
+            size_bytes=path.stat().st_size,
+            providers=providers,
+            loaded_at=now,
+            last_used=now,
+            precision=precision,
+            input_shapes=dict(input_shapes or {})
+        )
+        self._entries[key] = entry
+        self._aliases[name] = key
+        self._evict(keep=key)
+        return entry
+
+    def remove(self, name: str) -> bool:
+        key = self._aliases.get(name)
+        if key is None or key not in self._entries:
+            return False
+        self._drop(key)
+        return True
+
+    def has_key(self, key: str) -> bool:
+        return key in self._entries
+
+    def names(self) -> List[str]:
+        return [entry.name for entry in self._entries.values()]
+
+    def total_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def __contains__(self, name: str) -> bool:
+        return self._aliases.get(name) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _touch(self, entry: ModelEntry):
+        entry.last_used = time.time()
+        entry.uses += 1
+        self._entries.move_to_end(entry.key)
+
+    def _evict(self, keep: Optional[str] = None):
+        while self._entries and (
+            len(self._entries) > self.max_models or self.total_bytes() > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            if key == keep:
+                # The newest model alone exceeds the budget; keep it rather than thrash
+                break
+            logger.info(f"Evicting model: {self._entries[key].name}")
+            self._drop(key)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        if self._aliases.get(entry.name) == key:
+            del self._aliases[entry.name]
+        if self.on_drop:
+            self.on_drop(entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "models": len(self._entries),
+            "max_models": self.max_models,
+            "total_mb": round(self.total_bytes() / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": [entry.to_dict() for entry in reversed(self._entries.values())]
+        }
@@ -0,0 +1,232 @@
+"""
+Multi-Stream Benchmark - throughput and latency with K concurrent workloads
+CUDA streams, host threads with a stream each, or a NumPy thread pool on CPU
+"""
+
+import contextlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass, field
+
+from cpu_benchmarks import available_cores, blas_threads
+from jobs import JobControl
+from latency_stats import summarize
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import cupy as cp
+    HAS_CUPY = True
+except ImportError:
+    HAS_CUPY = False
+
+MODES = ("streams", "threads")
+DEFAULT_STREAM_COUNTS = [1, 2, 4, 8]
+
+
+@dataclass
+class StreamScalingPoint:
+    streams: int
+    ops: int
+    wall_time_s: float
+    throughput: float  # matmuls/second, aggregate across streams
+    gflops: float
+    speedup: float  # Throughput relative to one stream
+    efficiency: float  # speedup / streams; 1.0 is perfect scaling
+    latency: Dict[str, Any]  # All operations pooled
+    per_stream: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "streams": self.streams,
+            "ops": self.ops,
+            "wall_time_s": round(self.wall_time_s, 4),
+            "throughput": round(self.throughput, 2),
+            "gflops": round(self.gflops, 2),
+            "speedup": round(self.speedup, 3),
+            "efficiency": round(self.efficiency, 3),
+            "latency": self.latency,
+            "per_stream": self.per_stream
+        }
+
+
+class MultiStreamBenchmark:
+    """
+    Every stream gets its own operands and output, so the streams contend only
+    for the device. "streams" enqueues round-robin from one host thread onto K
+    CUDA streams and times each matmul with events; "threads" runs K host
+    threads that each issue and wait on their own work, like inference workers.
+    Without CuPy, "threads" runs NumPy matmuls with BLAS threads split across them.
+    """
+
+    def __init__(
+        self,
+        streams: Optional[List[int]] = None,
+        mode: str = "auto",
+        size: int = 1024,
+        iterations: int = 50,
+        backend: str = "auto"
+    ):
+        if backend == "auto":
+            backend = "cupy" if HAS_CUPY else "numpy"
+        if backend not in ("numpy", "cupy"):
+            raise ValueError(f"Unknown backend {backend}. Valid: ['auto', 'numpy', 'cupy']")
+        if backend == "cupy" and not HAS_CUPY:
+            raise ValueError("CuPy is not available")
+        if not HAS_NUMPY:
+            raise ValueError("NumPy is not available")
+        if mode == "auto":
+            mode = "streams" if backend == "cupy" else "threads"
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode}. Valid: {['auto', *MODES]}")
+        if mode == "streams" and backend == "numpy":
+            raise ValueError("CUDA streams need the CuPy backend; use mode 'threads'")
+
+        counts = sorted({int(k) for k in (streams or DEFAULT_STREAM_COUNTS)})
+        if not counts or counts[0] < 1:
+            raise ValueError("Stream counts must be positive")
+        if size < 1:
+            raise ValueError("Matrix size must be at least 1")
+        if counts[0] != 1:
+            counts.insert(0, 1)  # The single-stream baseline every speedup is measured against
+
+        self.backend = backend
+        self.mode = mode
+        self.stream_counts = counts
+        self.size = size
+        self.iterations = max(1, iterations)
+
+    def _operands(self, xp, k: int):
+        rng = np.random.default_rng(0)
+        a = rng.random((self.size, self.size), dtype=np.float32)
+        b = rng.random((self.size, self.size), dtype=np.float32)
+        return [(xp.asarray(a), xp.asarray(b), xp.empty((self.size, self.size), dtype=xp.float32)) for _ in range(k)]
+
+    def _run_cuda_streams(self, k: int, control: JobControl) -> Tuple[float, List[List[float]]]:
+        operands = self._operands(cp, k)
+        streams = [cp.cuda.Stream(non_blocking=True) for _ in range(k)]
+        for (a, b, out), stream in zip(operands, streams):
+            with stream:
+                cp.matmul(a, b, out=out)  # Warm up
+        cp.cuda.Device().synchronize()
+
+        events = [[(cp.cuda.Event(), cp.cuda.Event()) for _ in range(self.iterations)] for _ in range(k)]
+        start = time.perf_counter()
+        for i in range(self.iterations):
+            control.check()
+            for s in range(k):
+                a, b, out = operands[s]
+                with streams[s]:
+                    events[s][i][0].record()
+                    cp.matmul(a, b, out=out)
+                    events[s][i][1].record()
+        cp.cuda.Device().synchronize()
+        wall_time = time.perf_counter() - start
+
+        latencies = [[cp.cuda.get_elapsed_time(begin, end) for begin, end in per_stream] for per_stream in events]
+        return wall_time, latencies
+
+    def _run_threads(self, k: int, control: JobControl) -> Tuple[float, List[List[float]]]:
+        xp = cp if self.backend == "cupy" else np
+        operands = self._operands(xp, k)
+        barrier = threading.Barrier(k + 1)
+        # The current CUDA device is per host thread and pool threads start on device 0
+        device_id = cp.cuda.Device().id if self.backend == "cupy" else None
+
+        def worker(index: int) -> List[float]:
+            with cp.cuda.Device(device_id) if device_id is not None else contextlib.nullcontext():
+                return measure(index)
+
+        def measure(index: int) -> List[float]:
+            a, b, out = operands[index]
+            stream = cp.cuda.Stream(non_blocking=True) if self.backend == "cupy" else None
+            sync = stream.synchronize if stream else (lambda: None)
+            with stream if stream else contextlib.nullcontext():
+                try:
+                    xp.matmul(a, b, out=out)  # Warm up
+                    sync()
+                except Exception:
+                    barrier.abort()  # Release the others instead of deadlocking them
+                    raise
+                barrier.wait()
+                latencies = []
+                for _ in range(self.iterations):
+                    control.check()
+                    t0 = time.perf_counter()
+                    xp.matmul(a, b, out=out)
+                    sync()
+                    latencies.append((time.perf_counter() - t0) * 1000)
+            return latencies
+
+        # k BLAS-threaded matmuls at once would oversubscribe the cores
+        per_thread = max(1, available_cores() // k) if self.backend == "numpy" else None
+        with blas_threads(per_thread), ThreadPoolExecutor(max_workers=k, thread_name_prefix="multistream") as pool:
+            futures = [pool.submit(worker, i) for i in range(k)]
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                pass  # A worker failed; its exception surfaces from result() below
+            start = time.perf_counter()
+            latencies = [f.result() for f in futures]
+            wall_time = time.perf_counter() - start
+        return wall_time, latencies
+
+    def run(self, control: Optional[JobControl] = None) -> Dict[str, Any]:
+        control = control or JobControl()
+        flops = 2 * self.size ** 3
+        points: List[StreamScalingPoint] = []
+        for done, k in enumerate(self.stream_counts, 1):
+            if self.mode == "streams":
+                wall_time, latencies = self._run_cuda_streams(k, control)
+            else:
+                wall_time, latencies = self._run_threads(k, control)
+            if self.backend == "cupy":
+                cp.get_default_memory_pool().free_all_blocks()
+
+            ops = k * self.iterations
+            throughput = ops / wall_time
+            base = points[0].throughput if points else throughput
+            pooled = [ms for per_stream in latencies for ms in per_stream]
+            points.append(StreamScalingPoint(
+                streams=k,
+                ops=ops,
+                wall_time_s=wall_time,
+                throughput=throughput,
+                gflops=throughput * flops / 1e9,
+                speedup=throughput / base,
+                efficiency=throughput / base / k,
+                latency=_latency_summary(pooled),
+                per_stream=[{"stream": s, **_latency_summary(ms)} for s, ms in enumerate(latencies)]
+            ))
+            control.tick(done, len(self.stream_counts))
+
+        best = max(points, key=lambda p: p.throughput)
+        return {
+            "backend": self.backend,
+            "mode": self.mode,
+            "matrix_size": self.size,
+            "iterations_per_stream": self.iterations,
+            "points": [p.to_dict() for p in points],
+            "best_streams": best.streams,
+            "peak_gflops": round(best.gflops, 2)
+        }
+
+
+def _latency_summary(samples_ms: List[float]) -> Dict[str, Any]:
+    stats = summarize(samples_ms)
+    return {
+        "count": stats.count,
+        "mean_ms": round(stats.mean_ms, 4),
+        "p50_ms": round(stats.p50_ms, 4),
+        "p99_ms": round(stats.p99_ms, 4),
+        "max_ms": round(stats.max_ms, 4)
+    }
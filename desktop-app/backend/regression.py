@@ -0,0 +1,297 @@
+"""
+Benchmark Regression Tracking - named baselines and statistical change detection
+Runs are compared against the baseline for the same device, driver, type and params
+"""
+
+import json
+import logging
+import math
+import statistics
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass, asdict, field
+
+from latency_stats import t_critical_95
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD_PCT = 5.0
+DEFAULT_WINDOW = 5  # Recent runs compared against the baseline
+KEY_FIELDS = ("device_name", "driver_version", "benchmark_type", "params")
+
+
+def result_key(record: Dict[str, Any]) -> Tuple:
+    """What makes two results comparable; params are canonicalised so dict order does not matter"""
+    return (
+        record.get("device_name"),
+        record.get("driver_version"),
+        record.get("benchmark_type"),
+        json.dumps(record.get("params") or {}, sort_keys=True)
+    )
+
+
+def record_time(record: Dict[str, Any]) -> Optional[float]:
+    """Epoch seconds of a result's ISO timestamp, or None if it has none"""
+    value = record.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def key_dict(key: Tuple) -> Dict[str, Any]:
+    values = dict(zip(KEY_FIELDS, key))
+    values["params"] = json.loads(values["params"])
+    return values
+
+
+@dataclass
+class Baseline:
+    name: str
+    device_name: Optional[str]
+    driver_version: Optional[str]
+    benchmark_type: str
+    params: Dict[str, Any]
+    scores: List[float]
+    result_ids: List[str] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    runs_until: Optional[float] = None  # Timestamp of the newest baseline run
+
+    @property
+    def key(self) -> Tuple:
+        return result_key(asdict(self))
+
+    @property
+    def cutoff(self) -> float:
+        """Only runs after this are candidates; older ones predate the baseline"""
+        return self.runs_until if self.runs_until is not None else self.created_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "runs": len(self.scores),
+            "mean_score": round(statistics.fmean(self.scores), 3),
+            "stddev_score": round(statistics.stdev(self.scores), 3) if len(self.scores) > 1 else 0.0
+        }
+
+
+@dataclass
+class Comparison:
+    baseline: str
+    status: str  # regression, improvement, no_change, insufficient_data
+    change_pct: float  # Mean score change; scores are higher-is-better
+    change_ci95_pct: Tuple[float, float]
+    significant: bool
+    t_statistic: Optional[float]
+    degrees_of_freedom: Optional[float]
+    baseline_runs: int
+    candidate_runs: int
+    baseline_mean: float
+    candidate_mean: float
+    threshold_pct: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "change_pct": round(self.change_pct, 3),
+            "change_ci95_pct": [round(v, 3) for v in self.change_ci95_pct],
+            "t_statistic": round(self.t_statistic, 3) if self.t_statistic is not None else None,
+            "degrees_of_freedom": round(self.degrees_of_freedom, 1) if self.degrees_of_freedom is not None else None,
+            "baseline_mean": round(self.baseline_mean, 3),
+            "candidate_mean": round(self.candidate_mean, 3)
+        }
+
+
+def welch_test(baseline: List[float], candidate: List[float]) -> Tuple[float, float, float]:
+    """Welch's unequal-variance t-test; returns (t, degrees of freedom, standard error of the difference)"""
+    n1, n2 = len(baseline), len(candidate)
+    v1 = statistics.variance(baseline) / n1
+    v2 = statistics.variance(candidate) / n2
+    se = math.sqrt(v1 + v2)
+    diff = statistics.fmean(candidate) - statistics.fmean(baseline)
+    if se == 0:
+        return (math.copysign(math.inf, diff) if diff else 0.0), float(n1 + n2 - 2), 0.0
+    df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1)) if v1 or v2 else float(n1 + n2 - 2)
+    return diff / se, df, se
+
+
+def compare(baseline: Baseline, candidate: List[float], threshold_pct: float = DEFAULT_THRESHOLD_PCT) -> Comparison:
+    """
+    A change is reported only when it is both larger than threshold_pct and
+    significant at 95% (Welch's t-test), so run-to-run noise never fires on its
+    own and a real but tiny change never pages anyone.
+    """
+    base_mean = statistics.fmean(baseline.scores)
+    cand_mean = statistics.fmean(candidate)
+    change_pct = (cand_mean - base_mean) / base_mean * 100 if base_mean else 0.0
+
+    if len(baseline.scores) < 2 or len(candidate) < 2:
+        return Comparison(
+            baseline=baseline.name,
+            status="insufficient_data",
+            change_pct=change_pct,
+            change_ci95_pct=(change_pct, change_pct),
+            significant=False,
+            t_statistic=None,
+            degrees_of_freedom=None,
+            baseline_runs=len(baseline.scores),
+            candidate_runs=len(candidate),
+            baseline_mean=base_mean,
+            candidate_mean=cand_mean,
+            threshold_pct=threshold_pct
+        )
+
+    t, df, se = welch_test(baseline.scores, candidate)
+    critical = t_critical_95(max(1, int(df)))
+    significant = abs(t) > critical
+    half_width_pct = critical * se / base_mean * 100 if base_mean else 0.0
+
+    if significant and change_pct <= -threshold_pct:
+        status = "regression"
+    elif significant and change_pct >= threshold_pct:
+        status = "improvement"
+    else:
+        status = "no_change"
+
+    return Comparison(
+        baseline=baseline.name,
+        status=status,
+        change_pct=change_pct,
+        change_ci95_pct=(change_pct - half_width_pct, change_pct + half_width_pct),
+        significant=significant,
+        t_statistic=t if math.isfinite(t) else None,
+        degrees_of_freedom=df,
+        baseline_runs=len(baseline.scores),
+        candidate_runs=len(candidate),
+        baseline_mean=base_mean,
+        candidate_mean=cand_mean,
+        threshold_pct=threshold_pct
+    )
+
+
+class BaselineStore:
+    """Named baselines persisted as one JSON file; the newest baseline per key is the active one"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._baselines: Dict[str, Baseline] = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    for item in json.load(f):
+                        self._baselines[item["name"]] = Baseline(**item)
+            except (OSError, ValueError, TypeError) as e:
+                logger.error(f"Error loading baselines {self.path}: {e}")
+
+    def _save(self):
+        try:
+            with open(self.path, "w") as f:
+                json.dump([asdict(b) for b in self._baselines.values()], f, indent=2)
+        except OSError as e:
+            logger.error(f"Error saving baselines {self.path}: {e}")
+
+    def create(self, name: str, records: List[Dict[str, Any]]) -> Baseline:
+        """Baseline from result records that must all share one key. Raises ValueError"""
+        if not records:
+            raise ValueError("A baseline needs at least one result")
+        keys = {result_key(r) for r in records}
+        if len(keys) > 1:
+            raise ValueError("Results differ in device, driver, benchmark type or params")
+        times = [t for t in map(record_time, records) if t is not None]
+        baseline = Baseline(
+            name=name,
+            scores=[float(r["score"]) for r in records],
+            result_ids=[r.get("id") for r in records],
+            runs_until=max(times) if times else None,
+            **key_dict(keys.pop())
+        )
+        with self._lock:
+            self._baselines[name] = baseline
+            self._save()
+        logger.info(f"Baseline {name} created from {len(records)} runs of {baseline.benchmark_type}")
+        return baseline
+
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            if self._baselines.pop(name, None) is None:
+                return False
+            self._save()
+        return True
+
+    def get(self, name: str) -> Optional[Baseline]:
+        return self._baselines.get(name)
+
+    def list(self) -> List[Baseline]:
+        return sorted(self._baselines.values(), key=lambda b: b.created_at, reverse=True)
+
+    def active(self, key: Tuple) -> Optional[Baseline]:
+        matches = [b for b in self._baselines.values() if b.key == key]
+        return max(matches, key=lambda b: b.created_at) if matches else None
+
+
+class RegressionTracker:
+    """Compares results from a ResultHistory against the BaselineStore"""
+
+    def __init__(self, history, baselines: BaselineStore, threshold_pct: float = DEFAULT_THRESHOLD_PCT, window: int = DEFAULT_WINDOW):
+        self.history = history
+        self.baselines = baselines
+        self.threshold_pct = threshold_pct
+        self.window = window
+
+    def _recent_scores(self, key: Tuple, baseline: Baseline, window: int, latest: Optional[Dict[str, Any]] = None) -> List[float]:
+        """Newest runs for the key made after the baseline's runs (so never the baseline itself)"""
+        excluded = set(baseline.result_ids)
+        records = [latest] if latest else []
+        records += [
+            r for r in self.history.list(None, **{"benchmark_type": key[2]})
+            if result_key(r) == key and r.get("id") not in excluded
+            and (record_time(r) or 0.0) > baseline.cutoff
+        ]
+        return [float(r["score"]) for r in records[:window]]
+
+    def check(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Comparison for a new result (not yet in history) against its active baseline"""
+        key = result_key(record)
+        baseline = self.baselines.active(key)
+        if baseline is None:
+            return None
+        scores = self._recent_scores(key, baseline, self.window, latest=record)
+        comparison = compare(baseline, scores, self.threshold_pct)
+        if comparison.status == "regression":
+            logger.warning(
+                f"{record.get('benchmark_type')} on {record.get('device_name')} regressed "
+                f"{comparison.change_pct:.1f}% vs baseline {baseline.name}"
+            )
+        return comparison.to_dict()
+
+    def report(self, threshold_pct: Optional[float] = None, window: Optional[int] = None) -> Dict[str, Any]:
+        """Latest comparison for every key with a baseline; regressions first"""
+        threshold_pct = self.threshold_pct if threshold_pct is None else threshold_pct
+        window = window or self.window
+        active: Dict[Tuple, Baseline] = {}
+        for baseline in self.baselines.list():
+            active.setdefault(baseline.key, baseline)  # list() is newest first
+
+        entries = []
+        for key, baseline in active.items():
+            scores = self._recent_scores(key, baseline, window)
+            if not scores:
+                continue
+            entries.append({**key_dict(key), **compare(baseline, scores, threshold_pct).to_dict()})
+
+        order = {"regression": 0, "improvement": 1, "insufficient_data": 2, "no_change": 3}
+        entries.sort(key=lambda e: (order[e["status"]], e["change_pct"]))
+        return {
+            "threshold_pct": threshold_pct,
+            "window": window,
+            "regressions": sum(1 for e in entries if e["status"] == "regression"),
+            "improvements": sum(1 for e in entries if e["status"] == "improvement"),
+            "entries": entries
+        }
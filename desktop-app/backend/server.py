@@ -3,10 +3,11 @@ AI Forge Studio - Desktop Backend Server
 Complete API server with real hardware support
 """
 
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 import os
 import json
 import uuid
@@ -16,9 +17,25 @@ from pathlib import Path
 from datetime import datetime, timezone
 
 # Import our modules
-from gpu_monitor import GPUMonitor, get_monitor, GPUInfo
+from gpu_monitor import GPUMonitor, get_monitor, GPUInfo, DeviceManager, get_device_manager
 from benchmarks import BenchmarkRunner, get_benchmark_runner, BenchmarkResult
 from inference import InferenceEngine, get_inference_engine, InferenceResult
+from engine_cache import parse_shape_spec
+from latency_stats import AdaptiveConfig
+from sweep import run_sweep
+from cpu_tuning import CpuTuning
+from telemetry import get_poller, get_sampler, stop_samplers, TelemetrySampler
+from telemetry_providers import create_provider, TraceRecorder
+from simulation import get_seed, set_seed
+from thermal import run_monitored, DEFAULT_THERMAL_LIMIT_C
+from jobs import BenchmarkJobQueue, BenchmarkJob
+from history import ResultHistory
+from regression import BaselineStore, RegressionTracker, result_key, DEFAULT_WINDOW
+from analytics import (
+    aggregate, parse_list, BENCHMARK_GROUPS, BENCHMARK_METRICS, INFERENCE_GROUPS, INFERENCE_METRICS
+)
+from telemetry_stream import TelemetryStream, parse_fields, active_stream_count
+from timeseries import get_store, close_stores
 
 # Try to import emergent integrations for AI chat
 HAS_EMERGENT = False
@@ -47,6 +64,11 @@ api_router = APIRouter(prefix="/api")
 # Config
 CONFIG_FILE = Path("./config.json")
 MODELS_DIR = Path("./models")
+TELEMETRY_DIR = Path("./telemetry")
+BENCHMARK_HISTORY_FILE = Path("./benchmark_history.jsonl")
+BENCHMARK_BASELINES_FILE = Path("./benchmark_baselines.json")
+INFERENCE_HISTORY_FILE = Path("./inference_history.jsonl")
+BENCHMARK_TYPES = ["cuda", "tensorrt", "vulkan", "general", "bandwidth", "cpu", "multistream"]
 
 # =============================================================================
 # Pydantic Models
@@ -63,6 +85,34 @@ class AppSettings(BaseModel):
     theme: str = "dark"
     language: str = "ar"
     auto_refresh_interval: int = 2000  # ms
+    max_batch_size: int = 8
+    max_batch_wait_ms: float = 5.0
+    inference_workers: int = 4
+    per_model_concurrency: int = 1
+    model_cache_max_mb: int = 4096
+    model_cache_max_models: int = 16
+    preload_models: List[str] = []  # File names in models_directory, loaded at startup
+    max_parallel_loads: int = 2
+    load_warmup_runs: int = 3
+    engine_cache_enabled: bool = True  # Optimized graphs / TensorRT engines under models_directory/.cache
+    serve_io_binding: bool = False  # Reuse preallocated IOBinding buffers for batched serving
+    force_cpu: bool = False  # Run inference on CPUExecutionProvider even when a GPU is present
+    cpu_intra_op_threads: int = 0  # 0 = ONNX Runtime default
+    cpu_inter_op_threads: int = 0
+    cpu_execution_mode: str = "sequential"  # sequential, parallel
+    cpu_allow_spinning: bool = True
+    cpu_affinity_cores: List[int] = []
+    cpu_numa_node: Optional[int] = None
+    telemetry_interval_ms: int = 1000  # Background GPU sampling period
+    telemetry_history_size: int = 3600  # Samples kept in memory per device
+    telemetry_store_enabled: bool = True  # Persist 1s/1m/1h rollups under ./telemetry
+    telemetry_retention_hours: Dict[str, float] = {"1s": 6, "1m": 168, "1h": 8760}
+    telemetry_provider: str = "auto"  # auto, nvml, nvidia-smi, synthetic, replay
+    simulation_seed: Optional[int] = None  # Fixes every simulated sample/result when set
+    synthetic_devices: int = 1
+    replay_path: str = ""  # JSONL trace written by telemetry_record_path
+    replay_speed: float = 1.0
+    telemetry_record_path: str = ""  # Append every sample to this JSONL trace
     updated_at: str = ""
 
 class SettingsUpdate(BaseModel):
@@ -75,6 +125,34 @@ class SettingsUpdate(BaseModel):
     theme: Optional[str] = None
     language: Optional[str] = None
     auto_refresh_interval: Optional[int] = None
+    max_batch_size: Optional[int] = None
+    max_batch_wait_ms: Optional[float] = None
+    inference_workers: Optional[int] = None
+    per_model_concurrency: Optional[int] = None
+    model_cache_max_mb: Optional[int] = None
+    model_cache_max_models: Optional[int] = None
+    preload_models: Optional[List[str]] = None
+    max_parallel_loads: Optional[int] = None
+    load_warmup_runs: Optional[int] = None
+    engine_cache_enabled: Optional[bool] = None
+    serve_io_binding: Optional[bool] = None
+    force_cpu: Optional[bool] = None
+    cpu_intra_op_threads: Optional[int] = None
+    cpu_inter_op_threads: Optional[int] = None
+    cpu_execution_mode: Optional[Literal["sequential", "parallel"]] = None
+    cpu_allow_spinning: Optional[bool] = None
+    cpu_affinity_cores: Optional[List[int]] = None
+    cpu_numa_node: Optional[int] = None
+    telemetry_interval_ms: Optional[int] = None
+    telemetry_history_size: Optional[int] = None
+    telemetry_store_enabled: Optional[bool] = None
+    telemetry_retention_hours: Optional[Dict[str, float]] = None
+    telemetry_provider: Optional[str] = None
+    simulation_seed: Optional[int] = None
+    synthetic_devices: Optional[int] = None
+    replay_path: Optional[str] = None
+    replay_speed: Optional[float] = None
+    telemetry_record_path: Optional[str] = None
 
 class ChatRequest(BaseModel):
     message: str
@@ -87,14 +165,44 @@ class ChatResponse(BaseModel):
 
 class InferenceRequest(BaseModel):
     model_name: str = "ResNet50"
-    batch_size: int = 1
+    batch_size: int = Field(1, ge=1)
+    precision: str = "FP16"
+    framework: str = "TensorRT"
+    use_batching: bool = False  # Serve through the dynamic micro-batcher
+    statistical: bool = False  # Adaptive warmup/run count with percentiles and CIs
+    max_runs: int = Field(1000, ge=1)
+    ci_target_pct: float = Field(1.0, gt=0)
+    io_binding: bool = False  # Preallocated, reused input/output buffers in the timed loop
+
+class SweepRequest(BaseModel):
+    model_name: str = "ResNet50"
+    batch_sizes: List[int] = [1, 2, 4, 8, 16, 32]
+    streams: List[int] = [1, 2, 4]
     precision: str = "FP16"
     framework: str = "TensorRT"
+    runs_per_stream: int = Field(50, ge=1)
+    warmup_runs: int = Field(5, ge=0)
+    slo_p99_ms: Optional[float] = None
 
 class BenchmarkRequest(BaseModel):
     benchmark_type: str
     iterations: Optional[int] = 100
 
+class BenchmarkJobRequest(BaseModel):
+    benchmark_type: str
+    device: int = 0
+    cooldown_temp_c: Optional[float] = None
+    cooldown_timeout_s: float = 120.0
+    sample_interval_ms: int = 200
+    thermal_limit_c: float = DEFAULT_THERMAL_LIMIT_C
+    params: Dict[str, Any] = {}  # Benchmark-specific, e.g. bandwidth sizes and patterns
+
+class BaselineRequest(BaseModel):
+    name: str
+    result_ids: Optional[List[str]] = None  # Exactly these runs...
+    result_id: Optional[str] = None  # ...or the latest `runs` runs comparable to this one
+    runs: int = DEFAULT_WINDOW
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -119,6 +227,184 @@ def save_config(settings: AppSettings):
     except Exception as e:
         logger.error(f"Error saving config: {e}")
 
+def apply_engine_settings(settings: AppSettings):
+    """Push inference-related settings to the engine"""
+    engine = get_inference_engine()
+    engine.batcher.configure(settings.max_batch_size, settings.max_batch_wait_ms)
+    engine.executor.configure(settings.inference_workers, settings.per_model_concurrency)
+    engine.registry.configure(settings.model_cache_max_mb * 1024 * 1024, settings.model_cache_max_models)
+    engine.loader.configure(settings.max_parallel_loads, settings.load_warmup_runs)
+    engine.engine_cache.enabled = settings.engine_cache_enabled
+    engine.engine_cache.root = Path(settings.models_directory) / ".cache"
+    engine.serve_io_binding = settings.serve_io_binding
+    engine.force_cpu = settings.force_cpu
+    try:
+        engine.cpu_tuning = CpuTuning(
+            intra_op_threads=settings.cpu_intra_op_threads,
+            inter_op_threads=settings.cpu_inter_op_threads,
+            execution_mode=settings.cpu_execution_mode,
+            allow_spinning=settings.cpu_allow_spinning,
+            cores=settings.cpu_affinity_cores,
+            numa_node=settings.cpu_numa_node
+        )
+    except ValueError as e:
+        logger.error(f"Keeping current CPU tuning: {e}")
+
+# Provider configuration currently applied, so unrelated settings changes keep its state
+_provider_spec: Optional[tuple] = None
+_recorder: Optional[TraceRecorder] = None
+
+def apply_telemetry_settings(settings: AppSettings):
+    """Configure and (re)start the telemetry poller, its provider, stores and recorder"""
+    global _provider_spec, _recorder
+    if settings.simulation_seed != get_seed():
+        set_seed(settings.simulation_seed)  # Reseeding restarts every stream, so only on change
+    poller = get_poller()
+
+    spec = (settings.telemetry_provider, settings.simulation_seed, settings.synthetic_devices,
+            settings.replay_path, settings.replay_speed)
+    if spec != _provider_spec:
+        try:
+            poller.set_provider(create_provider(*spec))
+            _provider_spec = spec
+        except ValueError as e:
+            logger.error(f"Keeping {poller.provider.name} telemetry provider: {e}")
+
+    if _recorder and str(_recorder.path) != settings.telemetry_record_path:
+        for sampler in poller.samplers.values():
+            sampler.remove_listener(_recorder.listener(sampler.device_index))
+        _recorder.close()
+        _recorder = None
+    if settings.telemetry_record_path and _recorder is None:
+        _recorder = TraceRecorder(settings.telemetry_record_path)
+
+    poller.configure(settings.telemetry_interval_ms / 1000, settings.telemetry_history_size)
+    for sampler in poller.samplers.values():
+        store = get_store(sampler.device_index, TELEMETRY_DIR)
+        store.configure(settings.telemetry_retention_hours)
+        if settings.telemetry_store_enabled:
+            sampler.add_listener(store.append)
+        else:
+            sampler.remove_listener(store.append)
+        if _recorder:
+            sampler.add_listener(_recorder.listener(sampler.device_index))
+    poller.start()
+
+def device_sampler(device: int) -> TelemetrySampler:
+    try:
+        return get_sampler(device)
+    except IndexError as e:
+        raise HTTPException(404, str(e))
+
+def latest_sample(sampler: TelemetrySampler) -> GPUInfo:
+    """Latest sample, or 503 while telemetry has not produced one (e.g. nvidia-smi failing)"""
+    info = sampler.latest()
+    if info is None:
+        raise HTTPException(503, f"No telemetry sample available for GPU {sampler.device_index} yet")
+    return info
+
+async def run_benchmark_job(job: BenchmarkJob) -> Dict[str, Any]:
+    """Job queue runner: cool-down, then the benchmark on a worker thread under telemetry"""
+    options = job.options
+    runner = get_benchmark_runner()
+    get_poller().start()
+    job.control.begin_stage("cooldown")
+    # asyncio.run on a worker thread keeps the event loop (and /api/gpu/stream) responsive
+    result, thermal = await run_monitored(
+        device_sampler(job.device),
+        lambda: asyncio.to_thread(asyncio.run, runner.run_benchmark(job.benchmark_type, job.control, job.device, options.get("params"))),
+        cooldown_temp_c=options.get("cooldown_temp_c"),
+        cooldown_timeout_s=options.get("cooldown_timeout_s", 120.0),
+        sample_interval_s=options.get("sample_interval_ms", 200) / 1000,
+        thermal_limit_c=options.get("thermal_limit_c", DEFAULT_THERMAL_LIMIT_C),
+        check=job.control.check
+    )
+    
+    if thermal.samples:
+        result.temperature = thermal.temperature_max
+    result_dict = result.to_dict()
+    result_dict["thermal"] = thermal.to_dict()
+    result_dict["throttled"] = thermal.throttled
+    result_dict["perf_per_watt"] = thermal.perf_per_watt
+    result_dict["requested_type"] = job.benchmark_type  # e.g. "cuda" for a cuda_matmul result
+    result_dict["device"] = job.device
+    # Regression baselines key on these: a new driver or different params is a different baseline
+    static = get_poller().provider.static_info(job.device)
+    result_dict["device_name"] = result.details.get("device") or static.get("name")
+    result_dict["driver_version"] = static.get("driver_version") if result.backend != "cpu" else None
+    result_dict["params"] = options.get("params") or {}
+    result_dict["job_id"] = job.id
+    result_dict["id"] = str(uuid.uuid4())
+    result_dict["timestamp"] = datetime.now(timezone.utc).isoformat()
+    return result_dict
+
+_benchmark_history: Optional[ResultHistory] = None
+_inference_history: Optional[ResultHistory] = None
+_regression_tracker: Optional[RegressionTracker] = None
+_job_queue: Optional[BenchmarkJobQueue] = None
+
+def get_benchmark_history() -> ResultHistory:
+    global _benchmark_history
+    if _benchmark_history is None:
+        _benchmark_history = ResultHistory(BENCHMARK_HISTORY_FILE)
+    return _benchmark_history
+
+def get_inference_history() -> ResultHistory:
+    global _inference_history
+    if _inference_history is None:
+        _inference_history = ResultHistory(INFERENCE_HISTORY_FILE)
+    return _inference_history
+
+def run_stats(history: ResultHistory, allowed_groups, allowed_metrics, group_by, metrics, bucket, since, until, filters):
+    """Grouped stats over a history; bad group/metric/bucket names are a 400"""
+    try:
+        return aggregate(
+            history.list(None),
+            parse_list(group_by, allowed_groups, allowed_groups[:1], "group_by fields"),
+            parse_list(metrics, allowed_metrics, allowed_metrics, "metrics"),
+            bucket, since, until, filters
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+def get_regression_tracker() -> RegressionTracker:
+    global _regression_tracker
+    if _regression_tracker is None:
+        _regression_tracker = RegressionTracker(get_benchmark_history(), BaselineStore(BENCHMARK_BASELINES_FILE))
+    return _regression_tracker
+
+def record_benchmark_result(result: Dict[str, Any]):
+    """Compare against the active baseline, then append to history"""
+    result["regression"] = get_regression_tracker().check(result)
+    get_benchmark_history().add(result)
+
+def get_job_queue() -> BenchmarkJobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = BenchmarkJobQueue(run_benchmark_job, on_complete=record_benchmark_result)
+    return _job_queue
+
+def submit_benchmark(request: BenchmarkJobRequest) -> BenchmarkJob:
+    if request.benchmark_type not in BENCHMARK_TYPES:
+        raise HTTPException(400, f"Invalid benchmark type. Valid: {BENCHMARK_TYPES}")
+    device_sampler(request.device)  # 404 before queueing for an unknown GPU
+    try:
+        BenchmarkRunner.validate_params(request.benchmark_type, request.params)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(400, f"Invalid {request.benchmark_type} params: {e}")
+    options = request.model_dump(exclude={"benchmark_type", "device"})
+    return get_job_queue().submit(request.benchmark_type, request.device, options)
+
+def preload_models(settings: AppSettings):
+    """Start background loads for the configured preload list"""
+    engine = get_inference_engine()
+    models_dir = Path(settings.models_directory)
+    for name in settings.preload_models:
+        path = models_dir / (name if name.endswith(".onnx") else f"{name}.onnx")
+        handle = engine.load_model_background(str(path))
+        if handle:
+            logger.info(f"Preloading model: {path}")
+
 # Chat presets
 PRESET_PROMPTS = {
     "gpu_problem": "أنا أواجه مشكلة في أداء بطاقة الرسومات GPU. هل يمكنك مساعدتي في تشخيص المشكلة وتقديم حلول؟",
@@ -139,7 +425,7 @@ async def root():
     return {
         "message": "AI Forge Studio API v2.0",
         "status": "running",
-        "gpu_available": GPUMonitor.is_gpu_available(),
+        "gpu_available": get_device_manager().count > 0,
         "cuda_available": get_benchmark_runner().is_cuda_available()
     }
 
@@ -147,8 +433,8 @@ async def root():
 async def get_system_info():
     """Get system capabilities"""
     return {
-        "gpu_available": GPUMonitor.is_gpu_available(),
-        "gpu_count": GPUMonitor.get_device_count(),
+        "gpu_available": get_device_manager().count > 0,
+        "gpu_count": get_device_manager().count,
         "cuda_available": get_benchmark_runner().is_cuda_available(),
         "has_emergent_ai": HAS_EMERGENT,
         "models_directory": str(MODELS_DIR),
@@ -157,49 +443,299 @@ async def get_system_info():
 
 # GPU Routes
 @api_router.get("/gpu/info")
-async def get_gpu_info():
-    """Get current GPU information"""
-    monitor = get_monitor()
-    info = monitor.get_gpu_info()
-    return info.to_dict()
+async def get_gpu_info(device: int = 0):
+    """Get current GPU information (latest background sample)"""
+    return latest_sample(device_sampler(device)).to_dict()
+
+@api_router.get("/gpu/history")
+async def get_gpu_history(seconds: Optional[float] = None, device: int = 0):
+    """Buffered telemetry samples, oldest first"""
+    return device_sampler(device).history(seconds)
+
+@api_router.get("/gpu/telemetry")
+async def get_telemetry_stats(device: int = 0):
+    """Sampler health: rate, buffer fill, per-sample cost"""
+    return {**device_sampler(device).get_stats(), "subscribers": active_stream_count(device)}
+
+@api_router.get("/gpu/timeseries")
+async def get_gpu_timeseries(
+    metrics: Optional[str] = None,
+    hours: float = 1.0,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: Optional[str] = None,
+    max_points: int = 1000,
+    device: int = 0
+):
+    """
+    Stored metric history, e.g. ?metrics=temperature,power_usage&hours=6&resolution=1m.
+    start/end are epoch seconds and override hours; resolution defaults to the
+    finest rollup that fits max_points.
+    """
+    device_sampler(device)
+    store = get_store(device, TELEMETRY_DIR)
+    end = end or datetime.now(timezone.utc).timestamp()
+    start = start if start is not None else end - hours * 3600
+    fields = [m.strip() for m in metrics.split(",") if m.strip()] if metrics else None
+    try:
+        return await asyncio.to_thread(store.query, start, end, resolution, fields, max_points)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@api_router.get("/gpu/timeseries/stats")
+async def get_gpu_timeseries_stats(device: int = 0):
+    device_sampler(device)
+    return get_store(device, TELEMETRY_DIR).get_stats()
+
+def open_telemetry_stream(device: int, interval_ms: int, fields: Optional[str]) -> TelemetryStream:
+    """Raises ValueError for unknown fields, IndexError for unknown devices"""
+    sampler = get_sampler(device)
+    get_poller().start()
+    return TelemetryStream(sampler, interval_ms / 1000, parse_fields(fields))
+
+@api_router.websocket("/gpu/stream")
+async def stream_gpu_telemetry(websocket: WebSocket, interval_ms: int = 1000, fields: Optional[str] = None, device: int = 0):
+    """
+    Push telemetry frames. Clients may send {"interval_ms": ..., "fields": "a,b"}
+    at any time to change rate or field subset.
+    """
+    try:
+        stream = open_telemetry_stream(device, interval_ms, fields)
+    except (ValueError, IndexError) as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    await websocket.accept()
+
+    async def receive_updates():
+        while True:
+            try:
+                message = await websocket.receive_json()
+                if not isinstance(message, dict):
+                    raise TypeError("Expected a JSON object")
+                stream.update(
+                    interval_s=message["interval_ms"] / 1000 if "interval_ms" in message else None,
+                    fields=parse_fields(message["fields"]) if "fields" in message else None
+                )
+            except (ValueError, TypeError, KeyError) as e:
+                # Malformed JSON or values: report and keep the stream running
+                await websocket.send_json({"error": str(e)})
+
+    receiver = asyncio.create_task(receive_updates())
+    try:
+        async for frame in stream.frames():
+            if receiver.done():
+                break
+            await websocket.send_json(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        # Retrieve the receiver's outcome (usually WebSocketDisconnect) so it is never lost
+        result, = await asyncio.gather(receiver, return_exceptions=True)
+        if isinstance(result, Exception) and not isinstance(result, WebSocketDisconnect):
+            logger.error(f"Telemetry stream receiver failed: {result}")
+
+@api_router.get("/gpu/stream/sse")
+async def stream_gpu_telemetry_sse(request: Request, interval_ms: int = 1000, fields: Optional[str] = None, device: int = 0):
+    """Server-Sent Events variant of /gpu/stream"""
+    try:
+        stream = open_telemetry_stream(device, interval_ms, fields)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except IndexError as e:
+        raise HTTPException(404, str(e))
+
+    async def events():
+        async for frame in stream.frames():
+            if await request.is_disconnected():
+                break
+            yield f"data: {json.dumps(frame)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @api_router.get("/gpu/devices")
 async def get_gpu_devices():
-    """Get list of available GPUs"""
-    count = GPUMonitor.get_device_count()
-    devices = []
-    for i in range(count):
-        monitor = GPUMonitor(i)
-        info = monitor.get_gpu_info()
-        devices.append({"index": i, "name": info.name})
-    return {"count": count, "devices": devices}
+    """Get list of available GPUs (static properties, cached per device)"""
+    provider = get_poller().provider
+    devices = provider.list_devices()
+    return {"count": len(devices), "provider": provider.name, "devices": devices}
+
+@api_router.get("/gpu/devices/{device_index}")
+async def get_gpu_device(device_index: int):
+    """Static properties plus the latest sample for one device"""
+    sampler = device_sampler(device_index)
+    return {
+        "index": device_index,
+        "static": get_poller().provider.static_info(device_index),
+        "info": latest_sample(sampler).to_dict()
+    }
+
+@api_router.get("/gpu/aggregate")
+async def get_gpu_aggregate():
+    """Node-level totals from the latest sample of every device"""
+    poller = get_poller()
+    infos = [latest_sample(sampler) for sampler in poller.samplers.values()]
+    return {
+        **DeviceManager.aggregate(infos),
+        "devices": [{"index": i, **info.to_dict()} for i, info in enumerate(infos)]
+    }
 
 # Benchmark Routes
-@api_router.post("/benchmark/{benchmark_type}")
-async def run_benchmark(benchmark_type: str):
-    """Run a specific benchmark"""
-    valid_types = ["cuda", "tensorrt", "vulkan", "general"]
-    if benchmark_type not in valid_types:
-        raise HTTPException(400, f"Invalid benchmark type. Valid: {valid_types}")
+@api_router.post("/benchmark/jobs")
+async def submit_benchmark_job(request: BenchmarkJobRequest):
+    """Queue a benchmark and return immediately; poll the job or follow its events"""
+    return submit_benchmark(request).to_dict()
+
+@api_router.get("/benchmark/jobs")
+async def list_benchmark_jobs():
+    return {"jobs": get_job_queue().list_jobs()}
+
+@api_router.get("/benchmark/jobs/{job_id}")
+async def get_benchmark_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if not job:
+        raise HTTPException(404, f"Job {job_id} not found")
+    return job.to_dict()
+
+@api_router.get("/benchmark/jobs/{job_id}/events")
+async def stream_benchmark_job(request: Request, job_id: str, interval_ms: int = 200):
+    """Server-Sent Events: the job's state whenever its status, stage or progress changes"""
+    job = get_job_queue().get(job_id)
+    if not job:
+        raise HTTPException(404, f"Job {job_id} not found")
     
-    runner = get_benchmark_runner()
-    result = await runner.run_benchmark(benchmark_type)
+    async def events():
+        last = None
+        while True:
+            state = job.to_dict()
+            key = (state["status"], state["stage"], state["progress"])
+            if key != last:
+                last = key
+                yield f"event: {state['status']}\ndata: {json.dumps(state)}\n\n"
+            if job.finished or await request.is_disconnected():
+                break
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=max(interval_ms, 50) / 1000)
+            except asyncio.TimeoutError:
+                pass
     
-    # Add temperature from GPU monitor
-    gpu_info = get_monitor().get_gpu_info()
-    result_dict = result.to_dict()
-    result_dict["temperature"] = gpu_info.temperature
-    result_dict["id"] = str(uuid.uuid4())
-    result_dict["timestamp"] = datetime.now(timezone.utc).isoformat()
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@api_router.delete("/benchmark/jobs/{job_id}")
+async def cancel_benchmark_job(job_id: str):
+    """Cancel a queued job, or stop a running one at its next iteration"""
+    job = get_job_queue().cancel(job_id)
+    if not job:
+        raise HTTPException(404, f"Job {job_id} not found")
+    return job.to_dict()
+
+@api_router.get("/benchmark/history")
+async def get_benchmark_history_records(limit: int = 20, benchmark_type: Optional[str] = None, device: Optional[int] = None):
+    """Completed benchmark results, newest first"""
+    return {"results": get_benchmark_history().list(limit, requested_type=benchmark_type, device=device)}
+
+@api_router.get("/benchmark/stats")
+async def get_benchmark_stats(
+    group_by: Optional[str] = None,
+    metrics: Optional[str] = None,
+    bucket: str = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    benchmark_type: Optional[str] = None,
+    device: Optional[int] = None
+):
+    """
+    count/mean/p50/p95/min/max of score, fps and time_ms grouped by any of
+    benchmark_type, requested_type, device, device_name, backend and bucket
+    (a time bucket of `bucket` size). Same shape as the web backend's endpoint.
+    """
+    return run_stats(
+        get_benchmark_history(), BENCHMARK_GROUPS, BENCHMARK_METRICS, group_by, metrics, bucket, since, until,
+        {"requested_type": benchmark_type, "device": device}  # As /benchmark/history filters
+    )
+
+@api_router.get("/benchmark/baselines")
+async def list_baselines():
+    return {"baselines": [b.to_dict() for b in get_regression_tracker().baselines.list()]}
+
+@api_router.post("/benchmark/baselines")
+async def create_baseline(request: BaselineRequest):
+    """
+    Name a set of runs as the baseline for their device, driver, benchmark type
+    and params. Later runs with the same key are compared against it.
+    """
+    history = get_benchmark_history()
+    if request.result_ids:
+        records = []
+        for result_id in request.result_ids:
+            found = history.list(1, id=result_id)
+            if not found:
+                raise HTTPException(404, f"Result {result_id} not found")
+            records.extend(found)
+    elif request.result_id:
+        found = history.list(1, id=request.result_id)
+        if not found:
+            raise HTTPException(404, f"Result {request.result_id} not found")
+        key = result_key(found[0])
+        records = [r for r in history.list(None, benchmark_type=found[0]["benchmark_type"]) if result_key(r) == key]
+        records = records[:max(1, request.runs)]
+    else:
+        raise HTTPException(400, "Provide result_ids or result_id")
     
-    return result_dict
+    try:
+        return get_regression_tracker().baselines.create(request.name, records).to_dict()
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@api_router.delete("/benchmark/baselines/{name}")
+async def delete_baseline(name: str):
+    if not get_regression_tracker().baselines.delete(name):
+        raise HTTPException(404, f"Baseline {name} not found")
+    return {"message": f"Baseline {name} deleted"}
+
+@api_router.get("/benchmark/regressions")
+async def get_regression_report(threshold_pct: Optional[float] = None, window: Optional[int] = None):
+    """Recent runs vs their baselines; slowdowns beyond threshold_pct that are significant at 95% are flagged"""
+    return get_regression_tracker().report(threshold_pct, window)
+
+@api_router.post("/benchmark/{benchmark_type}")
+async def run_benchmark(
+    benchmark_type: str,
+    device: int = 0,
+    cooldown_temp_c: Optional[float] = None,
+    cooldown_timeout_s: float = 120.0,
+    sample_interval_ms: int = 200,
+    thermal_limit_c: float = DEFAULT_THERMAL_LIMIT_C,
+    params: Optional[Dict[str, Any]] = None
+):
+    """
+    Run a specific benchmark while sampling clocks, power and temperature.
+    cooldown_temp_c waits for the GPU to cool to that temperature first.
+    Goes through the job queue, so it waits its turn behind other jobs on the GPU.
+    The optional JSON body holds benchmark-specific params.
+    """
+    job = submit_benchmark(BenchmarkJobRequest(
+        benchmark_type=benchmark_type,
+        device=device,
+        cooldown_temp_c=cooldown_temp_c,
+        cooldown_timeout_s=cooldown_timeout_s,
+        sample_interval_ms=sample_interval_ms,
+        thermal_limit_c=thermal_limit_c,
+        params=params or {}
+    ))
+    await get_job_queue().wait(job.id)
+    if job.status == "cancelled":
+        raise HTTPException(409, f"Benchmark job {job.id} was cancelled")
+    if job.status == "failed":
+        raise HTTPException(500, f"Benchmark failed: {job.error}")
+    return job.result
 
 @api_router.get("/benchmark/status")
 async def get_benchmark_status():
     """Get benchmark capabilities"""
     return {
         "cuda_available": get_benchmark_runner().is_cuda_available(),
-        "supported_benchmarks": ["cuda", "tensorrt", "vulkan", "general"]
+        "supported_benchmarks": BENCHMARK_TYPES
     }
 
 # Inference Routes
@@ -207,38 +743,169 @@ async def get_benchmark_status():
 async def run_inference(request: InferenceRequest):
     """Run AI model inference"""
     engine = get_inference_engine()
-    result = await engine.run_inference(
-        model_name=request.model_name,
-        batch_size=request.batch_size,
-        precision=request.precision,
-        framework=request.framework
-    )
+    if request.use_batching:
+        result = await engine.serve_inference(
+            model_name=request.model_name,
+            batch_size=request.batch_size,
+            precision=request.precision,
+            framework=request.framework
+        )
+    else:
+        adaptive = None
+        if request.statistical:
+            adaptive = AdaptiveConfig(max_runs=request.max_runs, ci_target_pct=request.ci_target_pct)
+        result = await engine.run_inference(
+            model_name=request.model_name,
+            batch_size=request.batch_size,
+            precision=request.precision,
+            framework=request.framework,
+            adaptive=adaptive,
+            io_binding=request.io_binding
+        )
     
     result_dict = result.to_dict()
     result_dict["id"] = str(uuid.uuid4())
     result_dict["timestamp"] = datetime.now(timezone.utc).isoformat()
+    get_inference_history().add(result_dict)
     
     return result_dict
 
+@api_router.get("/inference/history")
+async def get_inference_history_records(limit: int = 20, model: Optional[str] = None, precision: Optional[str] = None):
+    """Recent inference runs, newest first"""
+    return {"results": get_inference_history().list(limit, model_name=model, precision=precision)}
+
+@api_router.get("/inference/stats")
+async def get_inference_stats(
+    group_by: Optional[str] = None,
+    metrics: Optional[str] = None,
+    bucket: str = "day",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    model: Optional[str] = None,
+    precision: Optional[str] = None,
+    framework: Optional[str] = None
+):
+    """
+    count/mean/p50/p95/min/max of latency_ms and throughput grouped by any of
+    model_name, precision, framework, batch_size, is_real and bucket.
+    """
+    return run_stats(
+        get_inference_history(), INFERENCE_GROUPS, INFERENCE_METRICS, group_by, metrics, bucket, since, until,
+        {"model_name": model, "precision": precision, "framework": framework}
+    )
+
+@api_router.post("/inference/sweep")
+async def sweep_inference(request: SweepRequest):
+    """Sweep batch size x concurrent streams and recommend a config under the p99 SLO"""
+    if not request.batch_sizes or not request.streams or min(request.batch_sizes + request.streams) < 1:
+        raise HTTPException(400, "batch_sizes and streams must be non-empty positive lists")
+    
+    result = await run_sweep(
+        get_inference_engine(),
+        model_name=request.model_name,
+        batch_sizes=request.batch_sizes,
+        streams=request.streams,
+        precision=request.precision,
+        framework=request.framework,
+        runs_per_stream=request.runs_per_stream,
+        warmup_runs=request.warmup_runs,
+        slo_p99_ms=request.slo_p99_ms
+    )
+    result["id"] = str(uuid.uuid4())
+    result["timestamp"] = datetime.now(timezone.utc).isoformat()
+    return result
+
+@api_router.post("/inference/cpu-tune/{model_name}")
+async def tune_cpu_threads(model_name: str, batch_size: int = Query(1, ge=1), benchmark_runs: int = Query(50, ge=1), apply: bool = False):
+    """Sweep CPU thread/spinning configs for a loaded model; apply=true adopts the fastest"""
+    try:
+        return await get_inference_engine().tune_cpu(model_name, batch_size, benchmark_runs, apply)
+    except KeyError as e:
+        raise HTTPException(404, str(e))
+
+@api_router.get("/inference/batching")
+async def get_batching_stats():
+    """Get micro-batcher statistics"""
+    return get_inference_engine().batcher.get_stats()
+
+@api_router.get("/inference/executor")
+async def get_executor_stats():
+    """Get inference pool queue depth and wait times"""
+    return get_inference_engine().executor.get_stats()
+
 @api_router.get("/inference/models")
 async def get_available_models():
     """Get available models for inference"""
     engine = get_inference_engine()
     return {
         "loaded_models": engine.list_available_models(),
+        "resident_models": engine.registry.names(),
         "supported_models": engine.get_supported_models()
     }
 
 @api_router.post("/inference/load")
-async def load_model(model_path: str):
-    """Load an ONNX model"""
+async def load_model(
+    model_path: str,
+    background: bool = False,
+    precision: str = "FP32",
+    input_shape: Optional[str] = None
+):
+    """Load an ONNX model; with background=true, return a load handle immediately"""
     engine = get_inference_engine()
-    success = await engine.load_model(model_path)
-    if success:
-        return {"status": "success", "message": f"Model loaded: {model_path}"}
+    try:
+        input_shapes = parse_shape_spec(input_shape)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    
+    if background:
+        handle = engine.load_model_background(model_path, precision, input_shapes)
+        if not handle:
+            raise HTTPException(400, "ONNX Runtime not available")
+        return handle.to_dict()
+    
+    model_name = await engine.load_model(model_path, precision, input_shapes)
+    if model_name:
+        return {"status": "success", "message": f"Model loaded: {model_path}", "model_name": model_name}
     else:
         raise HTTPException(400, "Failed to load model")
 
+@api_router.get("/inference/load")
+async def list_model_loads():
+    """Get recent model load handles"""
+    return {"loads": get_inference_engine().loader.list_handles()}
+
+@api_router.get("/inference/load/{handle_id}")
+async def get_model_load(handle_id: str):
+    """Get progress/status of a background model load"""
+    handle = get_inference_engine().loader.get(handle_id)
+    if not handle:
+        raise HTTPException(404, "Load handle not found")
+    return handle.to_dict()
+
+@api_router.delete("/inference/models/{model_name}")
+async def unload_model(model_name: str):
+    """Unload a model from the session cache"""
+    if not get_inference_engine().unload_model(model_name):
+        raise HTTPException(404, f"Model not loaded: {model_name}")
+    return {"status": "success", "message": f"Model unloaded: {model_name}"}
+
+@api_router.get("/inference/engine-cache")
+async def get_engine_cache():
+    """Get persisted optimized-graph / TensorRT engine cache entries"""
+    return get_inference_engine().engine_cache.get_stats()
+
+@api_router.delete("/inference/engine-cache")
+async def invalidate_engine_cache(model_hash: Optional[str] = None):
+    """Invalidate cached engines for one model hash (prefix), or all of them"""
+    removed = get_inference_engine().engine_cache.invalidate(model_hash)
+    return {"status": "success", "removed": removed}
+
+@api_router.get("/inference/cache")
+async def get_model_cache_stats():
+    """Get session cache usage and hit/miss/eviction counters"""
+    return get_inference_engine().registry.get_stats()
+
 # Settings Routes
 @api_router.get("/settings")
 async def get_settings():
@@ -261,6 +928,8 @@ async def update_settings(updates: SettingsUpdate):
             setattr(current, key, value)
     
     save_config(current)
+    apply_engine_settings(current)
+    apply_telemetry_settings(current)
     
     # Return without full API key
     result = current.model_dump()
@@ -341,6 +1010,26 @@ async def get_chat_presets():
         ]
     }
 
+@app.on_event("startup")
+async def startup_event():
+    settings = load_config()
+    apply_engine_settings(settings)
+    apply_telemetry_settings(settings)
+    preload_models(settings)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    engine = get_inference_engine()
+    await engine.batcher.shutdown()
+    engine.executor.shutdown()
+    engine.loader.shutdown()
+    if _job_queue:
+        _job_queue.shutdown()
+    stop_samplers()
+    close_stores()
+    if _recorder:
+        _recorder.close()
+
 # Include router
 app.include_router(api_router)
 
@@ -0,0 +1,36 @@
+"""
+Simulation Seeding - reproducible random streams for simulated results
+One seed fixes every simulated telemetry sample, benchmark and inference result
+"""
+
+import logging
+import random
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_seed: Optional[int] = None
+_rngs: Dict[str, random.Random] = {}
+
+
+def set_seed(seed: Optional[int]):
+    """Reseed every stream; None restores nondeterministic output"""
+    global _seed
+    if seed != _seed:
+        logger.info(f"Simulation seed set to {seed}")
+    _seed = seed
+    _rngs.clear()
+
+
+def get_seed() -> Optional[int]:
+    return _seed
+
+
+def get_rng(stream: str) -> random.Random:
+    """
+    Independent generator per named stream, so adding calls in one subsystem
+    (e.g. telemetry) never shifts the numbers another (e.g. benchmarks) sees.
+    """
+    if stream not in _rngs:
+        _rngs[stream] = random.Random(f"{_seed}:{stream}") if _seed is not None else random.Random()
+    return _rngs[stream]
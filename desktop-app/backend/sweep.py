@@ -0,0 +1,124 @@
+"""
+Batch-size x Concurrency Sweep
+Maps throughput against p99 latency and picks the best config under a latency SLO
+"""
+
+import logging
+import time
+import asyncio
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepPoint:
+    batch_size: int
+    streams: int
+    throughput: float  # inferences/second, aggregate across streams
+    latency_mean_ms: float
+    latency_p99_ms: float
+    meets_slo: bool
+    is_real: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "streams": self.streams,
+            "throughput": round(self.throughput, 1),
+            "latency_mean_ms": round(self.latency_mean_ms, 3),
+            "latency_p99_ms": round(self.latency_p99_ms, 3),
+            "meets_slo": self.meets_slo,
+            "is_real": self.is_real
+        }
+
+
+async def run_sweep(
+    engine,
+    model_name: str,
+    batch_sizes: List[int],
+    streams: List[int],
+    precision: str = "FP16",
+    framework: str = "TensorRT",
+    runs_per_stream: int = 50,
+    warmup_runs: int = 5,
+    slo_p99_ms: Optional[float] = None
+) -> Dict[str, Any]:
+    """Run every (batch size, streams) cell through engine.run_inference"""
+    points: List[SweepPoint] = []
+    max_streams = engine.executor.max_workers
+
+    for batch_size in sorted(set(batch_sizes)):
+        # Warm once per batch size so cells below measure steady state only
+        await engine.run_inference(model_name, batch_size, precision, framework, warmup_runs, 1)
+
+        for stream_count in sorted(set(streams)):
+            effective = min(stream_count, max_streams)
+            if effective < stream_count:
+                logger.warning(f"Sweep streams capped at pool size {max_streams} (requested {stream_count})")
+
+            async with engine.executor.model_limit(model_name, effective):
+                start_time = time.perf_counter()
+                results = await asyncio.gather(*[
+                    engine.run_inference(model_name, batch_size, precision, framework, 0, runs_per_stream)
+                    for _ in range(effective)
+                ])
+                wall_time = time.perf_counter() - start_time
+
+            is_real = all(r.is_real for r in results)
+            if is_real:
+                # A fixed-batch model runs at its own batch size, whatever was requested
+                throughput = sum(r.batch_size for r in results) * runs_per_stream / wall_time
+            else:
+                # Simulated results have no wall-clock meaning; combine their nominal rates
+                throughput = sum(r.throughput for r in results)
+
+            # Per-stream samples are summarized already; the worst stream bounds the tail
+            p99 = max(r.latency_stats.p99_ms if r.latency_stats else r.latency_ms for r in results)
+            mean = sum(r.latency_ms for r in results) / len(results)
+
+            points.append(SweepPoint(
+                batch_size=batch_size,
+                streams=effective,
+                throughput=throughput,
+                latency_mean_ms=mean,
+                latency_p99_ms=p99,
+                meets_slo=slo_p99_ms is None or p99 <= slo_p99_ms,
+                is_real=is_real
+            ))
+
+    return {
+        "model_name": model_name,
+        "precision": precision,
+        "framework": framework,
+        "slo_p99_ms": slo_p99_ms,
+        "points": [p.to_dict() for p in points],
+        "recommended": _recommend(points),
+        "knee": _knee(points)
+    }
+
+
+def _recommend(points: List[SweepPoint]) -> Optional[Dict[str, Any]]:
+    """Highest throughput among configs that meet the SLO"""
+    candidates = [p for p in points if p.meets_slo]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda p: p.throughput).to_dict()
+
+
+def _knee(points: List[SweepPoint]) -> Optional[Dict[str, Any]]:
+    """Last point on the throughput/p99 frontier before extra throughput costs more latency than it adds"""
+    frontier = []
+    for p in sorted(points, key=lambda p: p.latency_p99_ms):
+        if not frontier or p.throughput > frontier[-1].throughput:
+            frontier.append(p)
+    if len(frontier) < 3:
+        return frontier[-1].to_dict() if frontier else None
+
+    for prev, cur in zip(frontier, frontier[1:]):
+        throughput_gain = (cur.throughput - prev.throughput) / prev.throughput
+        latency_cost = (cur.latency_p99_ms - prev.latency_p99_ms) / max(prev.latency_p99_ms, 1e-9)
+        if latency_cost > throughput_gain:
+            return prev.to_dict()
+    return frontier[-1].to_dict()
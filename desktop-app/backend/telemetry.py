@@ -0,0 +1,275 @@
+"""
+GPU Telemetry Sampler - one background poller for all devices
+Keeps the latest GPUInfo plus a fixed-size ring buffer of recent samples per device
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple, Callable, List
+
+from gpu_monitor import GPUInfo
+from simulation import get_seed
+from telemetry_providers import TelemetryProvider, create_provider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# GPUInfo fields that change between samples; everything else is static per device
+METRIC_FIELDS = (
+    "memory_used", "memory_free", "temperature", "power_usage", "utilization",
+    "memory_utilization", "clock_speed", "memory_clock", "fan_speed"
+)
+
+
+class TelemetryRing:
+    """Preallocated ring of (timestamp, metrics) rows; appends never allocate"""
+
+    def __init__(self, capacity: int = 3600, fields: Tuple[str, ...] = METRIC_FIELDS):
+        self.capacity = max(1, capacity)
+        self.fields = fields
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._values = np.zeros((self.capacity, len(fields)), dtype=np.float64)
+        self._head = 0  # Next slot to write
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp: float, info: GPUInfo):
+        with self._lock:
+            row = self._head
+            self._timestamps[row] = timestamp
+            for col, name in enumerate(self.fields):
+                self._values[row, col] = getattr(info, name)
+            self._head = (row + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def window(self, since: Optional[float] = None) -> Tuple[Any, Any]:
+        """Oldest-first copies of timestamps and metric rows, optionally only those after since"""
+        with self._lock:
+            start = (self._head - self._count) % self.capacity
+            order = (np.arange(self._count) + start) % self.capacity
+            timestamps = self._timestamps[order]
+            values = self._values[order]
+        if since is not None:
+            first = int(np.searchsorted(timestamps, since, side='right'))
+            timestamps, values = timestamps[first:], values[first:]
+        return timestamps, values
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class TelemetrySampler:
+    """
+    Latest sample, ring buffer and listeners for one device. Readers get the
+    last published sample without touching NVML or nvidia-smi, so the cost of
+    polling is independent of how many clients are watching.
+    """
+
+    def __init__(self, poller: "TelemetryPoller", device_index: int, capacity: int = 3600):
+        self.poller = poller
+        self.device_index = device_index
+        self.ring = TelemetryRing(capacity)
+        self._latest: Optional[GPUInfo] = None
+        self._latest_at = 0.0
+        self.listeners: List[Callable[[float, GPUInfo], None]] = []  # Called on the poller thread
+        self.samples = 0
+
+    def add_listener(self, listener: Callable[[float, GPUInfo], None]):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[float, GPUInfo], None]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def publish(self, timestamp: float, info: GPUInfo):
+        self.ring.append(timestamp, info)
+        self._latest, self._latest_at = info, timestamp
+        self.samples += 1
+        for listener in self.listeners:
+            try:
+                listener(timestamp, info)
+            except Exception as e:
+                logger.error(f"Telemetry listener failed: {e}")
+
+    def latest(self) -> Optional[GPUInfo]:
+        """
+        Most recent sample, or None until a poll has succeeded. Never polls inline:
+        callers run on the event loop, and a poll may block on nvidia-smi.
+        """
+        return self._latest
+
+    def history(self, seconds: Optional[float] = None) -> Dict[str, Any]:
+        since = time.time() - seconds if seconds else None
+        timestamps, values = self.ring.window(since)
+        return {
+            "device_index": self.device_index,
+            "interval_s": self.poller.interval_s,
+            "timestamps": timestamps.round(3).tolist(),
+            **{name: values[:, col].tolist() for col, name in enumerate(self.ring.fields)}
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.poller.get_stats(),
+            "device_index": self.device_index,
+            "capacity": self.ring.capacity,
+            "buffered": len(self.ring),
+            "samples": self.samples,
+            "latest_age_s": round(time.time() - self._latest_at, 3) if self._latest else None
+        }
+
+
+class TelemetryPoller:
+    """One daemon thread that samples every device in a single pass per interval"""
+
+    def __init__(self, provider: TelemetryProvider, interval_s: float = 1.0, capacity: int = 3600):
+        self.provider = provider
+        self.base_interval_s = interval_s  # Configured rate; interval_s may be faster while requested
+        self.interval_s = interval_s
+        self.capacity = capacity
+        self._rate_requests: Dict[int, float] = {}
+        self._rate_lock = threading.Lock()
+        self._next_request = 0
+        self.samplers: Dict[int, TelemetrySampler] = {
+            index: TelemetrySampler(self, index, capacity) for index in provider.device_indices()
+        }
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()  # Cuts the current wait short on stop/reconfigure
+        self._poll_lock = threading.Lock()
+        self.polls = 0
+        self.errors = 0
+        self.last_poll_ms = 0.0
+
+    def sampler(self, device_index: int) -> TelemetrySampler:
+        if device_index not in self.samplers:
+            raise IndexError(f"No GPU with index {device_index} ({len(self.samplers)} available)")
+        return self.samplers[device_index]
+
+    def configure(self, interval_s: Optional[float] = None, capacity: Optional[int] = None):
+        if interval_s is not None:
+            self.base_interval_s = max(0.05, interval_s)
+        if capacity is not None:
+            self.capacity = capacity
+            for sampler in self.samplers.values():
+                if capacity != sampler.ring.capacity:
+                    sampler.ring = TelemetryRing(capacity)
+        self._apply_interval()
+
+    def request_interval(self, interval_s: float) -> int:
+        """
+        Sample at least every interval_s until release_interval(token). Concurrent
+        requests overlap freely: the poller runs at the fastest one still held.
+        """
+        with self._rate_lock:
+            token = self._next_request
+            self._next_request += 1
+            self._rate_requests[token] = max(0.05, interval_s)
+        self._apply_interval()
+        return token
+
+    def release_interval(self, token: int):
+        with self._rate_lock:
+            self._rate_requests.pop(token, None)
+        self._apply_interval()
+
+    def _apply_interval(self):
+        with self._rate_lock:
+            self.interval_s = min([self.base_interval_s, *self._rate_requests.values()])
+        if self._thread and self._thread.is_alive():
+            self.provider.start(self.interval_s)
+        self._wakeup.set()
+
+    def set_provider(self, provider: TelemetryProvider):
+        """Swap the sample source; samplers (and their listeners) survive for devices that remain"""
+        running = bool(self._thread and self._thread.is_alive())
+        with self._poll_lock:
+            self.provider.stop()
+            self.provider = provider
+            indices = provider.device_indices()
+            self.samplers = {
+                index: self.samplers.get(index) or TelemetrySampler(self, index, self.capacity)
+                for index in indices
+            }
+        if running:
+            provider.start(self.interval_s)
+        logger.info(f"Telemetry provider set to {provider.name} ({len(indices)} device(s))")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.provider.start(self.interval_s)
+        self._thread = threading.Thread(target=self._loop, name="telemetry-poller", daemon=True)
+        self._thread.start()
+        logger.info(f"Telemetry poller started for {len(self.samplers)} device(s) every {self.interval_s}s")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval_s + 5)
+            self._thread = None
+        self.provider.stop()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.poll_once()
+            self._wakeup.wait(self.interval_s)
+            self._wakeup.clear()
+
+    def poll_once(self):
+        """Sample all devices now and publish to their samplers"""
+        with self._poll_lock:
+            start = time.perf_counter()
+            try:
+                infos = self.provider.sample_all()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Telemetry poll failed: {e}")
+                return
+            self.last_poll_ms = (time.perf_counter() - start) * 1000
+
+            now = time.time()
+            for sampler, info in zip(self.samplers.values(), infos):
+                sampler.publish(now, info)
+            self.polls += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_s": self.interval_s,
+            "base_interval_s": self.base_interval_s,
+            "rate_requests": len(self._rate_requests),
+            "devices": len(self.samplers),
+            "polls": self.polls,
+            "errors": self.errors,
+            "last_poll_ms": round(self.last_poll_ms, 3),
+            "provider": self.provider.get_stats()
+        }
+
+
+# Global poller shared by every device
+_poller: Optional[TelemetryPoller] = None
+_poller_lock = threading.Lock()
+
+def get_poller() -> TelemetryPoller:
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = TelemetryPoller(create_provider("auto", get_seed()))
+        return _poller
+
+def get_sampler(device_index: int = 0) -> TelemetrySampler:
+    return get_poller().sampler(device_index)
+
+def stop_samplers():
+    if _poller is not None:
+        _poller.stop()
@@ -0,0 +1,327 @@
+"""
+Telemetry Providers - interchangeable sources of GPU samples
+Real hardware (NVML / nvidia-smi), seeded synthetic devices, and trace replay
+"""
+
+import abc
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import fields as dataclass_fields
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable
+
+from gpu_monitor import GPUInfo, DeviceManager, HAS_NVML, SIMULATED_STATIC, get_device_manager
+from simulation import get_seed
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_KINDS = ("auto", "nvml", "nvidia-smi", "synthetic", "replay")
+GPUINFO_FIELDS = tuple(f.name for f in dataclass_fields(GPUInfo))
+
+SIMULATED_POWER_LIMIT = 575.0
+SIMULATED_IDLE_POWER = 60.0
+
+
+class TelemetryProvider(abc.ABC):
+    """Source of per-device GPUInfo samples for the telemetry poller"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def device_indices(self) -> List[int]:
+        ...
+
+    @abc.abstractmethod
+    def sample_all(self) -> List[GPUInfo]:
+        """One sample per device, in device_indices() order"""
+
+    @abc.abstractmethod
+    def static_info(self, device_index: int) -> Dict[str, Any]:
+        ...
+
+    def list_devices(self) -> List[Dict[str, Any]]:
+        # Only HardwareProvider reads live devices
+        return [{"index": i, **self.static_info(i), "is_real": False} for i in self.device_indices()]
+
+    def start(self, interval_s: float):
+        pass
+
+    def stop(self):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "devices": len(self.device_indices())}
+
+
+class HardwareProvider(TelemetryProvider):
+    """NVML handles or nvidia-smi, via a DeviceManager"""
+
+    def __init__(self, manager: DeviceManager):
+        self.manager = manager
+
+    @property
+    def name(self) -> str:
+        return self.manager.backend
+
+    def device_indices(self) -> List[int]:
+        return [m.device_index for m in self.manager.monitors]
+
+    def sample_all(self) -> List[GPUInfo]:
+        return self.manager.sample_all()
+
+    def static_info(self, device_index: int) -> Dict[str, Any]:
+        return self.manager.monitor(device_index).get_static_info()
+
+    def list_devices(self) -> List[Dict[str, Any]]:
+        return self.manager.list_devices()
+
+    def start(self, interval_s: float):
+        self.manager.start_streaming(interval_s)
+
+    def stop(self):
+        self.manager.stop_streaming()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        if self.manager.smi_stream:
+            stats["nvidia_smi_stream"] = self.manager.smi_stream.get_stats()
+        return stats
+
+
+class SyntheticProvider(TelemetryProvider):
+    """
+    Simulated devices driven by a mean-reverting utilization random walk, with
+    power, temperature, clocks and fan derived from it. Each device has its own
+    seeded generator, so a given seed always yields the same sample sequence.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, devices: int = 1, seed: Optional[int] = None):
+        self.seed = seed
+        self._rngs = [
+            random.Random(f"{seed}:telemetry:{i}") if seed is not None else random.Random()
+            for i in range(max(1, devices))
+        ]
+        self._state = [
+            {
+                "utilization": rng.uniform(10.0, 40.0),
+                "target": rng.uniform(10.0, 95.0),
+                "temperature": 40.0,
+                "memory_used": rng.uniform(4.0, 8.0)
+            }
+            for rng in self._rngs
+        ]
+
+    def device_indices(self) -> List[int]:
+        return list(range(len(self._rngs)))
+
+    def static_info(self, device_index: int) -> Dict[str, Any]:
+        return dict(SIMULATED_STATIC)
+
+    def sample(self, device_index: int) -> GPUInfo:
+        rng = self._rngs[device_index]
+        state = self._state[device_index]
+        memory_total = SIMULATED_STATIC["memory_total"]
+
+        if rng.random() < 0.05:
+            state["target"] = rng.uniform(5.0, 98.0)  # Workload change
+        utilization = state["utilization"] + 0.3 * (state["target"] - state["utilization"]) + rng.gauss(0, 3)
+        utilization = min(100.0, max(0.0, utilization))
+        state["utilization"] = utilization
+
+        power = SIMULATED_IDLE_POWER + (SIMULATED_POWER_LIMIT - SIMULATED_IDLE_POWER) * utilization / 100
+        power = min(SIMULATED_POWER_LIMIT, max(0.0, power + rng.gauss(0, 5)))
+        # Temperature lags power towards its equilibrium
+        state["temperature"] += 0.2 * (30.0 + 0.09 * power - state["temperature"]) + rng.gauss(0, 0.3)
+        temperature = state["temperature"]
+
+        state["memory_used"] = min(memory_total - 1.0, max(1.0, state["memory_used"] + rng.gauss(0, 0.2)))
+        clock_speed = 2000.0 + 900.0 * utilization / 100
+        if temperature > 83.0:
+            clock_speed *= 0.85  # Thermal throttling
+
+        return GPUInfo(
+            name=SIMULATED_STATIC["name"],
+            driver_version=SIMULATED_STATIC["driver_version"],
+            cuda_version=SIMULATED_STATIC["cuda_version"],
+            memory_total=memory_total,
+            memory_used=round(state["memory_used"], 2),
+            memory_free=round(memory_total - state["memory_used"], 2),
+            temperature=round(temperature, 1),
+            power_usage=round(power, 1),
+            power_limit=SIMULATED_POWER_LIMIT,
+            utilization=round(utilization, 1),
+            memory_utilization=round(utilization * 0.6, 1),
+            clock_speed=round(clock_speed, 0),
+            memory_clock=11000.0,
+            fan_speed=round(min(100.0, max(30.0, 30.0 + (temperature - 40.0) * 1.5)), 0),
+            pcie_gen=SIMULATED_STATIC["pcie_max_gen"],
+            pcie_width=SIMULATED_STATIC["pcie_max_width"],
+            is_real=False
+        )
+
+    def sample_all(self) -> List[GPUInfo]:
+        return [self.sample(i) for i in self.device_indices()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "seed": self.seed}
+
+
+class ReplayProvider(TelemetryProvider):
+    """Plays back a TraceRecorder JSONL trace at `speed`x real time, looping at the end"""
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True):
+        self.path = Path(path)
+        self.speed = max(0.01, speed)
+        self.loop = loop
+        self._offsets: Dict[int, List[float]] = {}
+        self._samples: Dict[int, List[GPUInfo]] = {}
+        self._started: Optional[float] = None
+
+        records = []
+        with open(self.path) as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f"{self.path}:{line_no} is not a JSON object")
+                missing = [name for name in ("t", *GPUINFO_FIELDS) if name != "is_real" and name not in record]
+                if missing:
+                    raise ValueError(f"{self.path}:{line_no} is missing {missing}")
+                if not isinstance(record["t"], (int, float)) or isinstance(record["t"], bool):
+                    raise ValueError(f"{self.path}:{line_no} has a non-numeric timestamp {record['t']!r}")
+                if not isinstance(record.get("device_index", 0), int):
+                    raise ValueError(f"{self.path}:{line_no} has an invalid device_index {record['device_index']!r}")
+                records.append(record)
+        if not records:
+            raise ValueError(f"Empty telemetry trace: {self.path}")
+
+        records.sort(key=lambda r: r["t"])
+        t0 = records[0]["t"]
+        self.duration = records[-1]["t"] - t0
+        for record in records:
+            device = int(record.get("device_index", 0))
+            values = {name: record[name] for name in GPUINFO_FIELDS if name != "is_real"}
+            self._offsets.setdefault(device, []).append(record["t"] - t0)
+            self._samples.setdefault(device, []).append(GPUInfo(**values, is_real=False))
+
+    def device_indices(self) -> List[int]:
+        return sorted(self._samples)
+
+    def static_info(self, device_index: int) -> Dict[str, Any]:
+        first = self._samples[device_index][0]
+        return {
+            "name": first.name,
+            "driver_version": first.driver_version,
+            "cuda_version": first.cuda_version,
+            "memory_total": first.memory_total,
+            "pcie_max_gen": first.pcie_gen,
+            "pcie_max_width": first.pcie_width
+        }
+
+    def start(self, interval_s: float):
+        if self._started is None:
+            self._started = time.monotonic()
+
+    def position(self) -> float:
+        """Seconds into the trace"""
+        if self._started is None:
+            return 0.0
+        elapsed = (time.monotonic() - self._started) * self.speed
+        if self.loop and self.duration > 0:
+            return elapsed % self.duration
+        return min(elapsed, self.duration)
+
+    def sample_all(self) -> List[GPUInfo]:
+        position = self.position()
+        samples = []
+        for device in self.device_indices():
+            index = bisect.bisect_right(self._offsets[device], position) - 1
+            samples.append(self._samples[device][max(0, index)])
+        return samples
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **super().get_stats(),
+            "path": str(self.path),
+            "speed": self.speed,
+            "duration_s": round(self.duration, 3),
+            "position_s": round(self.position(), 3)
+        }
+
+
+class TraceRecorder:
+    """Appends published samples to a JSONL trace that ReplayProvider can play back"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+        self._lock = threading.Lock()
+        self._listeners: Dict[int, Callable[[float, GPUInfo], None]] = {}
+        self.records = 0
+
+    def listener(self, device_index: int) -> Callable[[float, GPUInfo], None]:
+        """Sampler listener for one device (the same callable on every call)"""
+        if device_index not in self._listeners:
+            self._listeners[device_index] = lambda timestamp, info: self.write(device_index, timestamp, info)
+        return self._listeners[device_index]
+
+    def write(self, device_index: int, timestamp: float, info: GPUInfo):
+        line = json.dumps({"t": round(timestamp, 3), "device_index": device_index, **info.to_dict()})
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def create_provider(
+    kind: str = "auto",
+    seed: Optional[int] = None,
+    synthetic_devices: int = 1,
+    replay_path: str = "",
+    replay_speed: float = 1.0
+) -> TelemetryProvider:
+    """Raises ValueError for unknown kinds or unusable configurations"""
+    if kind == "auto":
+        manager = get_device_manager()
+        return HardwareProvider(manager) if manager.count > 0 else SyntheticProvider(1, seed)
+    if kind == "nvml":
+        if not HAS_NVML:
+            raise ValueError("NVML is not available")
+        return HardwareProvider(get_device_manager())
+    if kind == "nvidia-smi":
+        return HardwareProvider(DeviceManager(use_nvml=False))
+    if kind == "synthetic":
+        return SyntheticProvider(synthetic_devices, seed)
+    if kind == "replay":
+        if not replay_path:
+            raise ValueError("replay provider needs replay_path")
+        try:
+            return ReplayProvider(replay_path, replay_speed)
+        except OSError as e:
+            raise ValueError(f"Cannot read telemetry trace: {e}")
+    raise ValueError(f"Unknown telemetry provider {kind}. Valid: {list(PROVIDER_KINDS)}")
+
+
+# Fallback generator for GPUMonitor when hardware queries fail
+_fallback: Optional[SyntheticProvider] = None
+
+def simulated_gpu_info(device_index: int = 0) -> GPUInfo:
+    global _fallback
+    if _fallback is None or _fallback.seed != get_seed() or device_index >= len(_fallback.device_indices()):
+        devices = max(device_index + 1, len(_fallback.device_indices()) if _fallback else 1)
+        _fallback = SyntheticProvider(devices, get_seed())
+    return _fallback.sample(device_index)
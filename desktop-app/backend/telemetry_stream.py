@@ -0,0 +1,126 @@
+"""
+GPU Telemetry Streaming - push frames to WebSocket/SSE subscribers
+Each subscriber picks its rate and fields; samples between frames are decimated to min/max/avg
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import fields as dataclass_fields
+from typing import Dict, Any, Optional, List, AsyncIterator, Set
+
+from gpu_monitor import GPUInfo
+from telemetry import TelemetrySampler, METRIC_FIELDS
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL_S = 0.05
+ALL_FIELDS = tuple(f.name for f in dataclass_fields(GPUInfo))
+
+
+def parse_fields(spec: Optional[str]) -> List[str]:
+    """Comma-separated GPUInfo field names; empty means every field"""
+    if not spec:
+        return list(ALL_FIELDS)
+    requested = [f.strip() for f in spec.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in ALL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown telemetry fields: {unknown}. Valid: {list(ALL_FIELDS)}")
+    return requested
+
+
+class TelemetryStream:
+    """
+    One subscriber's view of a sampler. Frames are built from the ring buffer
+    at send time, so a client that falls behind gets one wider aggregate
+    instead of a queue of stale samples.
+    """
+
+    def __init__(self, sampler: TelemetrySampler, interval_s: float = 1.0, fields: Optional[List[str]] = None):
+        self.sampler = sampler
+        self.interval_s = max(MIN_INTERVAL_S, interval_s)
+        self.fields = fields or list(ALL_FIELDS)
+        self._since = time.time()
+        self.frames_sent = 0
+
+    def next_frame(self) -> Optional[Dict[str, Any]]:
+        """Aggregate every sample since the previous frame; None when nothing new arrived"""
+        timestamps, values = self.sampler.ring.window(self._since)
+        if len(timestamps) == 0:
+            return None
+        self._since = float(timestamps[-1])
+
+        latest = self.sampler.latest()
+        frame: Dict[str, Any] = {
+            "device_index": self.sampler.device_index,
+            "timestamp": round(self._since, 3),
+            "samples": len(timestamps),
+            "values": {name: getattr(latest, name) for name in self.fields}
+        }
+
+        metrics = [(col, name) for col, name in enumerate(self.sampler.ring.fields) if name in self.fields]
+        if metrics:
+            cols = [col for col, _ in metrics]
+            bucket = values[:, cols]
+            for key, reduced in (("min", bucket.min(axis=0)), ("max", bucket.max(axis=0)), ("avg", bucket.mean(axis=0))):
+                frame[key] = {name: round(float(v), 2) for (_, name), v in zip(metrics, reduced)}
+
+        self.frames_sent += 1
+        return frame
+
+    async def frames(self) -> AsyncIterator[Dict[str, Any]]:
+        registry = get_stream_registry()
+        registry.add(self)
+        try:
+            while True:
+                await asyncio.sleep(self.interval_s)
+                frame = self.next_frame()
+                if frame is not None:
+                    yield frame
+        finally:
+            registry.remove(self)
+
+    def update(self, interval_s: Optional[float] = None, fields: Optional[List[str]] = None):
+        """Change rate or field subset mid-stream"""
+        if interval_s is not None:
+            self.interval_s = max(MIN_INTERVAL_S, interval_s)
+        if fields is not None:
+            self.fields = fields
+
+
+class StreamRegistry:
+    """Streams currently producing frames, for subscriber counts"""
+
+    def __init__(self):
+        self._streams: Set[TelemetryStream] = set()
+        self._lock = threading.Lock()
+
+    def add(self, stream: TelemetryStream):
+        with self._lock:
+            self._streams.add(stream)
+
+    def remove(self, stream: TelemetryStream):
+        with self._lock:
+            self._streams.discard(stream)
+
+    def count(self, device_index: Optional[int] = None) -> int:
+        with self._lock:
+            if device_index is None:
+                return len(self._streams)
+            return sum(1 for s in self._streams if s.sampler.device_index == device_index)
+
+
+# Global registry shared by WebSocket and SSE subscribers
+_stream_registry: Optional[StreamRegistry] = None
+
+
+def get_stream_registry() -> StreamRegistry:
+    global _stream_registry
+    if _stream_registry is None:
+        _stream_registry = StreamRegistry()
+    return _stream_registry
+
+
+def active_stream_count(device_index: Optional[int] = None) -> int:
+    return get_stream_registry().count(device_index)
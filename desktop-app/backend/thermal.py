@@ -0,0 +1,181 @@
+"""
+Thermal/Power-Aware Benchmarking - telemetry captured while a benchmark runs
+Cool-down gating, throttling interval detection and performance per watt
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
+from dataclasses import dataclass, field, asdict
+
+from gpu_monitor import GPUInfo
+from telemetry import TelemetrySampler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THERMAL_LIMIT_C = 83.0  # Typical NVIDIA slowdown threshold
+POWER_LIMIT_TOLERANCE = 0.03  # Within 3% of the limit counts as power-capped
+CLOCK_DROP_PCT = 5.0  # Clock this far below the run's peak counts as throttled
+
+
+@dataclass
+class ThermalReport:
+    samples: int
+    duration_s: float
+    temperature_start: float
+    temperature_max: float
+    temperature_avg: float
+    power_avg: float
+    power_max: float
+    clock_avg: float
+    clock_max: float
+    clock_min: float
+    throttled: bool
+    throttled_pct: float
+    intervals: List[Dict[str, Any]] = field(default_factory=list)
+    cooldown_wait_s: float = 0.0
+    perf_per_watt: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RunRecorder:
+    """Sampler listener that keeps every sample published during a run"""
+
+    def __init__(self):
+        self.samples: List[Tuple[float, GPUInfo]] = []
+
+    def __call__(self, timestamp: float, info: GPUInfo):
+        self.samples.append((timestamp, info))
+
+
+def _throttle_reason(info: GPUInfo, peak_clock: float, thermal_limit_c: float) -> Optional[str]:
+    """
+    GPUInfo has no throttle-reason bits, so infer them: a clock well below the
+    run's peak while at the thermal limit or the power cap.
+    """
+    if peak_clock <= 0 or info.clock_speed >= peak_clock * (1 - CLOCK_DROP_PCT / 100):
+        return None
+    if info.temperature >= thermal_limit_c:
+        return "thermal"
+    if info.power_limit > 0 and info.power_usage >= info.power_limit * (1 - POWER_LIMIT_TOLERANCE):
+        return "power"
+    return None
+
+
+def analyze(samples: List[Tuple[float, GPUInfo]], thermal_limit_c: float = DEFAULT_THERMAL_LIMIT_C) -> ThermalReport:
+    if not samples:
+        # e.g. every poll failed; the run itself still counts
+        logger.warning("No telemetry samples captured; thermal report is empty")
+        return ThermalReport(
+            samples=0, duration_s=0.0, temperature_start=0.0, temperature_max=0.0, temperature_avg=0.0,
+            power_avg=0.0, power_max=0.0, clock_avg=0.0, clock_max=0.0, clock_min=0.0,
+            throttled=False, throttled_pct=0.0
+        )
+
+    start = samples[0][0]
+    infos = [info for _, info in samples]
+    temperatures = [i.temperature for i in infos]
+    powers = [i.power_usage for i in infos]
+    clocks = [i.clock_speed for i in infos]
+    peak_clock = max(clocks)
+
+    # Consecutive samples with the same reason form one interval
+    intervals: List[Dict[str, Any]] = []
+    flagged = 0
+    previous_reason = None
+    for timestamp, info in samples:
+        reason = _throttle_reason(info, peak_clock, thermal_limit_c)
+        offset = round(timestamp - start, 3)
+        if reason is not None:
+            flagged += 1
+            if reason == previous_reason:
+                intervals[-1]["end_s"] = offset
+                intervals[-1]["min_clock"] = min(intervals[-1]["min_clock"], info.clock_speed)
+            else:
+                intervals.append({"reason": reason, "start_s": offset, "end_s": offset, "min_clock": info.clock_speed})
+        previous_reason = reason
+
+    return ThermalReport(
+        samples=len(samples),
+        duration_s=round(samples[-1][0] - start, 3),
+        temperature_start=temperatures[0],
+        temperature_max=max(temperatures),
+        temperature_avg=round(sum(temperatures) / len(temperatures), 1),
+        power_avg=round(sum(powers) / len(powers), 1),
+        power_max=max(powers),
+        clock_avg=round(sum(clocks) / len(clocks), 0),
+        clock_max=peak_clock,
+        clock_min=min(clocks),
+        throttled=flagged > 0,
+        throttled_pct=round(flagged / len(samples) * 100, 1),
+        intervals=intervals
+    )
+
+
+async def wait_for_cooldown(
+    sampler: TelemetrySampler,
+    target_c: float,
+    timeout_s: float = 120.0,
+    check: Optional[Callable[[], None]] = None
+) -> float:
+    """Wait until the device is at or below target_c; returns seconds waited. check() may raise to abort"""
+    start = time.perf_counter()
+    if sampler.latest() is None:
+        logger.warning(f"No temperature reading for GPU {sampler.device_index}; skipping cool-down")
+        return 0.0
+    while sampler.latest().temperature > target_c:
+        if check:
+            check()
+        if time.perf_counter() - start >= timeout_s:
+            logger.warning(
+                f"GPU {sampler.device_index} still at {sampler.latest().temperature}C after "
+                f"{timeout_s}s cool-down; starting anyway"
+            )
+            break
+        await asyncio.sleep(max(sampler.poller.interval_s, 0.1))
+    return round(time.perf_counter() - start, 3)
+
+
+async def run_monitored(
+    sampler: TelemetrySampler,
+    run: Callable[[], Awaitable[Any]],
+    cooldown_temp_c: Optional[float] = None,
+    cooldown_timeout_s: float = 120.0,
+    sample_interval_s: float = 0.2,
+    thermal_limit_c: float = DEFAULT_THERMAL_LIMIT_C,
+    check: Optional[Callable[[], None]] = None
+) -> Tuple[Any, ThermalReport]:
+    """
+    Run a benchmark while recording the device's telemetry. The poller runs on
+    its own thread, so samples keep arriving even if the benchmark blocks the
+    event loop; it samples at least every sample_interval_s for the duration.
+    """
+    poller = sampler.poller
+    waited = 0.0
+    if cooldown_temp_c is not None:
+        waited = await wait_for_cooldown(sampler, cooldown_temp_c, cooldown_timeout_s, check)
+
+    recorder = RunRecorder()
+    # Runs on other devices share the poller, so request a rate rather than overwrite it
+    rate_request = poller.request_interval(sample_interval_s)
+    sampler.add_listener(recorder)
+    try:
+        # Bracket the run with explicit polls so short benchmarks still get two samples
+        await asyncio.to_thread(poller.poll_once)
+        result = await run()
+        await asyncio.to_thread(poller.poll_once)
+    finally:
+        sampler.remove_listener(recorder)
+        poller.release_interval(rate_request)
+
+    report = analyze(recorder.samples, thermal_limit_c)
+    report.cooldown_wait_s = waited
+    score = getattr(result, "score", None)
+    if score and report.power_avg > 0:
+        report.perf_per_watt = round(score / report.power_avg, 3)
+    if report.throttled:
+        logger.warning(f"Benchmark on GPU {sampler.device_index} throttled for {report.throttled_pct}% of samples")
+    return result, report
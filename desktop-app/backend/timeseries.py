@@ -0,0 +1,313 @@
+"""
+Telemetry Time-Series Store - columnar, append-only GPU metric history
+Maintains 1s/1m/1h rollups in on-disk segments with per-resolution retention
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from gpu_monitor import GPUInfo
+from telemetry import METRIC_FIELDS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# (name, bucket width in seconds, rows per on-disk segment)
+TIERS = (("1s", 1, 3600), ("1m", 60, 1440), ("1h", 3600, 720))
+DEFAULT_RETENTION_HOURS = {"1s": 6.0, "1m": 24.0 * 7, "1h": 24.0 * 365}
+CHECKPOINT_INTERVAL_S = 60  # Most history a crash can lose from a tier's unsealed rows
+
+
+def merge_buckets(rows):
+    """Combine rows sharing a bucket start (partial rows from restarts); sorted by bucket"""
+    buckets, inverse = np.unique(rows[:, 0], return_inverse=True)
+    if len(buckets) == len(rows):
+        return rows[np.argsort(rows[:, 0], kind="stable")]
+    merged = np.empty((len(buckets), rows.shape[1]), dtype=np.float64)
+    merged[:, 0] = buckets
+    merged[:, 1] = np.bincount(inverse, weights=rows[:, 1], minlength=len(buckets))
+    for col in range(2, rows.shape[1], 3):
+        merged[:, col] = np.bincount(inverse, weights=rows[:, col], minlength=len(buckets))
+    merged[:, 3::3], merged[:, 4::3] = np.inf, -np.inf
+    np.minimum.at(merged[:, 3::3], inverse, rows[:, 3::3])
+    np.maximum.at(merged[:, 4::3], inverse, rows[:, 4::3])
+    return merged
+
+
+class RollupTier:
+    """
+    One resolution. Rows are [bucket_start, count, (sum, min, max) per field];
+    full segments are written once as .npy files and memory-mapped for queries.
+    Rows not yet in a full segment, plus the open bucket, are checkpointed to
+    {name}.open.npy and picked up again on restart.
+    """
+
+    def __init__(self, name: str, width_s: int, segment_rows: int, fields: Tuple[str, ...], directory: Path):
+        self.name = name
+        self.width_s = width_s
+        self.fields = fields
+        self.directory = directory
+        self.ncols = 2 + 3 * len(fields)
+        self._segment = np.empty((segment_rows, self.ncols), dtype=np.float64)
+        self._rows = 0
+        self._bucket = None  # Start of the open bucket
+        self._acc = np.empty(self.ncols, dtype=np.float64)
+        self._files: List[Tuple[float, float, Path]] = []
+        self.checkpoint_path = directory / f"{name}.open.npy"
+
+        directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(directory.glob(f"{name}-*.npy")):
+            try:
+                first, last = path.stem.split("-")[1:3]
+                self._files.append((float(first), float(last), path))
+            except ValueError:
+                logger.warning(f"Skipping unrecognized telemetry segment: {path}")
+        self._restore()
+
+    def _restore(self):
+        """Reload checkpointed rows; the last one becomes the open bucket again"""
+        if not self.checkpoint_path.exists():
+            return
+        try:
+            rows = np.load(self.checkpoint_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable telemetry checkpoint {self.checkpoint_path}: {e}")
+            return
+        if rows.ndim != 2 or rows.shape[1] != self.ncols or len(rows) == 0:
+            return
+        # A crash between sealing a segment and rewriting the checkpoint leaves rows in both
+        sealed_until = max((last for _, last, _ in self._files), default=-np.inf)
+        closed, open_row = rows[:-1], rows[-1]
+        closed = closed[closed[:, 0] > sealed_until]
+        if len(closed) >= len(self._segment):
+            self._seal(closed)
+            closed = closed[:0]
+        self._segment[:len(closed)] = closed
+        self._rows = len(closed)
+        if open_row[0] > sealed_until:
+            self._acc[:] = open_row
+            self._bucket = float(open_row[0])
+
+    def add(self, timestamp: float, values):
+        bucket = timestamp - timestamp % self.width_s
+        if self._bucket is not None and bucket > self._bucket:
+            self._close_bucket()
+        if self._bucket is None:
+            self._bucket = bucket
+            acc = self._acc
+            acc[0], acc[1] = bucket, 0
+            acc[2::3], acc[3::3], acc[4::3] = 0.0, np.inf, -np.inf
+
+        acc = self._acc
+        acc[1] += 1
+        acc[2::3] += values
+        np.minimum(acc[3::3], values, out=acc[3::3])
+        np.maximum(acc[4::3], values, out=acc[4::3])
+
+    def _close_bucket(self):
+        self._segment[self._rows] = self._acc
+        self._rows += 1
+        self._bucket = None
+        if self._rows == len(self._segment):
+            self.flush()
+
+    def flush(self):
+        """Seal buffered rows as a new segment file"""
+        if self._rows == 0:
+            return
+        self._seal(self._segment[:self._rows])
+        self._rows = 0
+        self.checkpoint()
+
+    def _seal(self, rows):
+        first, last = float(rows[0, 0]), float(rows[-1, 0])
+        path = self.directory / f"{self.name}-{first:.0f}-{last:.0f}.npy"
+        suffix = 1
+        while path.exists() or any(p == path for _, _, p in self._files):
+            # Never overwrite: a same-named segment holds different samples
+            path = self.directory / f"{self.name}-{first:.0f}-{last:.0f}-{suffix}.npy"
+            suffix += 1
+        _atomic_save(path, rows)
+        self._files.append((first, last, path))
+
+    def checkpoint(self):
+        """Persist unsealed rows and the open bucket, replacing the previous checkpoint"""
+        rows = self._segment[:self._rows]
+        if self._bucket is not None:
+            rows = np.concatenate([rows, self._acc[np.newaxis, :]])
+        if len(rows):
+            _atomic_save(self.checkpoint_path, rows)
+        else:
+            self.checkpoint_path.unlink(missing_ok=True)
+
+    def close(self):
+        self.checkpoint()
+
+    def enforce_retention(self, retention_s: float, now: float):
+        cutoff = now - retention_s
+        kept = []
+        for first, last, path in self._files:
+            if last < cutoff:
+                path.unlink(missing_ok=True)
+            else:
+                kept.append((first, last, path))
+        self._files = kept
+
+    def query(self, start: float, end: float):
+        """Rows with bucket_start in [start, end], including the open bucket"""
+        parts = [
+            np.load(path, mmap_mode="r")
+            for first, last, path in self._files
+            if last >= start and first <= end
+        ]
+        parts.append(self._segment[:self._rows])
+        if self._bucket is not None:
+            parts.append(self._acc[np.newaxis, :])
+
+        rows = np.concatenate(parts) if len(parts) > 1 else np.asarray(parts[0])
+        mask = (rows[:, 0] >= start) & (rows[:, 0] <= end)
+        return merge_buckets(rows[mask])
+
+
+def _atomic_save(path: Path, rows):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, rows)
+    os.replace(tmp, path)
+
+
+class TimeSeriesStore:
+    """Per-device metric history fed by the telemetry sampler"""
+
+    def __init__(
+        self,
+        directory: Path,
+        fields: Tuple[str, ...] = METRIC_FIELDS,
+        retention_hours: Optional[Dict[str, float]] = None
+    ):
+        self.directory = Path(directory)
+        self.fields = fields
+        self.retention_hours = {**DEFAULT_RETENTION_HOURS, **(retention_hours or {})}
+        self.tiers = {name: RollupTier(name, width, rows, fields, self.directory) for name, width, rows in TIERS}
+        self._values = np.empty(len(fields), dtype=np.float64)
+        self._lock = threading.Lock()
+        self._last_retention = 0.0
+        self._last_checkpoint = time.time()
+        self.samples = 0
+
+    def configure(self, retention_hours: Optional[Dict[str, float]] = None):
+        if retention_hours:
+            self.retention_hours.update(retention_hours)
+            self._last_retention = 0.0
+
+    def append(self, timestamp: float, info: GPUInfo):
+        """Sampler listener: fold one sample into every resolution"""
+        with self._lock:
+            values = self._values
+            for col, name in enumerate(self.fields):
+                values[col] = getattr(info, name)
+            for tier in self.tiers.values():
+                tier.add(timestamp, values)
+            self.samples += 1
+
+            # Segment files only age out slowly; checking once a minute is plenty
+            if timestamp - self._last_retention >= 60:
+                self._enforce_retention(timestamp)
+            if timestamp - self._last_checkpoint >= CHECKPOINT_INTERVAL_S:
+                self.checkpoint()
+                self._last_checkpoint = timestamp
+
+    def checkpoint(self):
+        for tier in self.tiers.values():
+            try:
+                tier.checkpoint()
+            except OSError as e:
+                logger.error(f"Telemetry checkpoint failed for {tier.name}: {e}")
+
+    def _enforce_retention(self, now: float):
+        for name, tier in self.tiers.items():
+            tier.enforce_retention(self.retention_hours[name] * 3600, now)
+        self._last_retention = now
+
+    def pick_resolution(self, start: float, end: float, max_points: int) -> str:
+        """Finest tier that answers the range in at most max_points rows"""
+        for name, width, _ in TIERS:
+            if (end - start) / width <= max_points:
+                return name
+        return TIERS[-1][0]
+
+    def query(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        resolution: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        max_points: int = 1000
+    ) -> Dict[str, Any]:
+        end = end or time.time()
+        resolution = resolution or self.pick_resolution(start, end, max_points)
+        if resolution not in self.tiers:
+            raise ValueError(f"Unknown resolution {resolution}. Valid: {list(self.tiers)}")
+        fields = fields or list(self.fields)
+        unknown = [f for f in fields if f not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {unknown}. Valid: {list(self.fields)}")
+
+        with self._lock:
+            rows = self.tiers[resolution].query(start, end)
+        counts = rows[:, 1]
+
+        result: Dict[str, Any] = {
+            "resolution": resolution,
+            "start": start,
+            "end": end,
+            "timestamps": rows[:, 0].tolist(),
+            "counts": counts.astype(int).tolist(),
+            "avg": {},
+            "min": {},
+            "max": {}
+        }
+        for name in fields:
+            col = 2 + 3 * self.fields.index(name)
+            result["avg"][name] = np.round(rows[:, col] / counts, 2).tolist()
+            result["min"][name] = rows[:, col + 1].tolist()
+            result["max"][name] = rows[:, col + 2].tolist()
+        return result
+
+    def close(self):
+        with self._lock:
+            for tier in self.tiers.values():
+                tier.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "samples": self.samples,
+            "retention_hours": self.retention_hours,
+            "tiers": {
+                name: {"segments": len(tier._files), "buffered_rows": tier._rows}
+                for name, tier in self.tiers.items()
+            }
+        }
+
+
+# Global stores, one per device index
+_stores: Dict[int, TimeSeriesStore] = {}
+
+def get_store(device_index: int, root: Path) -> TimeSeriesStore:
+    if device_index not in _stores:
+        _stores[device_index] = TimeSeriesStore(Path(root) / f"gpu{device_index}")
+    return _stores[device_index]
+
+def close_stores():
+    for store in _stores.values():
+        store.close()
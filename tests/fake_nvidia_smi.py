@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Stand-in for `nvidia-smi --query-gpu=... --format=csv,noheader,nounits -lms N`.
+Prints one CSV row per fake GPU every N ms. FAKE_SMI_GPUS sets the GPU count,
+FAKE_SMI_ROUNDS makes it exit with status 1 after that many rounds, and
+FAKE_SMI_GARBAGE prints an unparseable line first.
+"""
+
+import os
+import sys
+import time
+
+
+def main():
+    args = sys.argv[1:]
+    fields = next(a.split("=", 1)[1] for a in args if a.startswith("--query-gpu="))
+    interval_ms = int(args[args.index("-lms") + 1]) if "-lms" in args else 0
+    columns = len(fields.split(","))
+    gpus = int(os.environ.get("FAKE_SMI_GPUS", "1"))
+    rounds = int(os.environ.get("FAKE_SMI_ROUNDS", "0"))
+
+    if os.environ.get("FAKE_SMI_GARBAGE"):
+        print("this is not, a csv row", flush=True)
+    done = 0
+    while True:
+        for index in range(gpus):
+            print(", ".join([str(index)] + [str(10 + i) for i in range(columns - 1)]), flush=True)
+        done += 1
+        if not interval_ms or (rounds and done >= rounds):
+            break
+        time.sleep(interval_ms / 1000)
+    if rounds:
+        print("Unable to determine the device handle for GPU0000:01:00.0: Unknown Error", file=sys.stderr, flush=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
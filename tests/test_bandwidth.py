@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from bandwidth import BandwidthSuite, TRANSFER_PATTERNS
+
+
+@pytest.mark.parametrize("params", [
+    {"max_size_mb": 0},
+    {"min_size_kb": 4096, "max_size_mb": 1},
+])
+def test_empty_size_sweep_is_rejected(params):
+    with pytest.raises(ValueError, match="No buffer sizes"):
+        BandwidthSuite(backend="numpy", **params)
+
+
+def test_transfer_only_patterns_need_cupy():
+    with pytest.raises(ValueError, match="CuPy"):
+        BandwidthSuite(backend="numpy", patterns=list(TRANSFER_PATTERNS))
+
+
+def test_small_sweep_runs():
+    suite = BandwidthSuite(backend="numpy", patterns=["copy"], min_size_kb=16, max_size_mb=1, target_ms=1.0)
+    result = suite.run()
+    assert len(result["curves"]["copy"]) == len(suite.sizes)
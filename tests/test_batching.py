@@ -0,0 +1,64 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from batching import MicroBatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_requests_with_different_trailing_shapes_are_batched_separately():
+    calls = []
+
+    async def runner(model_name, feeds):
+        calls.append(feeds["x"].shape)
+        return [feeds["x"] * 2]
+
+    async def scenario():
+        batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=20)
+        feeds = [{"x": np.ones((1, 3), dtype=np.float32)}, {"x": np.ones((1, 5), dtype=np.float32)},
+                 {"x": np.ones((2, 3), dtype=np.float32)}]
+        results = await asyncio.gather(*(batcher.submit("m", f) for f in feeds))
+        await batcher.shutdown()
+        return results
+
+    results = run(scenario())
+    assert [r[0].shape for r in results] == [(1, 3), (1, 5), (2, 3)]
+    assert sorted(calls) == [(1, 5), (3, 3)]
+
+
+def test_shutdown_stops_workers_and_rejects_new_requests():
+    async def runner(model_name, feeds):
+        return [feeds["x"]]
+
+    async def scenario():
+        batcher = MicroBatcher(runner, max_batch_size=4, max_wait_ms=1)
+        await batcher.submit("m", {"x": np.zeros((1, 2))})
+        workers = list(batcher._workers.values())
+        await batcher.shutdown()
+        assert all(w.done() for w in workers)
+        with pytest.raises(RuntimeError):
+            await batcher.submit("m", {"x": np.zeros((1, 2))})
+
+    run(scenario())
+
+
+def test_shutdown_fails_requests_caught_mid_batch():
+    started = asyncio.Event()
+
+    async def runner(model_name, feeds):
+        started.set()
+        await asyncio.sleep(10)
+
+    async def scenario():
+        batcher = MicroBatcher(runner, max_batch_size=1, max_wait_ms=0)
+        pending = asyncio.create_task(batcher.submit("m", {"x": np.zeros((1, 2))}))
+        await started.wait()
+        await batcher.shutdown()
+        with pytest.raises(RuntimeError):
+            await pending
+
+    run(scenario())
@@ -0,0 +1,52 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+ort = pytest.importorskip("onnxruntime")
+onnx = pytest.importorskip("onnx")
+from onnx import helper, TensorProto
+
+from inference import InferenceEngine
+
+
+def make_model(path, op="Relu"):
+    graph = helper.make_graph(
+        [helper.make_node(op, ["x"], ["y"])], path.stem,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["n", 4])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, ["n", 4])]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+
+
+def test_runners_are_dropped_with_their_session(tmp_path):
+    first, second = tmp_path / "first.onnx", tmp_path / "second.onnx"
+    make_model(first)
+    make_model(second, "Abs")
+
+    async def scenario():
+        engine = InferenceEngine(str(tmp_path / "models"))
+        engine.force_cpu = True
+        engine.engine_cache.enabled = False
+        engine.serve_io_binding = True
+        try:
+            name_a = await engine.load_model(str(first))
+            name_b = await engine.load_model(str(second))
+            feeds = {"x": -np.ones((2, 4), dtype=np.float32)}
+            out_a = await engine.run_batch(name_a, feeds)
+            out_b = await engine.run_batch(name_b, feeds)
+            assert out_a[0].max() == 0 and out_b[0].min() == 1
+            assert len(engine._bound_runners) == 2
+
+            engine.unload_model(name_a)
+            assert len(engine._bound_runners) == 1
+
+            engine.registry.configure(engine.registry.max_bytes, 0)  # Evict everything
+            assert not engine._bound_runners
+        finally:
+            engine.executor.shutdown()
+            engine.loader.shutdown()
+
+    asyncio.run(scenario())
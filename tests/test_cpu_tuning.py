@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from cpu_tuning import CpuTuning
+
+ort = pytest.importorskip("onnxruntime")
+onnx = pytest.importorskip("onnx")
+from onnx import helper, TensorProto
+
+from inference import InferenceEngine
+
+
+def test_invalid_execution_mode_is_rejected():
+    with pytest.raises(ValueError):
+        CpuTuning(execution_mode="concurrent")
+    assert CpuTuning(execution_mode="parallel").execution_mode == "parallel"
+
+
+def test_apply_keeps_input_shapes(tmp_path):
+    graph = helper.make_graph(
+        [helper.make_node("Relu", ["x"], ["y"])], "relu",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["n", 4])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, ["n", 4])]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    path = tmp_path / "relu.onnx"
+    onnx.save(model, str(path))
+
+    async def scenario():
+        engine = InferenceEngine(str(tmp_path / "models"))
+        engine.force_cpu = True
+        engine.engine_cache.enabled = False
+        try:
+            name = await engine.load_model(str(path), "FP32", {"x": [2, 4]})
+            result = await engine.tune_cpu(name, benchmark_runs=2, apply=True)
+            assert result["applied"]
+            return engine.registry.entry(name)
+        finally:
+            engine.executor.shutdown()
+            engine.loader.shutdown()
+
+    entry = asyncio.run(scenario())
+    assert entry.input_shapes == {"x": [2, 4]}
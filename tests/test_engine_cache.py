@@ -0,0 +1,58 @@
+import pytest
+
+ort = pytest.importorskip("onnxruntime")
+onnx = pytest.importorskip("onnx")
+from onnx import helper, TensorProto
+
+from engine_cache import EngineCache, OPTIMIZED_MODEL_FILE
+
+
+def make_model(path):
+    node = helper.make_node("Relu", ["x"], ["y"])
+    graph = helper.make_graph(
+        [node], "tiny",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 4])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 4])]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+
+
+def test_precision_only_keys_tensorrt_entries():
+    shapes = {"x": [1, 4]}
+    assert EngineCache.make_key("h", "CPUExecutionProvider", "FP16", shapes) == \
+        EngineCache.make_key("h", "CPUExecutionProvider", "FP32", shapes)
+    assert EngineCache.make_key("h", "TensorrtExecutionProvider", "FP16", shapes) != \
+        EngineCache.make_key("h", "TensorrtExecutionProvider", "FP32", shapes)
+
+
+def test_concurrent_builds_write_distinct_temp_files(tmp_path):
+    model = tmp_path / "tiny.onnx"
+    make_model(model)
+    cache = EngineCache(tmp_path / "cache")
+    providers = ["CPUExecutionProvider"]
+
+    options = [ort.SessionOptions(), ort.SessionOptions()]
+    plans = [cache.plan(model, "abc", providers, "FP32", {}, o) for o in options]
+    assert plans[0].key == plans[1].key
+    assert plans[0].pending_optimized != plans[1].pending_optimized
+
+    for plan, opts in zip(plans, options):
+        ort.InferenceSession(str(plan.model_path), sess_options=opts, providers=providers)
+    for plan in plans:
+        cache.commit(plan)
+
+    entry_dir = tmp_path / "cache" / plans[0].key
+    assert (entry_dir / OPTIMIZED_MODEL_FILE).stat().st_size > 0
+    assert not list(entry_dir.glob("*.tmp"))
+    assert cache.plan(model, "abc", providers, "FP16", {}, ort.SessionOptions()).cache_hit
+
+
+def test_unwritten_temp_file_is_not_promoted(tmp_path):
+    model = tmp_path / "tiny.onnx"
+    make_model(model)
+    cache = EngineCache(tmp_path / "cache")
+    plan = cache.plan(model, "abc", ["CPUExecutionProvider"], "FP32", {}, ort.SessionOptions())
+    cache.commit(plan)
+    assert not (tmp_path / "cache" / plan.key / OPTIMIZED_MODEL_FILE).exists()
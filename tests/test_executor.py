@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+
+from executor import InferenceExecutor
+
+
+def test_model_limit_holds_the_model_exclusively():
+    events = []
+    lock = threading.Lock()
+    active = {"n": 0, "max_sweep": 0}
+
+    def work(tag, seconds):
+        with lock:
+            active["n"] += 1
+            if tag == "sweep":
+                active["max_sweep"] = max(active["max_sweep"], active["n"])
+            events.append(("start", tag))
+        time.sleep(seconds)
+        with lock:
+            active["n"] -= 1
+            events.append(("end", tag))
+
+    async def scenario():
+        executor = InferenceExecutor(max_workers=4, per_model_limit=1)
+        before = asyncio.create_task(executor.run("m", work, "before", 0.1))
+        await asyncio.sleep(0.02)
+
+        async def sweep():
+            async with executor.model_limit("m", 2):
+                assert executor.get_stats()["held_models"] == ["m"]
+                await asyncio.gather(*(executor.run("m", work, "sweep", 0.1) for _ in range(2)))
+
+        sweeping = asyncio.create_task(sweep())
+        await asyncio.sleep(0.02)
+        during = asyncio.create_task(executor.run("m", work, "during", 0.01))
+        await asyncio.gather(before, sweeping, during)
+        executor.shutdown()
+        return executor
+
+    executor = asyncio.run(scenario())
+    assert events[:2] == [("start", "before"), ("end", "before")]
+    assert events[-2:] == [("start", "during"), ("end", "during")]
+    assert active["max_sweep"] == 2
+    assert executor.get_stats()["held_models"] == []
@@ -0,0 +1,21 @@
+import gpu_monitor
+from gpu_monitor import GPUMonitor, SIMULATED_STATIC
+
+
+def test_static_fallback_is_not_cached(monkeypatch):
+    calls = []
+
+    def failing_then_ok(fields, index=None):
+        calls.append(fields)
+        if len(calls) == 1:
+            raise RuntimeError("nvidia-smi timed out")
+        return {0: ["Test GPU", "999.1", "8192", "4", "16"]}
+
+    monkeypatch.setattr(gpu_monitor, "query_nvidia_smi", failing_then_ok)
+    monkeypatch.setattr(gpu_monitor, "nvidia_smi_cuda_version", lambda: "12.0")
+    monitor = GPUMonitor(0, use_nvml=False)
+
+    assert monitor.get_static_info() == SIMULATED_STATIC
+    assert monitor.get_static_info()["name"] == "Test GPU"
+    assert monitor.get_static_info()["name"] == "Test GPU"
+    assert len(calls) == 2
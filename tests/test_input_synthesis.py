@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+ort = pytest.importorskip("onnxruntime")
+onnx = pytest.importorskip("onnx")
+from onnx import helper, numpy_helper, TensorProto
+
+import input_synthesis
+from input_synthesis import detect_precision
+
+
+def save(graph, path):
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+
+
+def io(name):
+    return helper.make_tensor_value_info(name, TensorProto.FLOAT, [1, 4])
+
+
+def test_qdq_graph_with_float_io_is_int8(tmp_path, monkeypatch):
+    scale = numpy_helper.from_array(np.array(0.1, dtype=np.float32), "scale")
+    zero = numpy_helper.from_array(np.array(0, dtype=np.int8), "zero")
+    nodes = [
+        helper.make_node("QuantizeLinear", ["x", "scale", "zero"], ["q"]),
+        helper.make_node("DequantizeLinear", ["q", "scale", "zero"], ["y"])
+    ]
+    path = tmp_path / "qdq.onnx"
+    session = save(helper.make_graph(nodes, "qdq", [io("x")], [io("y")], [scale, zero]), path)
+    assert detect_precision(session, "FP32", str(path)) == "INT8"
+
+    # Without the onnx package the file is scanned for the op names
+    monkeypatch.setattr(input_synthesis, "HAS_ONNX", False)
+    input_synthesis._is_quantized.cache_clear()
+    assert detect_precision(session, "FP32", str(path)) == "INT8"
+
+
+def test_float_graph_and_unreadable_model(tmp_path):
+    path = tmp_path / "relu.onnx"
+    session = save(helper.make_graph([helper.make_node("Relu", ["x"], ["y"])], "relu", [io("x")], [io("y")]), path)
+    assert detect_precision(session, "FP32", str(path)) == "FP32"
+    assert detect_precision(session, "FP32", str(tmp_path / "missing.onnx")) == "unknown"
+    assert detect_precision(session) == "unknown"
@@ -0,0 +1,24 @@
+import asyncio
+
+from jobs import BenchmarkJobQueue
+
+
+def test_failing_completion_handler_keeps_job_completed():
+    statuses = []
+
+    async def runner(job):
+        return {"score": 1.0}
+
+    async def main():
+        def on_complete(result):
+            statuses.append(job.status)
+            raise OSError("history disk full")
+
+        queue = BenchmarkJobQueue(runner, on_complete)
+        job = queue.submit("cuda")
+        await job.done.wait()
+        return job
+
+    job = asyncio.run(main())
+    assert (job.status, job.result, job.error) == ("completed", {"score": 1.0}, None)
+    assert statuses == ["running"]  # Not published as completed before the result was recorded
@@ -0,0 +1,19 @@
+import time
+
+import pytest
+
+from latency_stats import AdaptiveConfig, measure
+
+
+def test_wall_clock_cap_covers_warmup_and_measurement():
+    config = AdaptiveConfig(max_warmup_runs=10_000, min_runs=10_000, max_runs=10_000, max_duration_s=0.2)
+    start = time.perf_counter()
+    stats, _ = measure(lambda: time.sleep(0.001), config)
+    assert time.perf_counter() - start < 1.0
+    assert stats.count >= 1
+    assert not stats.converged
+
+
+def test_zero_max_runs_is_rejected():
+    with pytest.raises(ValueError):
+        measure(lambda: None, AdaptiveConfig(max_runs=0))
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+ort = pytest.importorskip("onnxruntime")
+onnx = pytest.importorskip("onnx")
+from onnx import helper, TensorProto
+
+from inference import InferenceEngine
+from input_synthesis import make_feeds
+
+
+def make_model(path):
+    graph = helper.make_graph(
+        [helper.make_node("Add", ["x", "mask"], ["y"])], path.stem,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["n", "seq"]),
+         helper.make_tensor_value_info("mask", TensorProto.FLOAT, ["n", "seq"])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, ["n", "seq"])]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+
+
+def test_make_feeds_uses_load_shapes(tmp_path):
+    path = tmp_path / "add.onnx"
+    make_model(path)
+    session = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+
+    feeds, shapes = make_feeds(session, 8, {"x": [3, 16], "mask": [3, 16]})
+    assert shapes == {"x": [3, 16], "mask": [3, 16]}
+    assert feeds["x"].shape == (3, 16)
+
+
+def test_inference_feeds_follow_the_shapes_a_model_was_loaded_with(tmp_path):
+    path = tmp_path / "add.onnx"
+    make_model(path)
+
+    async def scenario():
+        engine = InferenceEngine(str(tmp_path / "models"))
+        engine.force_cpu = True
+        engine.engine_cache.enabled = False
+        try:
+            name = await engine.load_model(str(path), "FP32", {"x": [3, 16], "mask": [3, 16]})
+            result = await engine.run_inference(name, batch_size=1, precision="FP32", warmup_runs=1, benchmark_runs=2)
+            assert result.is_real
+            assert result.input_shapes == {"x": [3, 16], "mask": [3, 16]}
+            assert result.batch_size == 3
+        finally:
+            engine.executor.shutdown()
+            engine.loader.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,33 @@
+from model_registry import ModelRegistry
+
+
+def test_serving_lookups_count_uses_not_cache_hits(tmp_path):
+    path = tmp_path / "tiny.onnx"
+    path.write_bytes(b"x" * 10)
+    registry = ModelRegistry()
+    key = registry.make_key("ab" * 32, ["CPUExecutionProvider"])
+
+    assert registry.lookup(key) is None
+    registry.add(key, path, object(), ["CPUExecutionProvider"])
+    for _ in range(5):
+        assert registry.get("tiny") is not None
+    assert registry.get("missing") is None
+    assert registry.lookup(key) is not None
+
+    stats = registry.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["entries"][0]["uses"] == 6
+
+
+def test_variants_of_one_file_get_distinct_names(tmp_path):
+    path = tmp_path / "tiny.onnx"
+    path.write_bytes(b"x" * 10)
+    registry = ModelRegistry()
+    providers = ["CPUExecutionProvider"]
+    keys = [registry.make_key("ab" * 32, providers, variant) for variant in ("", "FP16", "FP16:x=1x3", "INT8")]
+
+    sessions = [object() for _ in keys]
+    names = [registry.add(key, path, session, providers).name for key, session in zip(keys, sessions)]
+
+    assert len(set(names)) == len(keys)
+    assert [registry.get(name) for name in names] == sessions
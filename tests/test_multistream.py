@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from multistream import MultiStreamBenchmark
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError, match="size"):
+        MultiStreamBenchmark(size=0, backend="numpy")
+
+
+def test_thread_scaling_on_numpy():
+    result = MultiStreamBenchmark(streams=[2], size=32, iterations=3, backend="numpy").run()
+    assert [p["streams"] for p in result["points"]] == [1, 2]
+    assert all(p["gflops"] > 0 for p in result["points"])
@@ -0,0 +1,70 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import gpu_monitor
+from gpu_monitor import NvidiaSmiStream
+
+FAKE_SMI = Path(__file__).parent / "fake_nvidia_smi.py"
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake nvidia-smi is a shebang script")
+
+
+@pytest.fixture
+def fake_smi(monkeypatch):
+    monkeypatch.setenv("NVIDIA_SMI_PATH", str(FAKE_SMI))
+    # NVIDIA_SMI_PATH is read when gpu_monitor is imported
+    monkeypatch.setattr(gpu_monitor, "NVIDIA_SMI", str(FAKE_SMI))
+    return monkeypatch
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_rows_are_parsed_per_gpu(fake_smi):
+    fake_smi.setenv("FAKE_SMI_GPUS", "2")
+    fake_smi.setenv("FAKE_SMI_GARBAGE", "1")
+    stream = NvidiaSmiStream(interval_ms=50)
+    stream.start()
+    try:
+        assert wait_for(lambda: len(stream.rows()) == 2)
+        rows = stream.rows()
+        assert rows[1][0] == "10"
+        assert gpu_monitor.gpu_info_from_smi(rows[0], dict(gpu_monitor.SIMULATED_STATIC)).is_real
+        assert stream.get_stats()["parse_errors"] == 1
+    finally:
+        stream.stop()
+
+
+def test_stream_restarts_after_the_process_exits(fake_smi):
+    fake_smi.setenv("FAKE_SMI_ROUNDS", "3")
+    stream = NvidiaSmiStream(interval_ms=50)
+    stream.start()
+    try:
+        assert wait_for(lambda: stream.restarts >= 1 and stream.lines > 3)
+        stats = stream.get_stats()
+        assert "exit code 1" in stats["last_error"]
+        assert "Unknown Error" in stats["last_stderr"]
+    finally:
+        stream.stop()
+
+
+def test_stop_terminates_the_process(fake_smi):
+    stream = NvidiaSmiStream(interval_ms=50)
+    stream.start()
+    assert wait_for(lambda: stream.lines > 0)
+    process = stream._process
+    start = time.time()
+    stream.stop()
+    assert time.time() - start < 3
+    assert process.poll() is not None
+    assert stream._thread is None
+    assert not stream.get_stats()["running"]
@@ -0,0 +1,80 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from history import ResultHistory
+from regression import Baseline, BaselineStore, RegressionTracker, compare, welch_test
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def baseline(scores):
+    return Baseline(name="base", device_name="GPU", driver_version="1", benchmark_type="cuda_matmul",
+                    params={}, scores=scores)
+
+
+def test_welch_test_matches_hand_computation():
+    # Sample variances 5/3 and 10: se = sqrt(5/12 + 2), t = 3.5 / se, Welch-Satterthwaite df
+    t, df, se = welch_test([1, 2, 3, 4], [2, 4, 6, 8, 10])
+    assert se == pytest.approx(math.sqrt(5 / 12 + 2))
+    assert t == pytest.approx(3.5 / math.sqrt(5 / 12 + 2))
+    assert df == pytest.approx((5 / 12 + 2) ** 2 / ((5 / 12) ** 2 / 3 + 2 ** 2 / 4))
+
+
+def test_welch_test_identical_constant_samples():
+    assert welch_test([5.0, 5.0], [5.0, 5.0])[0] == 0.0
+    assert welch_test([5.0, 5.0], [4.0, 4.0])[0] == -math.inf
+
+
+@pytest.mark.parametrize("candidate, status", [
+    ([80.0, 81.0, 79.5, 80.5], "regression"),
+    ([120.0, 121.0, 119.5, 120.5], "improvement"),
+    ([99.0, 101.5, 100.2, 99.8], "no_change"),
+    ([98.0, 97.5, 98.2, 97.8], "no_change"),  # Significant but under the threshold
+    ([80.0], "insufficient_data"),
+])
+def test_compare_status(candidate, status):
+    comparison = compare(baseline([100.0, 101.0, 99.0, 100.5, 99.5]), candidate, threshold_pct=5.0)
+    assert comparison.status == status
+
+
+def add_runs(history, scores, first_minute):
+    ids = []
+    for i, score in enumerate(scores):
+        record = {
+            "id": f"run-{first_minute + i}",
+            "device_name": "GPU",
+            "driver_version": "1",
+            "benchmark_type": "cuda_matmul",
+            "params": {},
+            "score": score,
+            "timestamp": (START + timedelta(minutes=first_minute + i)).isoformat()
+        }
+        history.add(record)
+        ids.append(record)
+    return ids
+
+
+def test_runs_older_than_the_baseline_are_not_candidates(tmp_path):
+    history = ResultHistory(tmp_path / "history.jsonl")
+    add_runs(history, [80.0, 80.5, 79.5, 80.2, 79.8], 0)
+    latest = add_runs(history, [100.0, 100.5, 99.5, 100.2, 99.8], 5)
+    tracker = RegressionTracker(history, BaselineStore(tmp_path / "baselines.json"))
+    tracker.baselines.create("latest", latest)
+
+    assert tracker.report()["entries"] == []
+
+    add_runs(history, [100.1, 99.9], 10)
+    entry = tracker.report()["entries"][0]
+    assert entry["candidate_runs"] == 2
+    assert entry["status"] == "no_change"
+
+
+def test_baseline_without_run_timestamps_uses_creation_time(tmp_path):
+    history = ResultHistory(tmp_path / "history.jsonl")
+    add_runs(history, [80.0, 80.5, 79.5], 0)
+    store = BaselineStore(tmp_path / "baselines.json")
+    store.create("old", [{**r, "timestamp": None} for r in history.list(None)])
+    tracker = RegressionTracker(history, store)
+    assert tracker.report()["entries"] == []
@@ -0,0 +1,29 @@
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+from sweep import run_sweep
+
+
+class FixedBatchEngine:
+    """A real-hardware engine serving a model whose batch axis is fixed at 8"""
+
+    def __init__(self):
+        self.executor = SimpleNamespace(max_workers=4, model_limit=self._model_limit)
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def _model_limit(model_name, limit):
+        yield
+
+    async def run_inference(self, model_name, batch_size, precision, framework, warmup_runs, benchmark_runs):
+        await asyncio.sleep(0.001 * benchmark_runs)
+        return SimpleNamespace(is_real=True, batch_size=8, throughput=0.0, latency_ms=1.0, latency_stats=None)
+
+
+def test_throughput_uses_the_batch_size_that_ran():
+    result = asyncio.run(run_sweep(FixedBatchEngine(), "fixed", [1], [2], runs_per_stream=10))
+    point = result["points"][0]
+    # 2 streams x 10 runs x 8 inferences in a little over 10 ms: roughly 10-16k/s.
+    # Counting the requested batch of 1 would give at most 2k/s
+    assert point["throughput"] > 4000
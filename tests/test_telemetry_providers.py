@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from gpu_monitor import GPUInfo
+from telemetry_providers import ReplayProvider, SyntheticProvider, TelemetryProvider
+
+
+def write_trace(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    return path
+
+
+def record(t, device_index=0, **overrides):
+    info = SyntheticProvider(1, seed=1).sample(0).to_dict()
+    return {"t": t, "device_index": device_index, **info, **overrides}
+
+
+def test_provider_base_is_abstract():
+    with pytest.raises(TypeError):
+        TelemetryProvider()
+
+
+def test_replay_sorts_by_timestamp(tmp_path):
+    trace = write_trace(tmp_path / "trace.jsonl", [record(2.0, utilization=20.0), record(1.0, utilization=10.0)])
+    provider = ReplayProvider(str(trace))
+    assert provider.duration == 1.0
+    assert provider.sample_all()[0].utilization == 10.0
+    assert isinstance(provider.sample_all()[0], GPUInfo)
+
+
+@pytest.mark.parametrize("bad", [
+    {k: v for k, v in record(1.0).items() if k != "t"},
+    record("soon"),
+    record(1.0, device_index="gpu0"),
+    [1, 2, 3],
+])
+def test_replay_rejects_malformed_records(tmp_path, bad):
+    trace = write_trace(tmp_path / "trace.jsonl", [record(0.0), bad])
+    with pytest.raises(ValueError, match=":2"):
+        ReplayProvider(str(trace))
+
+
+def test_replay_rejects_invalid_json(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    trace.write_text("{not json\n")
+    with pytest.raises(ValueError):
+        ReplayProvider(str(trace))
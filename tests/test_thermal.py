@@ -0,0 +1,59 @@
+import asyncio
+
+from telemetry import TelemetryPoller
+from telemetry_providers import SyntheticProvider
+from thermal import analyze, run_monitored
+
+
+def test_analyze_without_samples_is_empty_report():
+    report = analyze([])
+    assert report.samples == 0
+    assert not report.throttled
+    assert report.intervals == []
+
+
+def test_overlapping_rate_requests_restore_base_interval():
+    poller = TelemetryPoller(SyntheticProvider(2, seed=1), interval_s=1.0)
+    a = poller.request_interval(0.2)
+    b = poller.request_interval(0.5)
+    assert poller.interval_s == 0.2
+    # A finishes before B: B's rate holds, then the configured rate returns
+    poller.release_interval(a)
+    assert poller.interval_s == 0.5
+    poller.release_interval(b)
+    assert poller.interval_s == 1.0
+
+
+def test_configure_keeps_active_requests():
+    poller = TelemetryPoller(SyntheticProvider(1, seed=1), interval_s=1.0)
+    token = poller.request_interval(0.2)
+    poller.configure(interval_s=2.0)
+    assert poller.interval_s == 0.2
+    poller.release_interval(token)
+    assert poller.interval_s == 2.0
+
+
+def test_concurrent_monitored_runs_on_different_devices():
+    poller = TelemetryPoller(SyntheticProvider(2, seed=1), interval_s=1.0)
+
+    async def main():
+        started = asyncio.Event()
+        finish_a = asyncio.Event()
+
+        async def run_a():
+            started.set()
+            await finish_a.wait()
+
+        async def run_b():
+            await started.wait()
+            finish_a.set()  # A finishes first
+            await asyncio.sleep(0.05)
+            assert poller.interval_s == 0.2
+
+        await asyncio.gather(
+            run_monitored(poller.sampler(0), run_a, sample_interval_s=0.2),
+            run_monitored(poller.sampler(1), run_b, sample_interval_s=0.2),
+        )
+
+    asyncio.run(main())
+    assert poller.interval_s == 1.0
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from timeseries import TimeSeriesStore, merge_buckets
+
+FIELDS = ("temperature",)
+
+
+def sample(value):
+    return SimpleNamespace(temperature=value)
+
+
+def test_checkpointed_rows_survive_a_crash(tmp_path):
+    store = TimeSeriesStore(tmp_path, FIELDS)
+    for t in range(0, 600, 10):
+        store.append(1_000_000 + t, sample(50.0))
+    store.checkpoint()  # Periodic checkpoint; no close() - the process dies here
+
+    restarted = TimeSeriesStore(tmp_path, FIELDS)
+    result = restarted.query(999_000, 1_001_000, resolution="1m")
+    assert sum(result["counts"]) == 60
+
+
+def test_restart_inside_an_open_bucket_keeps_one_row(tmp_path):
+    base = 1_000_020  # Bucket 999_960..1_000_019 for 1m; mid-bucket for 1h
+    store = TimeSeriesStore(tmp_path, FIELDS)
+    for t in range(5):
+        store.append(base + t, sample(40.0 + t))
+    store.close()
+
+    for _ in range(2):  # Restart twice
+        store = TimeSeriesStore(tmp_path, FIELDS)
+        store.append(base + 10, sample(60.0))
+        store.close()
+
+    store = TimeSeriesStore(tmp_path, FIELDS)
+    result = store.query(base - 3600, base + 60, resolution="1h")
+    assert result["counts"] == [7]
+    assert result["min"]["temperature"] == [40.0]
+    assert result["max"]["temperature"] == [60.0]
+
+
+def test_sealed_segments_are_never_overwritten(tmp_path):
+    store = TimeSeriesStore(tmp_path, FIELDS)
+    tier = store.tiers["1m"]
+    row = np.array([[60.0, 2, 100.0, 49.0, 51.0]])
+    tier._seal(row)
+    tier._seal(row)
+    assert len(list(tmp_path.glob("1m-*.npy"))) == 2
+
+    reloaded = TimeSeriesStore(tmp_path, FIELDS)
+    result = reloaded.query(0, 120, resolution="1m")
+    assert result["counts"] == [4]
+    assert result["avg"]["temperature"] == [50.0]
+
+
+def test_merge_buckets_combines_partial_rows():
+    rows = np.array([
+        [120.0, 1, 10.0, 10.0, 10.0],
+        [60.0, 2, 30.0, 14.0, 16.0],
+        [60.0, 1, 20.0, 20.0, 20.0]
+    ])
+    merged = merge_buckets(rows)
+    assert merged[:, 0].tolist() == [60.0, 120.0]
+    assert merged[0].tolist() == [60.0, 3, 50.0, 14.0, 20.0]
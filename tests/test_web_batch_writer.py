@@ -0,0 +1,154 @@
+import asyncio
+import time
+
+import pytest
+
+from .web_backend import load_definitions
+
+
+class BulkWriteError(Exception):
+    def __init__(self, details):
+        super().__init__("bulk write error")
+        self.details = details
+
+
+web = load_definitions(
+    "WRITE_BATCH_SIZE", "WRITE_FLUSH_INTERVAL_MS", "WRITE_MAX_PENDING", "WRITE_RETRIES", "DUPLICATE_KEY_ERROR",
+    "BatchWriter",
+    BulkWriteError=BulkWriteError, AsyncIOMotorCollection=object
+)
+BatchWriter = web["BatchWriter"]
+
+
+class FakeCollection:
+    """Async insert_many with a configurable delay, failures and duplicate-key replays"""
+
+    name = "fake"
+
+    def __init__(self, delay=0.0, failures=0, duplicates=0):
+        self.docs = []
+        self.calls = []
+        self.delay = delay
+        self.failures = failures
+        self.duplicates = duplicates
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append(len(docs))
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("mongo unavailable")
+        if self.duplicates:
+            # The first `duplicates` documents already landed on an earlier attempt
+            errors = [{"index": i, "code": web["DUPLICATE_KEY_ERROR"]} for i in range(self.duplicates)]
+            self.docs.extend(docs[self.duplicates:])
+            self.duplicates = 0
+            raise BulkWriteError({"writeErrors": errors})
+        self.docs.extend(docs)
+
+
+@pytest.fixture
+def fast_retries():
+    retries = web["WRITE_RETRIES"]
+    web["WRITE_RETRIES"] = 1
+    yield
+    web["WRITE_RETRIES"] = retries
+
+
+def test_flush_makes_buffered_writes_visible():
+    async def main():
+        collection = FakeCollection()
+        writer = BatchWriter(collection, batch_size=100, flush_interval_ms=60_000)
+        writer.start()
+        for i in range(5):
+            await writer.put({"i": i})
+        assert collection.docs == []
+        await writer.flush()
+        assert [d["i"] for d in collection.docs] == list(range(5))
+        await writer.close()
+
+    asyncio.run(main())
+
+
+def test_batches_by_size_and_backpressure():
+    async def main():
+        collection = FakeCollection(delay=0.02)
+        writer = BatchWriter(collection, batch_size=10, flush_interval_ms=60_000, max_pending=20)
+        writer.start()
+        await asyncio.gather(*(writer.put({"i": i}) for i in range(100)))
+        assert len(writer._pending) <= 20
+        await writer.close()
+        assert sorted(d["i"] for d in collection.docs) == list(range(100))
+        assert max(collection.calls) <= 10
+
+    asyncio.run(main())
+
+
+def test_flush_under_sustained_writes_returns():
+    async def main():
+        collection = FakeCollection(delay=0.005)
+        writer = BatchWriter(collection, batch_size=5, flush_interval_ms=60_000, max_pending=50)
+        writer.start()
+        stop = asyncio.Event()
+
+        async def produce():
+            i = 0
+            while not stop.is_set():
+                await writer.put({"i": i})
+                i += 1
+                await asyncio.sleep(0)
+
+        producer = asyncio.create_task(produce())
+        await asyncio.sleep(0.05)
+        queued = writer._queued
+        await asyncio.wait_for(writer.flush(), 2.0)  # Would chase the producer forever without the snapshot
+        assert len(collection.docs) >= queued
+        stop.set()
+        await producer
+        await writer.close()
+        assert len(collection.docs) == writer._queued
+
+    asyncio.run(main())
+
+
+def test_flush_wait_is_bounded_during_outage(fast_retries):
+    async def main():
+        collection = FakeCollection(failures=1)
+        writer = BatchWriter(collection, batch_size=10, flush_interval_ms=60_000)
+        writer.start()
+        await writer.put({"i": 0})
+        start = time.perf_counter()
+        await writer.flush(timeout_s=0.1)
+        assert time.perf_counter() - start < 0.4  # Retry backoff alone is 0.5 s
+        # The write keeps going in the background and lands on the retry
+        await writer.close()
+        assert [d["i"] for d in collection.docs] == [0]
+        assert writer.written == 1 and writer.dropped == 0
+
+    asyncio.run(main())
+
+
+def test_duplicate_key_errors_count_as_written():
+    async def main():
+        collection = FakeCollection(duplicates=2)
+        writer = BatchWriter(collection, batch_size=5, flush_interval_ms=60_000)
+        writer.start()
+        for i in range(5):
+            await writer.put({"i": i})
+        await writer.close()
+        assert writer.written == 5 and writer.dropped == 0
+
+    asyncio.run(main())
+
+
+def test_gives_up_after_retries(fast_retries):
+    async def main():
+        collection = FakeCollection(failures=99)
+        writer = BatchWriter(collection, batch_size=5, flush_interval_ms=60_000)
+        writer.start()
+        await writer.put({"i": 0})
+        await writer.close()
+        assert writer.dropped == 1
+        assert len(collection.calls) == 2
+
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from .web_backend import load_definitions
+
+DESCENDING = -1
+web = load_definitions(
+    "HISTORY_MAX_LIMIT", "HISTORY_SORT", "NEXT_CURSOR_HEADER", "encode_cursor", "decode_cursor", "as_utc",
+    "iso_utc", "timestamp_condition", "history_projection", "_migrating", "query_history", "migrate_string_timestamps",
+    "_migrate_string_timestamps",
+    HTTPException=HTTPException, Response=Response, BaseModel=BaseModel, DESCENDING=DESCENDING,
+    AsyncIOMotorCollection=object, UpdateOne=lambda query, update: (query, update)
+)
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+# BSON compares values of different types by type order (strings before dates),
+# and range operators only match values of the operand's type
+def _rank(value):
+    return 2 if isinstance(value, datetime) else 1
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(_matches(doc, q) for q in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            for op, operand in condition.items():
+                if op == "$type":
+                    ok = _rank(value) == {"string": 1, "date": 2}[operand]
+                elif op == "$nin":
+                    ok = value not in operand
+                elif _rank(value) != _rank(operand):
+                    ok = False
+                else:
+                    ok = value < operand if op == "$lt" else value >= operand
+                if not ok:
+                    return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, spec):
+        for field, direction in reversed(spec):
+            self.docs.sort(key=lambda d: (_rank(d[field]), d[field]), reverse=direction == DESCENDING)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, n):
+        return self.docs[:n]
+
+
+class FakeCollection:
+    name = "benchmarks"
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        hidden = {"_id"} if (projection or {}).get("_id") == 0 else set()
+        return Cursor([{k: v for k, v in d.items() if k not in hidden} for d in self.docs if _matches(d, query)])
+
+    async def bulk_write(self, updates, ordered=True):
+        for query, update in updates:
+            for doc in self.docs:
+                if doc["_id"] == query["_id"]:
+                    doc.update(update["$set"])
+
+
+class Row(BaseModel):
+    id: str
+    timestamp: datetime
+
+
+def history(minutes_as_strings):
+    """Ten rows a minute apart; the given minutes still hold legacy ISO strings"""
+    docs = []
+    for minute in range(10):
+        timestamp = START + timedelta(minutes=minute)
+        docs.append({
+            "_id": minute,
+            "id": f"r{minute}",
+            "timestamp": timestamp.isoformat() if minute in minutes_as_strings else timestamp
+        })
+    return FakeCollection(docs)
+
+
+async def all_pages(collection, limit=3, **kwargs):
+    ids, cursor = [], None
+    while True:
+        response = Response()
+        page = await web["query_history"](collection, Row, response, {}, limit, cursor,
+                                          kwargs.get("since"), kwargs.get("until"), None)
+        ids += [row.id for row in page]
+        cursor = response.headers.get(web["NEXT_CURSOR_HEADER"])
+        if not cursor:
+            return ids
+
+
+@pytest.fixture(autouse=True)
+def migrating():
+    web["_migrating"].clear()
+    yield web["_migrating"]
+    web["_migrating"].clear()
+
+
+def test_paging_includes_unmigrated_rows(migrating):
+    collection = history({1, 4, 7})
+    migrating.add(collection.name)
+    ids = asyncio.run(all_pages(collection))
+    assert sorted(ids) == [f"r{m}" for m in range(10)]
+    assert len(ids) == len(set(ids))
+
+
+def test_time_range_matches_unmigrated_rows(migrating):
+    collection = history({2, 3})
+    migrating.add(collection.name)
+    ids = asyncio.run(all_pages(collection, since=START + timedelta(minutes=2), until=START + timedelta(minutes=5)))
+    assert sorted(ids) == ["r2", "r3", "r4"]
+
+
+def test_legacy_cursor_after_migration_completes(migrating):
+    collection = history({0, 1, 2, 3, 4})
+    migrating.add(collection.name)
+
+    async def main():
+        response = Response()
+        await web["query_history"](collection, Row, response, {}, 7, None, None, None, None)
+        cursor = response.headers[web["NEXT_CURSOR_HEADER"]]  # Points at a string-timestamp row
+        await web["migrate_string_timestamps"](collection)
+        assert collection.name not in migrating
+        rest = await web["query_history"](collection, Row, Response(), {}, 10, cursor, None, None, None)
+        return [row.id for row in rest]
+
+    assert asyncio.run(main()) == ["r2", "r1", "r0"]
+
+
+def test_migrated_collection_uses_plain_keyset():
+    collection = history(set())
+    ids = asyncio.run(all_pages(collection))
+    assert ids == [f"r{m}" for m in reversed(range(10))]
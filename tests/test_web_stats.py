@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from .web_backend import load_definitions
+
+
+class OperationFailure(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+def load():
+    return load_definitions(
+        "BUCKET_UNITS", "MAX_STATS_GROUPS", "_has_percentile", "UNKNOWN_OPERATOR_CODES", "stats_pipeline",
+        "_percentile", "_percentiles", "_round", "as_utc", "iso_utc", "_migrating", "timestamp_condition",
+        "grouped_stats",
+        HTTPException=HTTPException, OperationFailure=OperationFailure, AsyncIOMotorCollection=object
+    )
+
+
+class Aggregation:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, n):
+        return self.rows
+
+
+class FakeCollection:
+    name = "benchmarks"
+
+    def __init__(self, percentile_error=None, error=None):
+        self.percentile_error = percentile_error
+        self.error = error
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        if self.error:
+            raise self.error
+        if self.percentile_error and "score__pct" in pipeline[1]["$group"]:
+            raise self.percentile_error
+        row = {"_id": {"benchmark_type": "cuda"}, "count": 2, "score__mean": 1.5, "score__min": 1.0, "score__max": 2.0}
+        if "score__pct" in pipeline[1]["$group"]:
+            row["score__pct"] = [1.5, 1.95]
+        else:
+            row["score__values"] = [1.0, 2.0]
+        return Aggregation([row])
+
+
+def stats(web, collection, group_by=("benchmark_type",)):
+    return asyncio.run(web["grouped_stats"](collection, {}, list(group_by), ["score"], "day", None, None))
+
+
+def test_falls_back_on_unknown_operator():
+    web = load()
+    collection = FakeCollection(percentile_error=OperationFailure("unknown group operator '$percentile'", 15952))
+    result = stats(web, collection)
+    assert result["groups"][0]["score"]["p95"] == 1.95
+    assert web["_has_percentile"] is False
+    stats(web, collection)
+    assert len(collection.pipelines) == 3  # Later calls skip straight to the fallback
+
+
+def test_other_failures_do_not_disable_percentile():
+    web = load()
+    with pytest.raises(OperationFailure):
+        stats(web, FakeCollection(error=OperationFailure("can't convert from BSON type string to Date", 16006)))
+    assert web["_has_percentile"] is None
+    stats(web, FakeCollection())
+    assert web["_has_percentile"] is True
+
+
+def test_bucketing_matches_only_date_timestamps():
+    web = load()
+    collection = FakeCollection()
+    asyncio.run(web["grouped_stats"](collection, {}, ["bucket"], ["score"], "day",
+                                     datetime(2026, 1, 1, tzinfo=timezone.utc), None))
+    assert collection.pipelines[0][0]["$match"]["timestamp"] == {
+        "$gte": datetime(2026, 1, 1, tzinfo=timezone.utc), "$type": "date"
+    }
+    stats(web, collection)
+    assert "timestamp" not in collection.pipelines[1][0]["$match"]
+
+
+def test_time_range_includes_unmigrated_rows_without_buckets():
+    web = load()
+    web["_migrating"].add("benchmarks")
+    collection = FakeCollection()
+    since = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    asyncio.run(web["grouped_stats"](collection, {}, ["benchmark_type"], ["score"], "day", since, None))
+    assert collection.pipelines[0][0]["$match"] == {
+        "$or": [{"timestamp": {"$gte": since}}, {"timestamp": {"$gte": "2026-01-01T00:00:00+00:00"}}]
+    }
@@ -0,0 +1,41 @@
+"""
+Load selected definitions from backend/server.py for unit tests. The module
+itself connects to Mongo and imports motor and emergentintegrations at import
+time, so only the named top-level definitions are executed, against whatever
+collaborators the test passes in.
+"""
+
+import ast
+from pathlib import Path
+
+SERVER = Path(__file__).resolve().parent.parent / "backend" / "server.py"
+PRELUDE = """
+import asyncio, base64, json, logging, os
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Tuple, Type
+logger = logging.getLogger("web_server")
+"""
+
+
+def _defined_names(node):
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+    if isinstance(node, ast.Assign):
+        return {t.id for t in node.targets if isinstance(t, ast.Name)}
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return {node.target.id}
+    return set()
+
+
+def load_definitions(*names, **namespace):
+    """Namespace holding the named server.py definitions, in source order"""
+    ns = {"__name__": "web_server"}
+    exec(PRELUDE, ns)
+    ns.update(namespace)
+    wanted = set(names)
+    for node in ast.parse(SERVER.read_text()).body:
+        if _defined_names(node) & wanted:
+            exec(compile(ast.Module([node], []), str(SERVER), "exec"), ns)
+    missing = wanted - ns.keys()
+    assert not missing, f"Not defined at top level of server.py: {missing}"
+    return ns